@@ -1,6 +1,46 @@
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import chain, islice
+
 import yaml
-from logging_config import setup_logger
-from generators import NFA_Generator, PDA_Generator
+from logging_config import init_worker_logging, setup_logger, worker_log_queue
+from converters import (
+    DEFAULT_MAX_DFA_STATES,
+    compile_regex,
+    determinize,
+    is_deterministic,
+    minimize_dfa,
+)
+from generators import (
+    DEFAULT_BATCH_SIZE,
+    BatchRenderer,
+    NFA_Generator,
+    PDA_Generator,
+    RenderCache,
+)
+from generators.edge_aggregation import DEFAULT_MAX_LABEL_LENGTH
+from generators.layout import (
+    DEFAULT_LARGE_GRAPH_EDGES,
+    DEFAULT_LARGE_GRAPH_ENGINE,
+    DEFAULT_LARGE_GRAPH_STATES,
+)
+from instrumentation import (
+    SlowestAutomata,
+    add_phase,
+    format_summary,
+    profile_tasks,
+    write_metrics,
+)
+from loaders import PRECOMPILED_EXTENSION, get_safe_loader, iter_automata, load_precompiled
+from models import ValidatedDefinition
+from validators import AutomatonValidationError, validate_automaton, validate_nfa
+
+# Regexes are compiled to NFAs by prepare_automaton before they are rendered
+GENERATORS = {"nfa": NFA_Generator, "pda": PDA_Generator, "regex": NFA_Generator}
 
 
 def load_automata_data(filename="input.yaml"):
@@ -13,38 +53,681 @@ def load_automata_data(filename="input.yaml"):
     Returns:
         dict: Parsed YAML data containing NFAs and/or PDAs.
     """
-    with open(filename, "r") as file:
-        return yaml.safe_load(file)
+    with open(filename, "r", encoding="utf-8") as file:
+        return yaml.load(file, Loader=get_safe_loader())
 
 
-if __name__ == "__main__":
+def collect_jobs(automata_data):
+    """
+    Flattens the parsed YAML data into an ordered list of render jobs.
+
+    Args:
+        automata_data (dict): Parsed YAML data containing NFAs and/or PDAs.
+
+    Returns:
+        list: (kind, automaton) tuples, NFAs first, then PDAs and regexes, in file order.
+    """
+    jobs = []
+    for key, kind in (("nfas", "nfa"), ("pdas", "pda"), ("regexes", "regex")):
+        for automaton in automata_data.get(key) or []:
+            jobs.append((kind, automaton))
+    return jobs
+
+
+def iter_input(filename, logger, precompiled=False):
+    """
+    Yields the automata of an input file, through its precompiled file (exported or
+    refreshed as needed) when precompiled is set or the file is itself precompiled.
+
+    Args:
+        filename (str): Path of a definition file or of a precompiled file.
+        logger (logging.Logger): Logger for progress.
+        precompiled (bool): Whether to load definition files from precompiled files.
+
+    Yields:
+        tuple: (kind, automaton) pairs.
+    """
+    if precompiled or filename.endswith(PRECOMPILED_EXTENSION):
+        yield from load_precompiled(filename, logger)
+    else:
+        yield from iter_automata(filename)
+
+
+def wants_conversion(kind, automaton, conversion, options=None):
+    """
+    Checks whether an NFA (or the NFA of a regex) should be converted before
+    rendering, either because its definition sets the conversion key (e.g.
+    `minimize: true`) or because of the matching command-line flag.
+
+    Args:
+        kind (str): "nfa", "pda" or "regex".
+        automaton (dict): The automaton definition.
+        conversion (str): "determinize" or "minimize".
+        options (dict, optional): Run-wide options.
+
+    Returns:
+        bool: True if the conversion is requested.
+    """
+    if kind not in ("nfa", "regex") or not isinstance(automaton, dict):
+        return False
+    return bool(automaton.get(conversion, (options or {}).get(conversion, False)))
+
+
+def converted_type(kind, automaton, options=None):
+    """
+    Returns the type an automaton is rendered as after its conversions.
+
+    Returns:
+        str or None: "min-dfa" or "dfa" for converted NFAs and regexes, the type of
+            the compiled NFA for other regexes, None if unchanged.
+    """
+    if wants_conversion(kind, automaton, "minimize", options):
+        return "min-dfa"
+    if wants_conversion(kind, automaton, "determinize", options):
+        return "dfa"
+    if kind == "regex" and isinstance(automaton, dict):
+        return automaton.get("type", "regex")
+    return None
+
+
+def prepare_automaton(kind, automaton, logger, options=None):
+    """
+    Applies the conversions requested for an automaton before it is rendered.
+
+    Args:
+        kind (str): "nfa", "pda" or "regex".
+        automaton (dict): The automaton definition.
+        logger (logging.Logger): Logger for conversion progress.
+        options (dict, optional): Run-wide options.
+
+    Returns:
+        dict: The definition to render.
+
+    Raises:
+        ValueError: If the automaton is invalid or a conversion exceeds its limits.
+    """
+    options = options or {}
+    if kind == "regex":
+        automaton = compile_regex(automaton, logger)
+    minimize = wants_conversion(kind, automaton, "minimize", options)
+    if wants_conversion(kind, automaton, "determinize", options) or (
+        minimize and not is_deterministic(validate_nfa(automaton, logger))
+    ):
+        max_states = automaton.get(
+            "max_dfa_states", options.get("max_dfa_states", DEFAULT_MAX_DFA_STATES)
+        )
+        automaton = determinize(automaton, logger, max_states)
+    if minimize:
+        original = automaton
+        automaton = minimize_dfa(automaton, logger)
+        if options.get("measure_layout"):
+            _log_layout_savings(original, automaton, logger)
+    return automaton
+
+
+def _log_layout_savings(before, after, logger):
+    """
+    Lays out the graphs before and after minimization (without rasterizing) and logs
+    the layout time saved. This costs one extra layout of the larger graph.
+    """
+    timings = []
+    for definition in (before, after):
+        graph = NFA_Generator(definition, logger).build_graph()
+        start = time.perf_counter()
+        graph.pipe(format="plain")
+        timings.append(time.perf_counter() - start)
+    logger.info(
+        f"Layout of '{after['name']}': {timings[0]:.3f}s before minimization, "
+        f"{timings[1]:.3f}s after, {timings[0] - timings[1]:.3f}s saved."
+    )
+
+
+def assign_output_filename(kind, automaton, reserved, cache=None, options=None):
+    """
+    Picks the output filename for an automaton before any rendering starts, so that
+    names do not depend on which worker finishes first.
+
+    Args:
+        kind (str): "nfa", "pda" or "regex".
+        automaton (dict): The automaton definition.
+        reserved (set): Filenames already claimed in this batch.
+        cache (RenderCache, optional): Cache used to reuse identical existing outputs.
+        options (dict, optional): Run-wide options.
+
+    Returns:
+        str or None: The filename, or None if the definition lacks a name or type (the
+            error is then reported when the automaton is processed).
+    """
+    try:
+        rendered_type = converted_type(kind, automaton, options)
+        if rendered_type:
+            # Named after the automaton it will be rendered as
+            automaton = {**automaton, "type": rendered_type}
+        generator = GENERATORS[kind](
+            automaton, None, (options or {}).get("render_settings"), cache
+        )
+        return generator._get_unique_filename(reserved)
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+def render_automaton(kind, automaton, filename, cache=None, options=None, renderer=None):
+    """
+    Validates and renders a single automaton. Runs in a worker process in parallel mode,
+    so every error is caught and reported back instead of being raised.
+
+    Args:
+        kind (str): "nfa", "pda" or "regex".
+        automaton (dict): The automaton definition.
+        filename (str or None): Pre-assigned output filename.
+        cache (RenderCache, optional): Cache of previously rendered diagrams.
+        options (dict, optional): Run-wide options.
+        renderer (BatchRenderer, optional): Defers the Graphviz run to renderer.flush.
+
+    Returns:
+        dict: The outcome, with the elapsed time, the cache status, the seconds per
+            phase, the graph size and either the output path or the error.
+    """
     logger = setup_logger()
+    start = time.perf_counter()
+    result = {"kind": kind, "name": _automaton_name(automaton), "output": None}
+    result.update(states=None, edges=None, transitions=None)
+    phases = {}
+    generator = None
+    try:
+        automaton = prepare_automaton(kind, automaton, logger, options)
+        add_phase(phases, "convert", start)
+        generator = GENERATORS[kind](
+            automaton, logger, (options or {}).get("render_settings"), cache
+        )
+        # Shared with the generator, so a batched render still adds its phases
+        generator.timings = phases
+        dot_only = (options or {}).get("dot_only", False)
+        if kind == "pda":
+            result["output"] = generator.create_diagram(filename, dot_only, renderer)
+        else:
+            result["output"] = generator.create_graph(filename, dot_only, renderer)
+        result["error"] = None
+    except Exception as e:
+        result["error"] = str(e)
+    if generator is not None:
+        if generator.graph_stats is not None:
+            result.update(generator.graph_stats)
+        elif generator.model is not None:
+            result["states"] = generator.model.states.declared
+            result["transitions"] = generator.model.num_transitions
+    result["cache"] = generator.cache_status if generator is not None else None
+    result["phases"] = phases
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def render_chunk(tasks):
+    """
+    Renders a chunk of tasks, laying out all graphs that need rendering with a single
+    Graphviz process.
+
+    Args:
+        tasks (list): (kind, automaton, filename, cache, options) tuples.
+
+    Returns:
+        list: Per-automaton results in task order.
+    """
+    if len(tasks) == 1:
+        results = [render_automaton(*tasks[0])]
+    else:
+        # Every task of a run shares the same options
+        render_settings = (tasks[0][4] or {}).get("render_settings") or {}
+        renderer = BatchRenderer(
+            setup_logger(),
+            timeout=render_settings.get("render_timeout"),
+            fallback_engine=render_settings.get(
+                "large_graph_engine", DEFAULT_LARGE_GRAPH_ENGINE
+            ),
+        )
+        results = [render_automaton(*task, renderer=renderer) for task in tasks]
+        if len(renderer):
+            start = time.perf_counter()
+            outcomes = renderer.flush()
+            # The shared layout time is split evenly over the graphs of the batch
+            share = (time.perf_counter() - start) / len(outcomes)
+            for result in results:
+                if result["output"] in outcomes:
+                    result["elapsed"] += share
+                    result["phases"]["render"] = result["phases"].get("render", 0.0) + share
+                    if outcomes[result["output"]] is not None:
+                        result["error"] = outcomes[result["output"]]
+                        result["output"] = None
+
+    for result in results:
+        output = result["output"]
+        result["output_bytes"] = (
+            os.path.getsize(output) if output and os.path.exists(output) else None
+        )
+    return results
+
+
+def run_batch(jobs, logger, workers=1, cache=None, options=None):
+    """
+    Validates and renders every job, either in-process or on a process pool, in chunks
+    of batch_size jobs whose graphs are rendered by a single Graphviz process. Jobs are
+    consumed lazily, so a streaming source is rendered while it is still being read,
+    and at most two chunks per worker are buffered.
+
+    Args:
+        jobs (iterable): (kind, automaton) tuples, e.g. from collect_jobs or iter_automata.
+        logger (logging.Logger): Logger for progress and errors.
+        workers (int): Number of worker processes. 1 renders sequentially in-process.
+        cache (RenderCache, optional): Cache used to skip unchanged automata.
+        options (dict, optional): Run-wide options, e.g. "determinize" or
+            "batch_size", the number of automata laid out by one Graphviz process.
+
+    Returns:
+        list: Per-automaton results in job order.
+    """
+    options = options or {}
+    reserved = set()
+    # Reading and filename assignment happen here, in input order; their time is
+    # added to each result once it comes back
+    overheads = []
+    tasks = _make_tasks(jobs, reserved, cache, options, overheads)
+    slowest = SlowestAutomata(options.get("profile_slowest", 0))
+
+    batch_size = max(options.get("batch_size", 1), 1)
+    chunks = iter(lambda: list(islice(tasks, batch_size)), [])
+
+    wall_start = time.perf_counter()
+    if workers <= 1:
+        results = []
+        index = 0
+        for chunk in chunks:
+            for task, result in zip(chunk, render_chunk(chunk)):
+                _finish_result(result, task, overheads[index], slowest, logger)
+                results.append(result)
+                index += 1
+    else:
+        logger.info(f"Rendering automata with {workers} workers...")
+        collected = {}
+        # Workers send their log records back to this process's background writer
+        with worker_log_queue() as log_queue, ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=init_worker_logging,
+            initargs=(log_queue, logging.getLogger().level),
+        ) as executor:
+            pending = {}
+            index = 0
+            for chunk in chunks:
+                future = executor.submit(render_chunk, chunk)
+                pending[future] = (index, chunk)
+                index += len(chunk)
+                if len(pending) >= 2 * workers:
+                    _collect_results(
+                        pending, collected, overheads, slowest, logger, FIRST_COMPLETED
+                    )
+            _collect_results(pending, collected, overheads, slowest, logger)
+        results = [collected[index] for index in range(len(collected))]
+    wall_time = time.perf_counter() - wall_start
+
+    busy_time = sum(result["elapsed"] for result in results)
+    failures = sum(1 for result in results if result["error"])
+    speedup = busy_time / wall_time if wall_time > 0 else 1.0
+    logger.info(
+        f"Processed {len(results)} automata ({failures} failed) in {wall_time:.2f}s "
+        f"wall-clock; sequential estimate {busy_time:.2f}s, speedup {speedup:.2f}x "
+        f"with {max(workers, 1)} worker(s)."
+    )
+    if cache is not None:
+        hits = sum(1 for result in results if result["cache"] == "hit")
+        misses = sum(1 for result in results if result["cache"] == "miss")
+        logger.info(f"Render cache: {hits} hit(s), {misses} miss(es).")
+    if slowest.entries():
+        profile_tasks(
+            slowest.entries(), render_automaton, options.get("profile_dir", "profiles"), logger
+        )
+    return results
+
+
+def validate_jobs(jobs, logger):
+    """
+    Validates every job without converting or rendering anything, e.g. to check a
+    large definition library. Every error of every automaton is logged.
+
+    Args:
+        jobs (iterable): (kind, automaton) tuples, e.g. from iter_automata.
+        logger (logging.Logger): Logger for the errors and the summary.
+
+    Returns:
+        dict: The number of automata, of invalid automata and of errors, and the
+            elapsed seconds.
+    """
+    start = time.perf_counter()
+    summary = {"automata": 0, "invalid": 0, "errors": 0}
+    for kind, automaton in jobs:
+        summary["automata"] += 1
+        # Precompiled automata were validated when they were exported
+        if isinstance(automaton, ValidatedDefinition):
+            continue
+        try:
+            if kind == "regex":
+                automaton = compile_regex(automaton, logger)
+            validate_automaton(kind, automaton, logger)
+            continue
+        except AutomatonValidationError as e:
+            summary["errors"] += len(e.errors)
+        except ValueError:  # Already logged by compile_regex
+            summary["errors"] += 1
+        except Exception as e:
+            summary["errors"] += 1
+            logger.error(
+                f"Error validating {kind.upper()} '{_automaton_name(automaton)}': {e}"
+            )
+        summary["invalid"] += 1
+
+    summary["seconds"] = time.perf_counter() - start
+    logger.info(
+        f"Validated {summary['automata']} automata in {summary['seconds']:.2f}s: "
+        f"{summary['invalid']} invalid, {summary['errors']} error(s)."
+    )
+    return summary
+
+
+def _make_tasks(jobs, reserved, cache, options, overheads):
+    """
+    Turns jobs into render tasks, assigning output filenames in input order and
+    appending the parse and filename probing time of each job to overheads.
+    """
+    jobs = iter(jobs)
+    while True:
+        start = time.perf_counter()
+        try:
+            kind, automaton = next(jobs)
+        except StopIteration:
+            return
+        phases = {}
+        start = add_phase(phases, "parse", start)
+        filename = assign_output_filename(kind, automaton, reserved, cache, options)
+        add_phase(phases, "filename", start)
+        overheads.append(phases)
+        yield (kind, automaton, filename, cache, options)
+
+
+def _finish_result(result, task, overhead, slowest, logger):
+    """
+    Adds the time spent on a job in the main process to its result, logs errors and
+    keeps the job if it is among the slowest.
+    """
+    phases = result.setdefault("phases", {})
+    for phase, seconds in overhead.items():
+        phases[phase] = phases.get(phase, 0.0) + seconds
+    _log_result(result, logger)
+    kind, automaton, filename, _, options = task
+    # Profiling runs bypass the cache, or they would only measure a cache hit
+    slowest.offer(result, (kind, automaton, filename, None, options))
+
+
+def _collect_results(
+    pending, collected, overheads, slowest, logger, return_when="ALL_COMPLETED"
+):
+    """
+    Waits for pending futures and moves their results into collected, keyed by job index.
+    """
+    done, _ = wait(pending, return_when=return_when)
+    for future in done:
+        first, chunk = pending.pop(future)
+        try:
+            results = future.result()
+        except Exception as e:  # The worker process itself died
+            results = [
+                {
+                    "kind": kind,
+                    "name": _automaton_name(automaton),
+                    "output": None,
+                    "error": str(e),
+                    "cache": None,
+                    "elapsed": 0.0,
+                }
+                for kind, automaton, *_ in chunk
+            ]
+        for index, (task, result) in enumerate(zip(chunk, results), first):
+            _finish_result(result, task, overheads[index], slowest, logger)
+            collected[index] = result
+
+
+def _automaton_name(automaton):
+    if isinstance(automaton, dict):
+        return automaton.get("name", "<unnamed>")
+    return "<unnamed>"
+
+
+def _log_result(result, logger):
+    if result["error"]:
+        logger.error(
+            f"Error generating {result['kind'].upper()} '{result['name']}': {result['error']}"
+        )
+
+
+def build_parser(description="Validate and render automata defined in a YAML file."):
+    """
+    Builds the command-line parser shared by app.py and watcher.py.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "input",
+        nargs="*",
+        default=["input.yaml"],
+        help="YAML (optionally multi-document) or JSON Lines files with NFAs and PDAs (default: input.yaml).",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes (0 uses every CPU core, default: 1).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=".render_cache",
+        help="Directory of the render cache (default: .render_cache).",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=512,
+        help="Size limit of the render cache in megabytes (default: 512).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Render every automaton even if an identical render is cached.",
+    )
+    parser.add_argument(
+        "--no-merge-edges",
+        action="store_true",
+        help="Draw one edge per transition instead of one labeled edge per state pair.",
+    )
+    parser.add_argument(
+        "--max-label-length",
+        type=int,
+        default=DEFAULT_MAX_LABEL_LENGTH,
+        help=f"Truncate merged edge labels beyond this many characters (0 disables, default: {DEFAULT_MAX_LABEL_LENGTH}).",
+    )
+    parser.add_argument(
+        "--determinize",
+        action="store_true",
+        help="Convert every NFA to a DFA (subset construction) before rendering.",
+    )
+    parser.add_argument(
+        "--max-dfa-states",
+        type=int,
+        default=DEFAULT_MAX_DFA_STATES,
+        help=f"Give up determinizing beyond this many DFA states (default: {DEFAULT_MAX_DFA_STATES}).",
+    )
+    parser.add_argument(
+        "--minimize",
+        action="store_true",
+        help="Render every NFA as its minimal DFA (Hopcroft), determinizing first if needed.",
+    )
+    parser.add_argument(
+        "--measure-layout",
+        action="store_true",
+        help="Also lay out the unminimized graph to log the layout time saved by --minimize.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Number of automata laid out by one Graphviz process (1 runs Graphviz once per automaton, default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--large-graph-states",
+        type=int,
+        default=DEFAULT_LARGE_GRAPH_STATES,
+        help=f"Use the large-graph layout above this many states (0 disables, default: {DEFAULT_LARGE_GRAPH_STATES}).",
+    )
+    parser.add_argument(
+        "--large-graph-edges",
+        type=int,
+        default=DEFAULT_LARGE_GRAPH_EDGES,
+        help=f"Use the large-graph layout above this many edges (0 disables, default: {DEFAULT_LARGE_GRAPH_EDGES}).",
+    )
+    parser.add_argument(
+        "--large-graph-engine",
+        choices=["sfdp", "neato", "fdp", "twopi", "circo"],
+        default=DEFAULT_LARGE_GRAPH_ENGINE,
+        help=f"Graphviz engine for large graphs and layout retries (default: {DEFAULT_LARGE_GRAPH_ENGINE}).",
+    )
+    parser.add_argument(
+        "--collapse-components",
+        action="store_true",
+        help="Draw the strongly connected components of large graphs as single summary nodes.",
+    )
+    parser.add_argument(
+        "--reachable-depth",
+        type=int,
+        metavar="K",
+        help="Only draw the states reachable within K transitions of the start state.",
+    )
+    parser.add_argument(
+        "--render-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Retry a layout with the cheaper large-graph engine after this many seconds, and give up after as many again.",
+    )
+    parser.add_argument(
+        "--precompiled",
+        action="store_true",
+        help=f"Load each input from a validated binary copy next to it (<input>{PRECOMPILED_EXTENSION}), rebuilding it when the input changed.",
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Log level (default: $AUTOMATA_LOG_LEVEL or INFO). DEBUG logs every edge.",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Write per-automaton phase timings, graph sizes and cache status to FILE (CSV if it ends in .csv, else JSON).",
+    )
+    parser.add_argument(
+        "--profile-slowest",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Render the N slowest automata again under cProfile after the run (bypassing the cache).",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default="profiles",
+        help="Directory for the --profile-slowest dumps (default: profiles).",
+    )
+    parser.add_argument(
+        "--dot-only",
+        action="store_true",
+        help="Only write the DOT source of each automaton to 'outputs', without running Graphviz.",
+    )
+    return parser
+
+
+def parse_args(argv=None):
+    parser = build_parser()
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Only validate the definitions, reporting every error, without running Graphviz; exits with status 1 if any is invalid.",
+    )
+    return parser.parse_args(argv)
+
+
+def build_cache(args, link_outputs=True):
+    """
+    Returns the render cache selected on the command line, or None with --no-cache.
+    Pass link_outputs=False when the outputs may be rewritten in place later.
+    """
+    if args.no_cache:
+        return None
+    return RenderCache(args.cache_dir, args.cache_size_mb * 1024 * 1024, link_outputs)
+
+
+def build_options(args):
+    """
+    Collects the run-wide options passed to run_batch from the parsed arguments.
+    """
+    return {
+        "determinize": args.determinize,
+        "max_dfa_states": args.max_dfa_states,
+        "minimize": args.minimize,
+        "measure_layout": args.measure_layout,
+        "dot_only": args.dot_only,
+        "batch_size": args.batch_size,
+        "profile_slowest": args.profile_slowest,
+        "profile_dir": args.profile_dir,
+        "precompiled": args.precompiled,
+        "render_settings": {
+            "merge_edges": not args.no_merge_edges,
+            "max_label_length": args.max_label_length or None,
+            "large_graph_states": args.large_graph_states or None,
+            "large_graph_edges": args.large_graph_edges or None,
+            "large_graph_engine": args.large_graph_engine,
+            "large_graph_strategy": "collapse" if args.collapse_components else "engine",
+            "reachable_depth": args.reachable_depth,
+            "render_timeout": args.render_timeout,
+        },
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logger = setup_logger(args.log_level)
     logger.info("Starting automaton generation process.")
 
-    try:
-        automata_data = load_automata_data()
-
-        # Generate NFAs
-        if "nfas" in automata_data:
-            logger.info("Processing NFAs...")
-            for nfa in automata_data["nfas"]:
-                try:
-                    generator = NFA_Generator(nfa, logger)
-                    generator.create_graph()
-                except Exception as e:
-                    logger.error(f"Error generating NFA '{nfa['name']}': {str(e)}")
-
-        # Generate PDAs
-        if "pdas" in automata_data:
-            logger.info("Processing PDAs...")
-            for pda in automata_data["pdas"]:
-                try:
-                    generator = PDA_Generator(pda, logger)
-                    generator.create_diagram()
-                except Exception as e:
-                    logger.error(f"Error generating PDA '{pda['name']}': {str(e)}")
+    options = build_options(args)
+    jobs = chain.from_iterable(
+        iter_input(filename, logger, options["precompiled"]) for filename in args.input
+    )
+    if args.validate_only:
+        try:
+            summary = validate_jobs(jobs, logger)
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {str(e)}")
+            return 1
+        return 1 if summary["invalid"] else 0
 
+    workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+    cache = build_cache(args)
+    try:
+        results = run_batch(jobs, logger, workers, cache, options)
     except Exception as e:
         logger.error(f"An unexpected error occurred: {str(e)}")
+    else:
+        if results:
+            logger.info(f"Time per phase:\n{format_summary(results)}")
+        if args.metrics:
+            write_metrics(results, args.metrics)
+            logger.info(f"Metrics written to {args.metrics}")
 
     logger.info("Automaton generation process completed.")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Compares rendering many small NFAs with one Graphviz process per automaton against
+batched rendering (several graphs per Graphviz process).
+
+Run from the repository root:
+
+    python -m benchmarks.batch_render --count 1000
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from app import run_batch
+
+from .synthetic import generate
+
+
+def make_small_nfas(count, states=4, seed=0):
+    """
+    Generates small random NFAs over the alphabet {0, 1}.
+
+    Args:
+        count (int): Number of NFAs.
+        states (int): States per NFA.
+        seed (int): Random seed, so every run renders the same automata.
+
+    Returns:
+        list: ("nfa", definition) jobs as accepted by run_batch.
+    """
+    automata = generate(
+        nfas=count, seed=seed, states=states, alphabet_size=2, density=1.5, epsilon_ratio=0
+    )
+    return [("nfa", nfa) for nfa in automata["nfas"]]
+
+
+def time_batch(jobs, batch_size, workers):
+    """
+    Renders the jobs into a fresh temporary directory without the render cache.
+
+    Returns:
+        tuple: (seconds, number of failed automata).
+    """
+    logger = logging.getLogger("benchmark")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            start = time.perf_counter()
+            results = run_batch(jobs, logger, workers, None, {"batch_size": batch_size})
+            elapsed = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    return elapsed, sum(1 for result in results if result["error"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="Number of NFAs (default: 1000).")
+    parser.add_argument("--states", type=int, default=4, help="States per NFA (default: 4).")
+    parser.add_argument("--batch-size", type=int, default=32, help="Graphs per Graphviz run (default: 32).")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="Worker processes (default: 1).")
+    args = parser.parse_args(argv)
+
+    # Rendering logs one line per automaton; keep only the comparison
+    logging.disable(logging.INFO)
+    jobs = make_small_nfas(args.count, args.states)
+
+    single, single_failed = time_batch(jobs, 1, args.workers)
+    batched, batched_failed = time_batch(jobs, args.batch_size, args.workers)
+    logging.disable(logging.NOTSET)
+
+    print(f"{args.count} NFAs with {args.states} states, {args.workers} worker(s):")
+    for label, seconds, failed in (
+        ("one process per automaton", single, single_failed),
+        (f"{args.batch_size} graphs per process", batched, batched_failed),
+    ):
+        print(f"  {label + ':':<28}{seconds:8.2f}s ({failed} failed)")
+    print(f"  speedup: {single / batched:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Times each phase of processing synthetic automata and tracks regressions.
+
+The phases are YAML loading (load_automata_data), compiling, validation (validate_nfa
+and validate_pda), graph construction (build_graph) and
+Graphviz rendering. Results are written as JSON; pass --baseline to compare them
+with an earlier run and flag phases that got slower than --threshold.
+
+Run from the repository root:
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline results.json --scenario many-small-nfas
+    python -m benchmarks.run --compare old.json new.json
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from app import load_automata_data
+from generators import NFA_Generator, PDA_Generator
+from generators.dot_writer import pipe_source
+from models import compile_nfa, compile_pda
+from validators import validate_nfa, validate_pda
+
+from .synthetic import add_size_arguments, generate, size_knobs, write_yaml
+
+RESULTS_FORMAT_VERSION = 1
+PHASES = ("load", "compile", "validate", "build", "render")
+DEFAULT_THRESHOLD = 0.10
+# Phases faster than this are too noisy to flag
+MIN_COMPARED_SECONDS = 0.005
+
+SCENARIOS = {
+    "many-small-nfas": {
+        "nfas": 200,
+        "states": 8,
+        "alphabet_size": 2,
+        "density": 1.0,
+        "epsilon_ratio": 0.1,
+    },
+    "dense-nfas": {
+        "nfas": 5,
+        "states": 300,
+        "alphabet_size": 26,
+        "density": 3.0,
+        "epsilon_ratio": 0.1,
+    },
+    # Too large for a dot layout in reasonable time
+    "large-nfa": {
+        "nfas": 1,
+        "states": 5000,
+        "alphabet_size": 10,
+        "density": 1.0,
+        "epsilon_ratio": 0.05,
+        "render": False,
+    },
+    "many-small-pdas": {
+        "pdas": 200,
+        "states": 6,
+        "alphabet_size": 2,
+        "density": 1.0,
+        "epsilon_ratio": 0.2,
+        "stack_alphabet_size": 3,
+    },
+    "large-pda": {
+        "pdas": 1,
+        "states": 2000,
+        "alphabet_size": 5,
+        "density": 1.0,
+        "epsilon_ratio": 0.1,
+        "stack_alphabet_size": 8,
+        "render": False,
+    },
+}
+
+
+def run_scenario(config, logger, render=True, repeat=3, seed=0):
+    """
+    Generates the automata of a scenario and times each phase over all of them.
+
+    Args:
+        config (dict): Scenario settings: "nfas"/"pdas" counts, size knobs for
+            benchmarks.synthetic.generate, and optionally "render": False.
+        logger (logging.Logger): Logger passed to validators and generators.
+        render (bool): Whether to time Graphviz rendering.
+        repeat (int): Each phase is run this many times and the fastest run is kept.
+        seed (int): Random seed.
+
+    Returns:
+        dict: The scenario config, automaton, state and transition counts, and the
+            seconds per phase.
+    """
+    knobs = {
+        key: value for key, value in config.items() if key not in ("nfas", "pdas", "render")
+    }
+    automata = generate(config.get("nfas", 0), config.get("pdas", 0), seed, **knobs)
+    render = render and config.get("render", True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "automata.yaml")
+        write_yaml(automata, path)
+        timings = {"load": best_of(repeat, load_automata_data, path)}
+
+    nfas, pdas = automata["nfas"], automata["pdas"]
+    models = {}
+
+    def compile_all():
+        models["nfa"] = [compile_nfa(nfa) for nfa in nfas]
+        models["pda"] = [compile_pda(pda) for pda in pdas]
+
+    def validate_all():
+        for nfa, model in zip(nfas, models["nfa"]):
+            validate_nfa(nfa, logger, model)
+        for pda, model in zip(pdas, models["pda"]):
+            validate_pda(pda, logger, model)
+
+    def build_all():
+        graphs = []
+        for generator_class, definitions, kind in (
+            (NFA_Generator, nfas, "nfa"),
+            (PDA_Generator, pdas, "pda"),
+        ):
+            for definition, model in zip(definitions, models[kind]):
+                generator = generator_class(definition, logger)
+                generator.model = model
+                graphs.append(generator.build_graph())
+        models["graphs"] = graphs
+
+    def render_all():
+        for graph in models["graphs"]:
+            pipe_source(graph.source, graph.format, graph.engine)
+
+    timings["compile"] = best_of(repeat, compile_all)
+    timings["validate"] = best_of(repeat, validate_all)
+    timings["build"] = best_of(repeat, build_all)
+    if render:
+        timings["render"] = best_of(1, render_all)
+
+    all_models = models["nfa"] + models["pda"]
+    return {
+        "config": config,
+        "automata": len(all_models),
+        "states": sum(len(model.states) for model in all_models),
+        "transitions": sum(model.num_transitions for model in all_models),
+        "phases": timings,
+    }
+
+
+def best_of(repeat, function, *args):
+    """
+    Runs function(*args) repeat times and returns the fastest time in seconds.
+    """
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def environment_info():
+    """
+    Describes the machine and code version the results were measured with.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit,
+    }
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares the phase timings of two result files.
+
+    Args:
+        baseline (dict): Earlier results.
+        current (dict): New results.
+        threshold (float): Relative slowdown that counts as a regression, e.g. 0.1 for
+            10%. Phases faster than MIN_COMPARED_SECONDS in the baseline are ignored.
+
+    Returns:
+        tuple: (rows, regressions) where rows holds (scenario, phase, old seconds,
+            new seconds, ratio) for every phase measured in both runs, and
+            regressions the rows slower than the threshold.
+    """
+    rows = []
+    for name, scenario in current["scenarios"].items():
+        old_phases = baseline["scenarios"].get(name, {}).get("phases", {})
+        for phase in PHASES:
+            if phase not in scenario["phases"] or phase not in old_phases:
+                continue
+            old, new = old_phases[phase], scenario["phases"][phase]
+            rows.append((name, phase, old, new, new / old if old > 0 else float("inf")))
+    regressions = [
+        row for row in rows if row[2] >= MIN_COMPARED_SECONDS and row[4] > 1 + threshold
+    ]
+    return rows, regressions
+
+
+def print_results(results):
+    header = f"{'scenario':<18}{'automata':>9}{'states':>9}{'transitions':>12}"
+    print(header + "".join(f"{phase:>10}" for phase in PHASES))
+    for name, scenario in results["scenarios"].items():
+        phases = scenario["phases"]
+        cells = "".join(
+            f"{phases[phase]:>9.3f}s" if phase in phases else f"{'-':>10}" for phase in PHASES
+        )
+        print(
+            f"{name:<18}{scenario['automata']:>9}{scenario['states']:>9}"
+            f"{scenario['transitions']:>12}{cells}"
+        )
+
+
+def print_comparison(rows, regressions, threshold):
+    flagged = set(regressions)
+    print(f"{'scenario':<18}{'phase':<10}{'baseline':>10}{'current':>10}{'change':>9}")
+    for row in rows:
+        name, phase, old, new, ratio = row
+        marker = "  SLOWER" if row in flagged else ""
+        print(f"{name:<18}{phase:<10}{old:>9.3f}s{new:>9.3f}s{ratio - 1:>+9.1%}{marker}")
+    if regressions:
+        print(f"{len(regressions)} phase(s) slowed down by more than {threshold:.0%}.")
+    else:
+        print(f"No phase slowed down by more than {threshold:.0%}.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run; repeat for several (default: all).",
+    )
+    parser.add_argument("--nfas", type=int, help="Run a custom scenario with this many NFAs.")
+    parser.add_argument("--pdas", type=int, help="Run a custom scenario with this many PDAs.")
+    add_size_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per phase; the fastest counts (default: 3).")
+    parser.add_argument("--no-render", action="store_true", help="Skip the Graphviz rendering phase.")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare the results with this earlier JSON file.")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CURRENT"),
+        help="Only compare two existing result files.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Relative slowdown flagged as a regression (default: {DEFAULT_THRESHOLD}).",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as file:
+            baseline = json.load(file)
+        with open(args.compare[1], encoding="utf-8") as file:
+            current = json.load(file)
+        rows, regressions = compare_results(baseline, current, args.threshold)
+        print_comparison(rows, regressions, args.threshold)
+        return 1 if regressions else 0
+
+    if args.nfas is not None or args.pdas is not None:
+        scenarios = {
+            "custom": {"nfas": args.nfas or 0, "pdas": args.pdas or 0, **size_knobs(args)}
+        }
+    else:
+        scenarios = {name: SCENARIOS[name] for name in args.scenario or SCENARIOS}
+
+    render = not args.no_render
+    if render and shutil.which("dot") is None:
+        print("Graphviz 'dot' not found; skipping the render phase.", file=sys.stderr)
+        render = False
+
+    # Validators report unused symbols at INFO; only keep warnings and errors
+    logger = logging.getLogger("benchmark")
+    logger.setLevel(logging.WARNING)
+
+    results = {
+        "format": RESULTS_FORMAT_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment_info(),
+        "scenarios": {},
+    }
+    for name, config in scenarios.items():
+        results["scenarios"][name] = run_scenario(
+            config, logger, render, args.repeat, args.seed
+        )
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        rows, regressions = compare_results(baseline, results, args.threshold)
+        print_comparison(rows, regressions, args.threshold)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
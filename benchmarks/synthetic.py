@@ -0,0 +1,233 @@
+"""
+Generates random NFAs and PDAs in the YAML schema read by app.py.
+
+Run from the repository root to write a definition file, e.g.:
+
+    python -m benchmarks.synthetic --nfas 100 --states 50 -o synthetic.yaml
+"""
+
+import argparse
+import random
+import string
+
+import yaml
+
+from models import EPSILON
+
+# Single-character names keep generated symbols readable; larger alphabets use s0, s1, ...
+_SYMBOL_CHARACTERS = string.digits + string.ascii_lowercase
+
+
+def make_symbols(count):
+    """
+    Returns count distinct input symbol names.
+    """
+    if count <= len(_SYMBOL_CHARACTERS):
+        return list(_SYMBOL_CHARACTERS[:count])
+    return [f"s{index}" for index in range(count)]
+
+
+def make_stack_symbols(count):
+    """
+    Returns count distinct single-character stack symbols, 'Z' (the initial stack
+    symbol) first. Stack operations are read one character per symbol, so at most 26
+    are available.
+
+    Raises:
+        ValueError: If count is not between 1 and 26.
+    """
+    if not 1 <= count <= 26:
+        raise ValueError("The stack alphabet size must be between 1 and 26.")
+    others = [letter for letter in string.ascii_uppercase if letter != "Z"]
+    return ["Z"] + others[: count - 1]
+
+
+def random_nfa(
+    rng,
+    name,
+    states=10,
+    alphabet_size=2,
+    density=1.0,
+    epsilon_ratio=0.1,
+):
+    """
+    Generates a random NFA definition.
+
+    Args:
+        rng (random.Random): Source of randomness.
+        name (str): Name of the NFA.
+        states (int): Number of states.
+        alphabet_size (int): Number of input symbols.
+        density (float): Transitions per (state, symbol) pair on average, so the NFA
+            has about states * alphabet_size * density transitions.
+        epsilon_ratio (float): Fraction of transitions labeled 'ε'.
+
+    Returns:
+        dict: The NFA definition.
+    """
+    names = [f"q{index}" for index in range(states)]
+    alphabet = make_symbols(alphabet_size)
+    transitions = {}
+    for _ in range(round(states * alphabet_size * density)):
+        symbol = EPSILON if rng.random() < epsilon_ratio else rng.choice(alphabet)
+        targets = transitions.setdefault(rng.choice(names), {}).setdefault(symbol, [])
+        target = rng.choice(names)
+        if target not in targets:
+            targets.append(target)
+    return {
+        "name": name,
+        "type": "e-nfa" if epsilon_ratio > 0 else "nfa",
+        "states": names,
+        "alphabet": alphabet,
+        "transitions": transitions,
+        "start_state": names[0],
+        "final_states": rng.sample(names, max(1, states // 4)),
+    }
+
+
+def random_pda(
+    rng,
+    name,
+    states=10,
+    alphabet_size=2,
+    density=1.0,
+    epsilon_ratio=0.1,
+    stack_alphabet_size=3,
+):
+    """
+    Generates a random PDA definition. Every transition pops one stack symbol and
+    pushes zero ('ε'), one or two.
+
+    Args:
+        rng (random.Random): Source of randomness.
+        name (str): Name of the PDA.
+        states (int): Number of states.
+        alphabet_size (int): Number of input symbols.
+        density (float): Transitions per (state, input symbol) pair on average.
+        epsilon_ratio (float): Fraction of transitions that read no input ('ε').
+        stack_alphabet_size (int): Number of stack symbols (at most 26).
+
+    Returns:
+        dict: The PDA definition.
+    """
+    names = [f"q{index}" for index in range(states)]
+    alphabet = make_symbols(alphabet_size)
+    stack_alphabet = make_stack_symbols(stack_alphabet_size)
+    transitions = {}
+    for _ in range(round(states * alphabet_size * density)):
+        symbol = EPSILON if rng.random() < epsilon_ratio else rng.choice(alphabet)
+        by_top = transitions.setdefault(rng.choice(names), {}).setdefault(symbol, {})
+        push = "".join(rng.choices(stack_alphabet, k=rng.randint(0, 2))) or EPSILON
+        rule = [rng.choice(names), push]
+        rules = by_top.setdefault(rng.choice(stack_alphabet), [])
+        if rule not in rules:
+            rules.append(rule)
+    return {
+        "name": name,
+        "type": "pda",
+        "states": names,
+        "input_alphabet": alphabet,
+        "stack_alphabet": stack_alphabet,
+        "start_state": names[0],
+        "initial_stack": stack_alphabet[0],
+        "final_states": rng.sample(names, max(1, states // 4)),
+        "transitions": transitions,
+    }
+
+
+def generate(nfas=0, pdas=0, seed=0, **knobs):
+    """
+    Generates a batch of random automata.
+
+    Args:
+        nfas (int): Number of NFAs.
+        pdas (int): Number of PDAs.
+        seed (int): Random seed; the same seed and knobs give the same automata.
+        **knobs: Size knobs passed to random_nfa and random_pda (stack_alphabet_size
+            only applies to PDAs).
+
+    Returns:
+        dict: {"nfas": [...], "pdas": [...]} as read from a definition file.
+    """
+    rng = random.Random(seed)
+    nfa_knobs = {key: value for key, value in knobs.items() if key != "stack_alphabet_size"}
+    return {
+        "nfas": [random_nfa(rng, f"NFA {index}", **nfa_knobs) for index in range(nfas)],
+        "pdas": [random_pda(rng, f"PDA {index}", **knobs) for index in range(pdas)],
+    }
+
+
+def write_yaml(automata, filename):
+    """
+    Writes automata as a YAML definition file.
+
+    Args:
+        automata (dict): {"nfas": [...], "pdas": [...]}.
+        filename (str): Destination path.
+    """
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    with open(filename, "w", encoding="utf-8") as file:
+        yaml.dump(
+            {key: value for key, value in automata.items() if value},
+            file,
+            Dumper=dumper,
+            allow_unicode=True,
+            sort_keys=False,
+        )
+
+
+def add_size_arguments(parser):
+    """
+    Adds the size knobs shared by the benchmark command-line tools.
+    """
+    parser.add_argument("--states", type=int, default=10, help="States per automaton (default: 10).")
+    parser.add_argument("--alphabet-size", type=int, default=2, help="Input symbols (default: 2).")
+    parser.add_argument(
+        "--density",
+        type=float,
+        default=1.0,
+        help="Average transitions per (state, symbol) pair (default: 1.0).",
+    )
+    parser.add_argument(
+        "--epsilon-ratio",
+        type=float,
+        default=0.1,
+        help="Fraction of ε-transitions (default: 0.1).",
+    )
+    parser.add_argument(
+        "--stack-alphabet-size",
+        type=int,
+        default=3,
+        help="Stack symbols of each PDA, at most 26 (default: 3).",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0).")
+
+
+def size_knobs(args):
+    """
+    Returns the size knobs parsed by add_size_arguments as keyword arguments.
+    """
+    return {
+        "states": args.states,
+        "alphabet_size": args.alphabet_size,
+        "density": args.density,
+        "epsilon_ratio": args.epsilon_ratio,
+        "stack_alphabet_size": args.stack_alphabet_size,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--nfas", type=int, default=10, help="Number of NFAs (default: 10).")
+    parser.add_argument("--pdas", type=int, default=0, help="Number of PDAs (default: 0).")
+    parser.add_argument("-o", "--output", default="synthetic.yaml", help="Output file (default: synthetic.yaml).")
+    add_size_arguments(parser)
+    args = parser.parse_args(argv)
+
+    automata = generate(args.nfas, args.pdas, args.seed, **size_knobs(args))
+    write_yaml(automata, args.output)
+    print(f"Wrote {args.nfas} NFA(s) and {args.pdas} PDA(s) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
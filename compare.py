@@ -0,0 +1,100 @@
+import argparse
+import sys
+
+from converters import compile_regex
+from engines import CheckLimitError, check_equivalence, check_inclusion, format_word
+from engines.equivalence import DEFAULT_MAX_PAIRS, DEFAULT_MAX_SECONDS
+from loaders import iter_automata
+from logging_config import setup_logger
+
+
+def find_automaton(filenames, name, logger):
+    """
+    Looks up an NFA (or a regex, compiled to its NFA) by name in definition files.
+
+    Args:
+        filenames (list): Definition files, searched in order.
+        name (str): Name of the automaton.
+        logger (logging.Logger): Logger for regex compilation.
+
+    Returns:
+        dict: The NFA definition.
+
+    Raises:
+        ValueError: If no NFA or regex has that name.
+    """
+    for filename in filenames:
+        for kind, automaton in iter_automata(filename):
+            if not isinstance(automaton, dict) or automaton.get("name") != name:
+                continue
+            if kind == "regex":
+                return compile_regex(automaton, logger)
+            if kind == "nfa":
+                return automaton
+    raise ValueError(f"No NFA or regex named '{name}' in {', '.join(filenames)}.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check whether two NFAs accept the same language, or one a subset of the other's."
+    )
+    parser.add_argument("first", help="Name of the first NFA (or regex).")
+    parser.add_argument("second", help="Name of the second NFA (or regex).")
+    parser.add_argument(
+        "-i",
+        "--input",
+        action="append",
+        help="Definition file to read; repeat for several (default: input.yaml).",
+    )
+    parser.add_argument(
+        "--inclusion",
+        action="store_true",
+        help="Only check that every word accepted by the first is accepted by the second.",
+    )
+    parser.add_argument(
+        "--max-pairs",
+        type=int,
+        default=DEFAULT_MAX_PAIRS,
+        help=f"Give up after storing this many state pairs, bounding memory (default: {DEFAULT_MAX_PAIRS}).",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=DEFAULT_MAX_SECONDS,
+        help=f"Give up after this many seconds (0 disables, default: {DEFAULT_MAX_SECONDS:g}).",
+    )
+    parser.add_argument("--log-level", type=str.upper, help="Log level (default: $AUTOMATA_LOG_LEVEL or INFO).")
+    args = parser.parse_args(argv)
+    logger = setup_logger(args.log_level)
+
+    filenames = args.input or ["input.yaml"]
+    limits = {"max_pairs": args.max_pairs, "max_seconds": args.time_limit or None}
+    try:
+        first = find_automaton(filenames, args.first, logger)
+        second = find_automaton(filenames, args.second, logger)
+        if args.inclusion:
+            result = check_inclusion(first, second, logger, **limits)
+        else:
+            result = check_equivalence(first, second, logger, **limits)
+    except CheckLimitError as e:
+        logger.error(f"Could not decide: {e}")
+        return 2
+    except (OSError, ValueError) as e:
+        logger.error(str(e))
+        return 2
+
+    if result["holds"]:
+        relation = "is included in" if args.inclusion else "is equivalent to"
+        print(f"'{args.first}' {relation} '{args.second}'.")
+        return 0
+    word = format_word(result["counterexample"])
+    if args.inclusion or result["accepted_by"] == "a":
+        accepted, rejected = args.first, args.second
+    else:
+        accepted, rejected = args.second, args.first
+    print(f"{word} is accepted by '{accepted}' but not by '{rejected}'.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+from .subset_construction import (
+    DEFAULT_MAX_DFA_STATES,
+    LazyDFA,
+    StateExplosionError,
+    determinize,
+)
+from .minimization import is_deterministic, minimize_dfa
+from .regex_compiler import RegexCompiler, RegexSyntaxError, compile_regex
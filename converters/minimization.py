@@ -0,0 +1,184 @@
+import time
+
+from validators import validate_nfa
+
+
+def is_deterministic(model):
+    """
+    Checks whether a compiled NFA is a (possibly partial) DFA: no ε-transitions and at
+    most one target per state and symbol.
+
+    Args:
+        model (CompiledNFA): The compiled automaton.
+
+    Returns:
+        bool: True if the automaton is deterministic.
+    """
+    if model.epsilon >= 0 and model.epsilon in set(model.sym):
+        return False
+    num_symbols = len(model.symbols)
+    keys = {s * num_symbols + y for s, y in zip(model.src, model.sym)}
+    return len(keys) == len(model.src)
+
+
+def minimize_dfa(dfa_data, logger):
+    """
+    Minimizes a DFA with Hopcroft's O(n log n) partition refinement.
+
+    Unreachable states are dropped first, missing transitions go to an implicit dead
+    state, and the class of dead states is left out of the result, so the minimal DFA
+    is partial just like the output of determinize. Every state of the result is named
+    after the state of its equivalence class that is reached first from the start state.
+
+    Args:
+        dfa_data (dict): A deterministic automaton in the NFA YAML schema.
+        logger (logging.Logger): Logger for validation errors and statistics.
+
+    Returns:
+        dict: The minimal DFA definition, with type "min-dfa".
+
+    Raises:
+        ValueError: If the definition is invalid or not deterministic.
+    """
+    model = validate_nfa(dfa_data, logger)
+    if not is_deterministic(model):
+        logger.error(f"Cannot minimize '{model.name}': it is not deterministic.")
+        raise ValueError(f"Cannot minimize '{model.name}': it is not deterministic.")
+
+    started = time.perf_counter()
+    symbols = [y for y in range(len(model.symbols)) if y != model.epsilon]
+    delta = [dict() for _ in range(len(model.states))]
+    for s, y, d in zip(model.src, model.sym, model.dst):
+        delta[s][y] = d
+
+    # Keep reachable states only; index len(reachable) is the dead state
+    order = [model.start]
+    index_of = {model.start: 0}
+    for state in order:
+        for target in delta[state].values():
+            if target not in index_of:
+                index_of[target] = len(order)
+                order.append(target)
+    dead = len(order)
+    num_states = dead + 1
+
+    inverse = {y: [[] for _ in range(num_states)] for y in symbols}
+    for state in order:
+        row = delta[state]
+        source = index_of[state]
+        for y in symbols:
+            target = row.get(y)
+            inverse[y][dead if target is None else index_of[target]].append(source)
+    for y in symbols:
+        inverse[y][dead].append(dead)
+
+    finals = {index_of[state] for state in model.finals if state in index_of}
+    blocks, block_of = _hopcroft(num_states, symbols, inverse, finals)
+
+    # Build the quotient automaton, skipping the dead block
+    dead_block = block_of[dead]
+    names = model.states.names
+    block_names = {}
+    for block_id, members in enumerate(blocks):
+        if block_id != dead_block and members:
+            block_names[block_id] = names[order[min(members)]]
+    transitions = {}
+    for block_id, name in block_names.items():
+        representative = order[min(blocks[block_id])]
+        row = {}
+        for y, target in sorted(delta[representative].items()):
+            target_block = block_of[index_of[target]]
+            if target_block != dead_block:
+                row[model.symbols.names[y]] = [block_names[target_block]]
+        if row:
+            transitions[name] = row
+
+    start_block = block_of[0]
+    kept = sorted(block_names, key=lambda block_id: min(blocks[block_id]))
+    states = [block_names[block_id] for block_id in kept]
+    final_states = [
+        block_names[block_id]
+        for block_id in kept
+        if min(blocks[block_id]) in finals
+    ]
+    minimized = {
+        "name": dfa_data["name"],
+        "type": "min-dfa",
+        "states": states,
+        "alphabet": [
+            model.symbols.names[y]
+            for y in range(model.symbols.declared)
+            if y != model.epsilon
+        ],
+        "transitions": transitions,
+        "start_state": block_names.get(start_block, names[model.start]),
+        "final_states": final_states,
+    }
+    if start_block == dead_block:
+        # The language is empty; keep the start state so the diagram is not blank
+        minimized["states"] = [names[model.start]]
+        minimized["start_state"] = names[model.start]
+
+    edges_after = sum(len(row) for row in transitions.values())
+    logger.info(
+        f"Minimized '{model.name}' in {time.perf_counter() - started:.3f}s: "
+        f"{model.states.declared} -> {len(minimized['states'])} states, "
+        f"{model.num_transitions} -> {edges_after} edges."
+    )
+    return minimized
+
+
+def _hopcroft(num_states, symbols, inverse, finals):
+    """
+    Refines the partition {finals, others} until it is stable under every symbol.
+
+    Args:
+        num_states (int): Number of states, all reachable, numbered 0..num_states-1.
+        symbols (list): Symbol ids.
+        inverse (dict): Maps each symbol id to the list of predecessors of every state.
+        finals (set): Final states.
+
+    Returns:
+        tuple: (blocks, block_of) where blocks is a list of state sets and block_of maps
+            every state to the index of its block.
+    """
+    others = set(range(num_states)) - finals
+    blocks = [block for block in (set(finals), others) if block]
+    block_of = [0] * num_states
+    for block_id, members in enumerate(blocks):
+        for state in members:
+            block_of[state] = block_id
+
+    # Only the smaller half has to be used as a splitter initially
+    smallest = min(range(len(blocks)), key=lambda b: len(blocks[b]))
+    pending = {(smallest, y) for y in symbols}
+    while pending:
+        splitter, y = pending.pop()
+        predecessors = inverse[y]
+        touched = {}
+        for state in list(blocks[splitter]):
+            for source in predecessors[state]:
+                block_id = block_of[source]
+                hit = touched.get(block_id)
+                if hit is None:
+                    hit = touched[block_id] = set()
+                hit.add(source)
+
+        for block_id, hit in touched.items():
+            block = blocks[block_id]
+            if len(hit) == len(block):
+                continue
+            # Split: the touched states move to a new block
+            new_id = len(blocks)
+            block -= hit
+            blocks.append(hit)
+            for state in hit:
+                block_of[state] = new_id
+            for symbol in symbols:
+                if (block_id, symbol) in pending:
+                    pending.add((new_id, symbol))
+                else:
+                    pending.add(
+                        (new_id if len(hit) <= len(block) else block_id, symbol)
+                    )
+    return blocks, block_of
@@ -0,0 +1,515 @@
+from collections import defaultdict
+
+# Largest repetition count accepted in {m,n}
+MAX_REPEAT = 1000
+# Largest number of positions (NFA states but the start) a pattern may expand to;
+# nested repetitions multiply, e.g. ((a|b){1000}){1000} has 2 000 000
+MAX_POSITIONS = 100_000
+# The shared compiler forgets its subexpressions beyond this many nodes
+DEFAULT_MAX_NODES = 1_000_000
+
+ESCAPE_CLASSES = {
+    "d": "0123456789",
+    "w": "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_",
+    "s": " \t\n\r\f\v",
+}
+ESCAPE_CHARACTERS = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v"}
+
+# Node kinds of the hash-consed syntax tree
+EMPTY, SYMBOL, SEQ, ALT, STAR, PLUS, OPT = range(7)
+
+
+class RegexSyntaxError(ValueError):
+    """
+    Raised when a pattern cannot be parsed.
+    """
+
+
+class RegexCompiler:
+    """
+    Compiles regular expressions to ε-free NFAs with the Glushkov (position)
+    construction: every occurrence of a symbol or character class in a pattern becomes
+    one state, so a pattern of n symbols yields n + 1 states and no ε-transitions.
+
+    Syntax trees are hash-consed: every distinct subexpression is stored once in a node
+    table and identified by its id, so subexpressions repeated within or across patterns
+    (e.g. an identifier class used by many token definitions) are parsed and expanded
+    only once. Alternations are left-factored into a trie on those ids, so a token list
+    like `if|in|int|while` shares the states of common prefixes, and its NFA is built in
+    time linear in the total length of the alternatives.
+
+    The compiler keeps its tables between patterns; compile_regex uses one shared
+    instance per process.
+
+    Attributes:
+        max_nodes (int): Node count beyond which the tables are cleared.
+        max_positions (int): Largest number of positions a definition may expand to.
+        shared (int): Number of subexpressions found in the table instead of added.
+    """
+
+    def __init__(self, max_nodes=DEFAULT_MAX_NODES, max_positions=MAX_POSITIONS):
+        """
+        Initializes the RegexCompiler with empty tables.
+
+        Args:
+            max_nodes (int): Node count beyond which the tables are cleared.
+            max_positions (int): Largest number of positions a definition may expand
+                to, checked before the expansion.
+        """
+        self.max_nodes = max_nodes
+        self.max_positions = max_positions
+        self.shared = 0
+        self._nodes = []
+        self._ids = {}
+        self._sizes = {}
+        self._patterns = {}
+        self._classes = {}
+        self._empty = self._intern(EMPTY, None)
+
+    def compile(self, regex_data, logger):
+        """
+        Compiles a regex definition to an NFA definition for NFA_Generator.
+
+        Args:
+            regex_data (dict): The definition, with a name and either a `pattern` or a
+                list of `alternatives` (matched as a union). `alphabet` is optional; it
+                defaults to the characters used in the pattern and is required for `.`
+                and negated classes to match anything else.
+            logger (logging.Logger): Logger for errors and progress.
+
+        Returns:
+            dict: The NFA definition. Its type defaults to "regex".
+
+        Raises:
+            ValueError: If the definition or its pattern is invalid, or it expands to
+                more than max_positions positions.
+        """
+        if "name" not in regex_data:
+            logger.error(f"Missing required key 'name' in regex definition: {regex_data}")
+            raise ValueError("Missing required key 'name' in regex definition.")
+        name = regex_data["name"]
+        patterns = regex_data.get("alternatives")
+        if patterns is None and "pattern" in regex_data:
+            patterns = [regex_data["pattern"]]
+        if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+            logger.error(f"Regex '{name}' needs a 'pattern' string or a list of 'alternatives'.")
+            raise ValueError(
+                f"Regex '{name}' needs a 'pattern' string or a list of 'alternatives'."
+            )
+
+        alphabet = regex_data.get("alphabet")
+        alphabet = tuple(str(symbol) for symbol in alphabet) if alphabet is not None else None
+        if alphabet is not None and any(len(symbol) != 1 for symbol in alphabet):
+            logger.error(f"Regex '{name}' has multi-character symbols in its alphabet.")
+            raise ValueError(f"The alphabet of regex '{name}' must contain single characters.")
+
+        if len(self._nodes) > self.max_nodes:
+            self.__init__(self.max_nodes, self.max_positions)
+        shared = self.shared
+        try:
+            root = self._factor([(self._items(self._parse(p, alphabet)), 0) for p in patterns])
+            size = self._size(root)
+            if size > self.max_positions:
+                logger.error(
+                    f"Regex '{name}' expands to {size} positions, more than the limit of "
+                    f"{self.max_positions}."
+                )
+                raise ValueError(
+                    f"Regex '{name}' expands to {size} positions, more than the limit of "
+                    f"{self.max_positions} (MAX_POSITIONS); reduce its repetitions."
+                )
+            symbols, first, last, follow, nullable = self._positions(root)
+        except RegexSyntaxError as e:
+            logger.error(f"Invalid pattern in regex '{name}': {e}")
+            raise
+        except RecursionError:
+            logger.error(f"Pattern of regex '{name}' is nested too deeply.")
+            raise ValueError(f"Pattern of regex '{name}' is nested too deeply.") from None
+
+        used = set().union(*symbols) if symbols else set()
+        if alphabet is None:
+            alphabet = tuple(sorted(used))
+        elif not used <= set(alphabet):
+            missing = ", ".join(sorted(used - set(alphabet)))
+            logger.error(f"Regex '{name}' uses symbols outside its alphabet: {missing}")
+            raise ValueError(f"Regex '{name}' uses symbols outside its alphabet: {missing}")
+
+        definition = _to_nfa(regex_data, alphabet, symbols, first, last, follow, nullable)
+        transitions = sum(
+            len(targets) for row in definition["transitions"].values() for targets in row.values()
+        )
+        logger.info(
+            f"Compiled regex '{name}': {len(definition['states'])} states, {transitions} "
+            f"transitions, {self.shared - shared} shared subexpressions."
+        )
+        return definition
+
+    # Hash-consing
+
+    def _intern(self, kind, payload):
+        key = (kind, payload)
+        node = self._ids.get(key)
+        if node is None:
+            node = self._ids[key] = len(self._nodes)
+            self._nodes.append(key)
+        else:
+            self.shared += 1
+        return node
+
+    def _seq(self, items):
+        if not items:
+            return self._empty
+        if len(items) == 1:
+            return items[0]
+        return self._intern(SEQ, tuple(items))
+
+    def _alt(self, branches):
+        branches = tuple(dict.fromkeys(branches))
+        if len(branches) == 1:
+            return branches[0]
+        return self._intern(ALT, branches)
+
+    def _items(self, node):
+        """
+        Returns the concatenated parts of a node: its children for a sequence, nothing
+        for the empty string, and the node itself otherwise.
+        """
+        kind, payload = self._nodes[node]
+        if kind == SEQ:
+            return payload
+        if kind == EMPTY:
+            return ()
+        return (node,)
+
+    def _factor(self, alternatives):
+        """
+        Builds the union of alternatives given as (items, start) pairs, each standing
+        for the sequence items[start:], and merges alternatives that start with the same
+        subexpression into one branch. Since subexpressions are interned, grouping is a
+        dictionary lookup per alternative and level.
+        """
+        groups = {}
+        for items, start in alternatives:
+            head = items[start] if start < len(items) else None
+            groups.setdefault(head, []).append((items, start))
+
+        branches = []
+        for head, members in groups.items():
+            if head is None:
+                branches.append(self._empty)
+            elif len(members) == 1:
+                items, start = members[0]
+                branches.append(self._seq(items[start:]))
+            else:
+                rest = self._factor([(items, start + 1) for items, start in members])
+                branches.append(self._seq((head,) + self._items(rest)))
+        return self._alt(branches)
+
+    # Parsing
+
+    def _parse(self, pattern, alphabet):
+        key = (pattern, alphabet)
+        node = self._patterns.get(key)
+        if node is None:
+            parser = _Parser(self, pattern, alphabet)
+            node = self._patterns[key] = parser.parse()
+        else:
+            self.shared += 1
+        return node
+
+    def _symbol(self, characters):
+        if not characters:
+            raise RegexSyntaxError("character class matches no symbol")
+        return self._intern(SYMBOL, frozenset(characters))
+
+    def _class(self, text, alphabet):
+        """
+        Expands the body of a character class, e.g. 'a-z_' or '^0-9', into a SYMBOL node.
+        Expansions are memoized, since the same classes recur across patterns.
+        """
+        key = (text, alphabet)
+        node = self._classes.get(key)
+        if node is not None:
+            self.shared += 1
+            return node
+
+        negated = text.startswith("^")
+        characters = set()
+        index = 1 if negated else 0
+        while index < len(text):
+            character = text[index]
+            if character == "\\" and index + 1 < len(text):
+                escaped = text[index + 1]
+                if escaped in ESCAPE_CLASSES:
+                    characters.update(ESCAPE_CLASSES[escaped])
+                    index += 2
+                    continue
+                character = ESCAPE_CHARACTERS.get(escaped, escaped)
+                index += 1
+            if index + 2 < len(text) and text[index + 1] == "-":
+                end = text[index + 2]
+                if end == "\\" and index + 3 < len(text):
+                    end = ESCAPE_CHARACTERS.get(text[index + 3], text[index + 3])
+                    index += 1
+                if ord(end) < ord(character):
+                    raise RegexSyntaxError(f"invalid range '{character}-{end}'")
+                characters.update(chr(code) for code in range(ord(character), ord(end) + 1))
+                index += 3
+                continue
+            characters.add(character)
+            index += 1
+
+        if negated:
+            if alphabet is None:
+                raise RegexSyntaxError("negated classes need an explicit alphabet")
+            characters = set(alphabet) - characters
+        node = self._classes[key] = self._symbol(characters)
+        return node
+
+    # Glushkov construction
+
+    def _size(self, node):
+        """
+        Returns the number of positions of a tree, i.e. of symbol occurrences once
+        every shared subexpression is expanded. Sizes are memoized per node, so this
+        takes time linear in the size of the hash-consed tree.
+        """
+        size = self._sizes.get(node)
+        if size is None:
+            kind, payload = self._nodes[node]
+            if kind == SYMBOL:
+                size = 1
+            elif kind == EMPTY:
+                size = 0
+            elif kind in (SEQ, ALT):
+                size = sum(self._size(child) for child in payload)
+            else:
+                size = self._size(payload)
+            self._sizes[node] = size
+        return size
+
+    def _positions(self, root):
+        """
+        Numbers the symbol occurrences of a tree and computes the Glushkov sets.
+
+        Returns:
+            tuple: (symbols, first, last, follow, nullable) where symbols holds the
+                characters of each position, first and last the positions that can
+                start and end a match, follow the positions that can come after each
+                position, and nullable whether the empty string matches.
+        """
+        nodes = self._nodes
+        symbols = []
+        follow = []
+
+        def visit(node):
+            kind, payload = nodes[node]
+            if kind == SYMBOL:
+                position = len(symbols)
+                symbols.append(payload)
+                follow.append(set())
+                return [position], [position], False
+            if kind == EMPTY:
+                return [], [], True
+            if kind == SEQ:
+                first, last, nullable = [], [], True
+                for child in payload:
+                    child_first, child_last, child_nullable = visit(child)
+                    for position in last:
+                        follow[position].update(child_first)
+                    if nullable:
+                        first.extend(child_first)
+                    last = last + child_last if child_nullable else child_last
+                    nullable = nullable and child_nullable
+                return first, last, nullable
+            if kind == ALT:
+                first, last, nullable = [], [], False
+                for child in payload:
+                    child_first, child_last, child_nullable = visit(child)
+                    first.extend(child_first)
+                    last.extend(child_last)
+                    nullable = nullable or child_nullable
+                return first, last, nullable
+            first, last, nullable = visit(payload)
+            if kind in (STAR, PLUS):
+                for position in last:
+                    follow[position].update(first)
+            return first, last, nullable or kind in (STAR, OPT)
+
+        first, last, nullable = visit(root)
+        return symbols, first, last, follow, nullable
+
+
+class _Parser:
+    """
+    Recursive-descent parser producing hash-consed nodes. Alternations are collected
+    in a loop and left-factored, so patterns with thousands of alternatives are not
+    nested any deeper than a single one.
+    """
+
+    def __init__(self, compiler, pattern, alphabet):
+        self.compiler = compiler
+        self.pattern = pattern
+        self.alphabet = alphabet
+        self.index = 0
+
+    def parse(self):
+        node = self._alternation()
+        if self.index < len(self.pattern):
+            raise RegexSyntaxError(f"unbalanced ')' at position {self.index}")
+        return node
+
+    def _alternation(self):
+        compiler = self.compiler
+        alternatives = [(self._sequence(), 0)]
+        while self._peek() == "|":
+            self.index += 1
+            alternatives.append((self._sequence(), 0))
+        if len(alternatives) == 1:
+            return compiler._seq(alternatives[0][0])
+        return compiler._factor(alternatives)
+
+    def _sequence(self):
+        items = []
+        while self.index < len(self.pattern) and self._peek() not in "|)":
+            node = self._quantified(self._atom())
+            items.extend(self.compiler._items(node))
+        return tuple(items)
+
+    def _atom(self):
+        compiler = self.compiler
+        pattern = self.pattern
+        character = pattern[self.index]
+        self.index += 1
+        if character == "(":
+            node = self._alternation()
+            if self._peek() != ")":
+                raise RegexSyntaxError(f"missing ')' for the group at position {self.index}")
+            self.index += 1
+            return node
+        if character == "[":
+            # A ']' right after '[' or '[^' is a literal
+            end = self.index + (1 if pattern[self.index:self.index + 1] == "^" else 0)
+            end += 1 if pattern[end:end + 1] == "]" else 0
+            while end < len(pattern) and pattern[end] != "]":
+                end += 2 if pattern[end] == "\\" else 1
+            if end >= len(pattern):
+                raise RegexSyntaxError(f"missing ']' for the class at position {self.index - 1}")
+            node = compiler._class(pattern[self.index:end], self.alphabet)
+            self.index = end + 1
+            return node
+        if character == ".":
+            if self.alphabet is None:
+                raise RegexSyntaxError("'.' needs an explicit alphabet")
+            return compiler._symbol(self.alphabet)
+        if character == "\\":
+            if self.index >= len(pattern):
+                raise RegexSyntaxError("pattern ends with '\\'")
+            escaped = pattern[self.index]
+            self.index += 1
+            if escaped in ESCAPE_CLASSES:
+                return compiler._symbol(ESCAPE_CLASSES[escaped])
+            return compiler._symbol(ESCAPE_CHARACTERS.get(escaped, escaped))
+        if character == "ε":
+            return compiler._empty
+        if character in "*+?{":
+            raise RegexSyntaxError(f"nothing to repeat at position {self.index - 1}")
+        return compiler._symbol(character)
+
+    def _quantified(self, node):
+        compiler = self.compiler
+        while self._peek() in ("*", "+", "?", "{"):
+            operator = self.pattern[self.index]
+            self.index += 1
+            if operator == "{":
+                node = self._repeat(node)
+            else:
+                kind = {"*": STAR, "+": PLUS, "?": OPT}[operator]
+                node = compiler._intern(kind, node)
+        return node
+
+    def _repeat(self, node):
+        compiler = self.compiler
+        end = self.pattern.find("}", self.index)
+        if end < 0:
+            raise RegexSyntaxError(f"missing '}}' at position {self.index - 1}")
+        bounds = self.pattern[self.index:end].split(",")
+        self.index = end + 1
+        try:
+            low = int(bounds[0]) if bounds[0].strip() else 0
+            high = None if len(bounds) == 2 and not bounds[1].strip() else int(bounds[-1])
+        except ValueError:
+            raise RegexSyntaxError(f"invalid repetition '{{{','.join(bounds)}}}'") from None
+        if len(bounds) > 2 or low > (high if high is not None else low) or low > MAX_REPEAT or (
+            high is not None and high > MAX_REPEAT
+        ):
+            raise RegexSyntaxError(f"invalid repetition '{{{','.join(bounds)}}}'")
+        items = [node] * low
+        if high is None:
+            items.append(compiler._intern(STAR, node))
+        else:
+            items.extend([compiler._intern(OPT, node)] * (high - low))
+        return compiler._seq(tuple(items))
+
+    def _peek(self):
+        return self.pattern[self.index] if self.index < len(self.pattern) else ""
+
+
+def _to_nfa(regex_data, alphabet, symbols, first, last, follow, nullable):
+    """
+    Writes the Glushkov automaton in the YAML schema understood by NFA_Generator.
+    State q0 is the start state and q<i> the i-th symbol occurrence.
+    """
+    names = ["q0"] + [f"q{position + 1}" for position in range(len(symbols))]
+    transitions = {}
+
+    def add(source, targets):
+        row = defaultdict(list)
+        for target in sorted(set(targets)):
+            for symbol in sorted(symbols[target]):
+                row[symbol].append(names[target + 1])
+        if row:
+            transitions[source] = dict(row)
+
+    add("q0", first)
+    for position, targets in enumerate(follow):
+        add(names[position + 1], targets)
+
+    finals = [names[position + 1] for position in sorted(set(last))]
+    definition = {
+        "name": regex_data["name"],
+        "type": regex_data.get("type", "regex"),
+        "states": names,
+        "alphabet": list(alphabet),
+        "transitions": transitions,
+        "start_state": "q0",
+        "final_states": (["q0"] if nullable else []) + finals,
+    }
+    # Conversions requested on the regex apply to its NFA
+    for key in ("determinize", "minimize", "max_dfa_states"):
+        if key in regex_data:
+            definition[key] = regex_data[key]
+    return definition
+
+
+_shared_compiler = RegexCompiler()
+
+
+def compile_regex(regex_data, logger, compiler=None):
+    """
+    Compiles a regex definition to an NFA definition that can be rendered by
+    NFA_Generator.
+
+    Args:
+        regex_data (dict): The regex definition, see RegexCompiler.compile.
+        logger (logging.Logger): Logger for errors and progress.
+        compiler (RegexCompiler, optional): Compiler whose memoized subexpressions
+            are used; defaults to one shared by every call in this process.
+
+    Returns:
+        dict: The NFA definition.
+
+    Raises:
+        ValueError: If the definition or its pattern is invalid.
+    """
+    return (compiler or _shared_compiler).compile(regex_data, logger)
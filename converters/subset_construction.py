@@ -0,0 +1,184 @@
+from engines.nfa_simulator import NFA_Simulator, _bits
+
+DEFAULT_MAX_DFA_STATES = 10000
+
+
+class StateExplosionError(ValueError):
+    """
+    Raised when determinization would create more DFA states than allowed.
+    """
+
+
+class LazyDFA:
+    """
+    DFA obtained from an NFA by the subset construction, built on demand.
+
+    Every DFA state is an ε-closed set of NFA states, stored as an int bitset. A hash
+    table maps each bitset to its DFA state id, so a subset reached again is recognized
+    with one lookup, and transitions are computed the first time they are followed.
+
+    Attributes:
+        simulator (NFA_Simulator): Supplies the ε-closures and per-symbol moves.
+        max_states (int): Cap on the number of DFA states.
+        subsets (list): The NFA state bitset of every DFA state id.
+        transitions (list): Per DFA state, a dict of the already computed transitions
+            mapping symbol ids to target DFA state ids (None for the dead state).
+        start (int): Id of the start state.
+    """
+
+    def __init__(self, simulator, max_states=DEFAULT_MAX_DFA_STATES):
+        """
+        Initializes the LazyDFA with only its start state built.
+
+        Args:
+            simulator (NFA_Simulator): Simulator of the NFA to determinize.
+            max_states (int): Cap on the number of DFA states.
+
+        Raises:
+            StateExplosionError: If max_states is less than 1.
+        """
+        self.simulator = simulator
+        self.max_states = max_states
+        self.subsets = []
+        self.transitions = []
+        self._ids = {}
+        self.start = self._state_id(simulator.start_set)
+
+    def next_state(self, state, symbol_id):
+        """
+        Follows a transition, building the target DFA state if it is new.
+
+        Args:
+            state (int): Id of the DFA state.
+            symbol_id (int): Id of the input symbol.
+
+        Returns:
+            int or None: Id of the target DFA state, or None for the (implicit) dead state.
+
+        Raises:
+            StateExplosionError: If the target is new and the state cap is reached.
+        """
+        transitions = self.transitions[state]
+        if symbol_id in transitions:
+            return transitions[symbol_id]
+        subset = self.simulator.move(self.subsets[state], symbol_id)
+        target = self._state_id(subset) if subset else None
+        transitions[symbol_id] = target
+        return target
+
+    def is_final(self, state):
+        return bool(self.subsets[state] & self.simulator.final_mask)
+
+    def explore(self):
+        """
+        Builds every DFA state reachable from the start state (breadth-first).
+
+        Returns:
+            int: The number of DFA states.
+
+        Raises:
+            StateExplosionError: If more than max_states states are reachable.
+        """
+        symbol_ids = sorted(self.simulator.symbol_ids.values())
+        index = 0
+        while index < len(self.subsets):
+            for symbol_id in symbol_ids:
+                self.next_state(index, symbol_id)
+            index += 1
+        return len(self.subsets)
+
+    def to_dict(self, name, type="dfa", naming="auto"):
+        """
+        Exports the explored DFA in the YAML schema understood by NFA_Generator. The dead
+        state is left out, so the DFA may be partial.
+
+        Args:
+            name (str): Name of the DFA.
+            type (str): Type recorded in the definition (also used in the filename).
+            naming (str): "subsets" names states after their NFA states, e.g. "{A,B}";
+                "indexed" names them "D0", "D1", ...; "auto" uses subset names unless a
+                subset has more than 8 NFA states. Subset names fall back to indexed
+                ones if two subsets get the same name, e.g. {"A,B"} and {"A", "B"}.
+
+        Returns:
+            dict: The DFA definition.
+        """
+        self.explore()
+        state_names = self.simulator.model.states.names
+        if naming == "auto":
+            naming = (
+                "subsets"
+                if all(subset.bit_count() <= 8 for subset in self.subsets)
+                else "indexed"
+            )
+
+        if naming == "subsets":
+            names = [
+                "{" + ",".join(str(state_names[i]) for i in _bits(subset)) + "}"
+                for subset in self.subsets
+            ]
+            if len(set(names)) < len(names):
+                naming = "indexed"
+        if naming != "subsets":
+            names = [f"D{index}" for index in range(len(self.subsets))]
+
+        symbol_names = self.simulator.model.symbols.names
+        transitions = {}
+        for state, targets in enumerate(self.transitions):
+            row = {
+                symbol_names[symbol_id]: [names[target]]
+                for symbol_id, target in sorted(targets.items())
+                if target is not None
+            }
+            if row:
+                transitions[names[state]] = row
+
+        return {
+            "name": name,
+            "type": type,
+            "states": names,
+            "alphabet": [symbol_names[i] for i in sorted(self.simulator.symbol_ids.values())],
+            "transitions": transitions,
+            "start_state": names[self.start],
+            "final_states": [names[i] for i in range(len(names)) if self.is_final(i)],
+        }
+
+    def _state_id(self, subset):
+        state = self._ids.get(subset)
+        if state is None:
+            if len(self.subsets) >= self.max_states:
+                raise StateExplosionError(
+                    f"Determinizing NFA '{self.simulator.model.name}' needs more than "
+                    f"{self.max_states} DFA states; raise the cap or render the NFA instead."
+                )
+            state = self._ids[subset] = len(self.subsets)
+            self.subsets.append(subset)
+            self.transitions.append({})
+        return state
+
+
+def determinize(nfa_data, logger, max_states=DEFAULT_MAX_DFA_STATES, naming="auto"):
+    """
+    Converts an NFA definition into an equivalent DFA definition that can be rendered
+    by NFA_Generator.
+
+    Args:
+        nfa_data (dict): The NFA definition.
+        logger (logging.Logger): Logger for validation errors and progress.
+        max_states (int): Cap on the number of DFA states.
+        naming (str): State naming scheme, see LazyDFA.to_dict.
+
+    Returns:
+        dict: The DFA definition, with type "dfa" and the same name as the NFA.
+
+    Raises:
+        ValueError: If the NFA is invalid.
+        StateExplosionError: If the DFA would exceed max_states states.
+    """
+    dfa = LazyDFA(NFA_Simulator(nfa_data, logger), max_states)
+    definition = dfa.to_dict(nfa_data["name"], naming=naming)
+    logger.info(
+        f"Determinized NFA '{nfa_data['name']}': "
+        f"{dfa.simulator.model.states.declared} NFA states -> {len(dfa.subsets)} DFA states."
+    )
+    return definition
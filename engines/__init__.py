@@ -0,0 +1,10 @@
+from .equivalence import (
+    AntichainInclusion,
+    CheckLimitError,
+    check_equivalence,
+    check_inclusion,
+    format_word,
+)
+from .matrix_runner import MatrixRunner
+from .nfa_simulator import NFA_Simulator
+from .pda_simulator import PDA_Simulator, SimulationLimitError
@@ -0,0 +1,257 @@
+import time
+from collections import deque
+
+from .nfa_simulator import NFA_Simulator, _bits
+
+DEFAULT_MAX_PAIRS = 1_000_000
+DEFAULT_MAX_SECONDS = 60.0
+
+
+class CheckLimitError(ValueError):
+    """
+    Raised when an inclusion or equivalence check exceeds its pair or time budget
+    before reaching an answer.
+    """
+
+
+class AntichainInclusion:
+    """
+    Decides whether the language of an NFA A is included in that of an NFA B without
+    determinizing B, using the forward antichain algorithm.
+
+    The search explores pairs (p, S) of a state p of A and the set S of states B can
+    be in after the same word, S being a bitset as in NFA_Simulator. A pair with p final
+    in A and no final state in S proves that the word is accepted by A but not by B. A
+    pair (p, S) is skipped if a pair (p, S') with S' ⊆ S was already seen, since any
+    word that leads from (p, S) to a counterexample also does from (p, S'). Only the
+    minimal sets are kept per state of A, which is what keeps the search far below the
+    size of B's subset construction on typical inputs.
+
+    Pairs are explored breadth-first, so the first counterexample found is a shortest
+    one.
+
+    Attributes:
+        a (NFA_Simulator): Simulator of the included NFA.
+        b (NFA_Simulator): Simulator of the including NFA.
+        max_pairs (int): Maximum number of pairs stored, which bounds memory use.
+        max_seconds (float): Maximum running time.
+        pairs (int): Number of pairs stored by the last run.
+    """
+
+    def __init__(self, a, b, max_pairs=DEFAULT_MAX_PAIRS, max_seconds=DEFAULT_MAX_SECONDS):
+        """
+        Initializes the AntichainInclusion.
+
+        Args:
+            a (NFA_Simulator): Simulator of the included NFA.
+            b (NFA_Simulator): Simulator of the including NFA.
+            max_pairs (int): Maximum number of pairs stored.
+            max_seconds (float): Maximum running time; None disables the limit.
+        """
+        self.a = a
+        self.b = b
+        self.max_pairs = max_pairs
+        self.max_seconds = max_seconds
+        self.pairs = 0
+        # Symbols are matched by name; a symbol missing from B leads B to the empty set
+        self.symbols = [
+            (name, symbol_id, b.symbol_ids.get(name))
+            for name, symbol_id in sorted(a.symbol_ids.items(), key=lambda item: str(item[0]))
+        ]
+
+    def counterexample(self):
+        """
+        Searches for a word accepted by A but not by B.
+
+        Returns:
+            list or None: The symbols of a shortest such word, or None if the language
+                of A is included in that of B.
+
+        Raises:
+            CheckLimitError: If the pair or time budget is exhausted.
+        """
+        a, b = self.a, self.b
+        deadline = None if self.max_seconds is None else time.monotonic() + self.max_seconds
+        antichains = {}  # State of A -> minimal sets of B seen with it
+        parents = []  # Per pair: (parent pair index, symbol name)
+        queue = deque()
+
+        def add(state, states, parent, symbol):
+            chain = antichains.setdefault(state, [])
+            for seen in chain:
+                if seen & ~states == 0:
+                    return None
+            # Supersets no longer prune anything the new set does not
+            chain[:] = [seen for seen in chain if states & ~seen != 0]
+            chain.append(states)
+            parents.append((parent, symbol))
+            index = len(parents) - 1
+            queue.append((state, states, index))
+            return index
+
+        for state in _bits(a.start_set):
+            index = add(state, b.start_set, None, None)
+            if index is not None and self._rejects(state, b.start_set):
+                self.pairs = len(parents)
+                return self._word(parents, index)
+
+        while queue:
+            if len(parents) > self.max_pairs:
+                self.pairs = len(parents)
+                raise CheckLimitError(
+                    f"Gave up after storing {self.max_pairs} state pairs; raise the limit."
+                )
+            if deadline is not None and time.monotonic() > deadline:
+                self.pairs = len(parents)
+                raise CheckLimitError(f"Gave up after {self.max_seconds}s; raise the limit.")
+
+            state, states, index = queue.popleft()
+            for name, a_symbol, b_symbol in self.symbols:
+                row = a.delta.get(a_symbol)
+                if row is None or not row[state]:
+                    continue
+                next_states = b.move(states, b_symbol) if b_symbol is not None else 0
+                for next_state in _bits(row[state]):
+                    child = add(next_state, next_states, index, name)
+                    if child is not None and self._rejects(next_state, next_states):
+                        self.pairs = len(parents)
+                        return self._word(parents, child)
+        self.pairs = len(parents)
+        return None
+
+    def _rejects(self, state, states):
+        return bool(self.a.final_mask >> state & 1) and not states & self.b.final_mask
+
+    @staticmethod
+    def _word(parents, index):
+        word = []
+        while index is not None:
+            parent, symbol = parents[index]
+            if parent is not None:
+                word.append(symbol)
+            index = parent
+        word.reverse()
+        return word
+
+
+def check_inclusion(
+    nfa_a,
+    nfa_b,
+    logger,
+    max_pairs=DEFAULT_MAX_PAIRS,
+    max_seconds=DEFAULT_MAX_SECONDS,
+):
+    """
+    Checks whether every word accepted by NFA A is accepted by NFA B.
+
+    Args:
+        nfa_a (dict): Definition of A, in the schema of NFA_Generator.
+        nfa_b (dict): Definition of B.
+        logger (logging.Logger): Logger for validation errors and the outcome.
+        max_pairs (int): Maximum number of state pairs stored.
+        max_seconds (float): Maximum running time; None disables the limit.
+
+    Returns:
+        dict: "holds" (bool), "counterexample" (a shortest word accepted by A but not
+            by B as a list of symbols, or None), "pairs" and "seconds".
+
+    Raises:
+        ValueError: If a definition is invalid.
+        CheckLimitError: If a limit is exceeded.
+    """
+    start = time.perf_counter()
+    checker = AntichainInclusion(
+        NFA_Simulator(nfa_a, logger), NFA_Simulator(nfa_b, logger), max_pairs, max_seconds
+    )
+    word = checker.counterexample()
+    result = {
+        "holds": word is None,
+        "counterexample": word,
+        "pairs": checker.pairs,
+        "seconds": time.perf_counter() - start,
+    }
+    logger.info(
+        f"Inclusion of '{nfa_a['name']}' in '{nfa_b['name']}': "
+        f"{'holds' if word is None else 'fails on ' + format_word(word)} "
+        f"({checker.pairs} pairs, {result['seconds']:.3f}s)."
+    )
+    return result
+
+
+def check_equivalence(
+    nfa_a,
+    nfa_b,
+    logger,
+    max_pairs=DEFAULT_MAX_PAIRS,
+    max_seconds=DEFAULT_MAX_SECONDS,
+):
+    """
+    Checks whether NFAs A and B accept the same language, with one inclusion check in
+    each direction. If one direction exceeds a limit, the counterexample found by the
+    other one is still returned; it is then not necessarily a shortest one.
+
+    Args:
+        nfa_a (dict): Definition of A, in the schema of NFA_Generator.
+        nfa_b (dict): Definition of B.
+        logger (logging.Logger): Logger for validation errors and the outcome.
+        max_pairs (int): Maximum number of state pairs stored per direction.
+        max_seconds (float): Maximum running time of both directions together.
+
+    Returns:
+        dict: "holds" (bool), "counterexample" (a shortest word accepted by exactly one
+            of them, or None), "accepted_by" ("a" or "b", the automaton accepting the
+            counterexample), "pairs" and "seconds".
+
+    Raises:
+        ValueError: If a definition is invalid.
+        CheckLimitError: If a limit is exceeded before either direction found a
+            counterexample.
+    """
+    start = time.perf_counter()
+    a, b = NFA_Simulator(nfa_a, logger), NFA_Simulator(nfa_b, logger)
+    forward = AntichainInclusion(a, b, max_pairs, max_seconds)
+    backward = AntichainInclusion(b, a, max_pairs, max_seconds)
+    candidates = []
+    limit_error = None
+    for side, checker in (("a", forward), ("b", backward)):
+        if max_seconds is not None:
+            checker.max_seconds = max(max_seconds - (time.perf_counter() - start), 0)
+            if checker.max_seconds == 0 and candidates:
+                break  # Budget spent; the word already found answers the question
+        try:
+            word = checker.counterexample()
+        except CheckLimitError as e:
+            limit_error = e
+            continue
+        if word is not None:
+            candidates.append((len(word), side, word))
+    if not candidates and limit_error is not None:
+        raise limit_error
+
+    # The shorter of the two is a shortest word in the symmetric difference
+    _, side, word = min(candidates) if candidates else (None, None, None)
+    result = {
+        "holds": word is None,
+        "counterexample": word,
+        "accepted_by": side,
+        "pairs": forward.pairs + backward.pairs,
+        "seconds": time.perf_counter() - start,
+    }
+    logger.info(
+        f"Equivalence of '{nfa_a['name']}' and '{nfa_b['name']}': "
+        f"{'holds' if word is None else 'fails on ' + format_word(word)} "
+        f"({result['pairs']} pairs, {result['seconds']:.3f}s)."
+    )
+    return result
+
+
+def format_word(word):
+    """
+    Formats a word for display: 'ε' when empty, the symbols joined when they are all
+    single characters, else separated by spaces.
+    """
+    if not word:
+        return "ε"
+    symbols = [str(symbol) for symbol in word]
+    separator = "" if all(len(symbol) == 1 for symbol in symbols) else " "
+    return f"'{separator.join(symbols)}'"
@@ -0,0 +1,304 @@
+import time
+from itertools import islice
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only MatrixRunner needs it
+    np = None
+
+# converters imports engines; importing the module (not its names) keeps the cycle
+# harmless whichever package is imported first
+from converters import subset_construction
+from .nfa_simulator import NFA_Simulator, _bits
+
+DEFAULT_MAX_TABLE_STATES = 10000
+DEFAULT_CHUNK_SIZE = 100_000
+# Memory allowed for the dense transition matrices of "nfa" mode
+DEFAULT_MAX_MATRIX_BYTES = 256 * 1024 * 1024
+
+
+class MatrixRunner:
+    """
+    Tests large batches of strings against an NFA with NumPy, advancing every string of
+    a batch in one vectorized step per input position.
+
+    Strings are encoded as rows of an integer matrix holding one column id per symbol,
+    padded with a column that leaves the state unchanged, so strings of different
+    lengths share a batch. Symbols outside the alphabet map to a column that leads to
+    the dead state.
+
+    In "dfa" mode the NFA is determinized into a transition table of shape
+    (DFA states, columns), with the dead state as row 0, and a step is a single gather
+    table[states, column]. In "nfa" mode, used when the DFA would exceed max_states,
+    the current states of the batch are a 0/1 matrix of shape (strings, NFA states)
+    and a step multiplies the rows reading each symbol by that symbol's ε-closed
+    transition matrix. These matrices are dense, one per symbol with transitions, so
+    "nfa" mode is refused when they would take more than max_matrix_bytes.
+
+    Attributes:
+        simulator (NFA_Simulator): Supplies the validated model, ε-closures and moves.
+        model (CompiledNFA): The compiled NFA.
+        logger (logging.Logger): Logger for the mode and throughput reports.
+        mode (str): "dfa" or "nfa".
+        columns (int): Number of columns: one per symbol id, then padding, then unknown.
+        pad (int): Column id of the padding.
+        unknown (int): Column id of symbols outside the alphabet.
+        table (numpy.ndarray): In "dfa" mode, the int32 transition table.
+        accepting (numpy.ndarray): In "dfa" mode, whether each DFA state is final.
+        matrices (dict): In "nfa" mode, maps each symbol id with transitions to its
+            float32 transition matrix of shape (NFA states, NFA states).
+        final_vector (numpy.ndarray): In "nfa" mode, 1 for every final NFA state.
+    """
+
+    def __init__(
+        self,
+        nfa_data,
+        logger,
+        model=None,
+        mode="auto",
+        max_states=DEFAULT_MAX_TABLE_STATES,
+        max_matrix_bytes=DEFAULT_MAX_MATRIX_BYTES,
+    ):
+        """
+        Validates the NFA and compiles its transition table or matrices.
+
+        Args:
+            nfa_data (dict or CompiledNFA): The NFA definition, in the schema of
+                NFA_Generator.
+            logger (logging.Logger): Logger for validation errors and reports.
+            model (CompiledNFA, optional): An already compiled and validated form of
+                nfa_data; validation is skipped when given.
+            mode (str): "dfa", "nfa", or "auto" to use "dfa" unless determinizing
+                needs more than max_states states.
+            max_states (int): Cap on the number of DFA states of the table.
+            max_matrix_bytes (int): Cap on the memory of the "nfa" mode matrices.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+            ValueError: If the NFA is invalid, the mode is unknown, mode is "dfa" and
+                the DFA exceeds max_states, or "nfa" mode is needed and its matrices
+                exceed max_matrix_bytes.
+        """
+        if np is None:
+            logger.error("MatrixRunner needs NumPy, which is not installed.")
+            raise ImportError("MatrixRunner needs NumPy; install it with 'pip install numpy'.")
+        if mode not in ("auto", "dfa", "nfa"):
+            logger.error(f"Unknown matrix runner mode '{mode}'.")
+            raise ValueError(f"Unknown matrix runner mode '{mode}'; use 'auto', 'dfa' or 'nfa'.")
+
+        self.simulator = NFA_Simulator(nfa_data, logger, model=model)
+        self.model = self.simulator.model
+        self.logger = logger
+        self.pad = len(self.model.symbols)
+        self.unknown = self.pad + 1
+        self.columns = self.pad + 2
+        self.table = self.accepting = self.matrices = self.final_vector = None
+        self._char_lookup = None
+
+        if mode != "nfa" and self._build_table(max_states):
+            self.mode = "dfa"
+        elif mode == "dfa":
+            logger.error(
+                f"NFA '{self.model.name}' needs more than {max_states} DFA states."
+            )
+            raise ValueError(
+                f"NFA '{self.model.name}' needs more than {max_states} DFA states; "
+                "raise the cap or use mode='nfa'."
+            )
+        else:
+            self._build_matrices(max_matrix_bytes)
+            self.mode = "nfa"
+        self._build_char_lookup()
+        logger.info(
+            f"NFA '{self.model.name}': matrix runner in {self.mode} mode "
+            f"({len(self.table) if self.mode == 'dfa' else len(self.model.states)} states, "
+            f"{len(self.simulator.symbol_ids)} symbols)."
+        )
+
+    def encode(self, words):
+        """
+        Encodes words as a padded matrix of column ids.
+
+        Args:
+            words (list): The inputs. Strings are read one character per symbol, as by
+                NFA_Simulator.accepts, and are encoded without a Python loop when every
+                symbol is a single character and no string contains NUL. Other
+                sequences are read one item per symbol.
+
+        Returns:
+            numpy.ndarray: An int32 matrix of shape (len(words), longest length).
+        """
+        lookup = self._char_lookup
+        if lookup is not None and all(
+            isinstance(word, str) and "\0" not in word for word in words
+        ):
+            # Fixed-width UTF-32 array, NUL-padded, viewed as code points. Code points
+            # beyond the lookup table all land on its last entry, the unknown column.
+            # NumPy cannot tell a NUL of the input from its padding, so words holding
+            # NUL take the path below, where it is an unknown symbol.
+            text = np.array(words, dtype=str)
+            width = max(text.dtype.itemsize // 4, 1)
+            codes = text.view(np.uint32).reshape(len(words), width)
+            return lookup[np.minimum(codes, len(lookup) - 1)]
+
+        symbol_ids = self.simulator.symbol_ids
+        unknown = self.unknown
+        rows = [[symbol_ids.get(symbol, unknown) for symbol in word] for word in words]
+        encoded = np.full((len(rows), max(map(len, rows), default=0)), self.pad, dtype=np.int32)
+        for row, symbols in zip(encoded, rows):
+            row[: len(symbols)] = symbols
+        return encoded
+
+    def run(self, encoded):
+        """
+        Runs a batch of encoded words.
+
+        Args:
+            encoded (numpy.ndarray): Column ids of shape (words, length), as returned
+                by encode.
+
+        Returns:
+            numpy.ndarray: One bool per word, True if it is accepted.
+        """
+        # Column-major, so each step reads one contiguous column
+        encoded = np.asfortranarray(encoded, dtype=np.int32)
+        if self.mode == "dfa":
+            flat = self.table.ravel()
+            width = self.columns
+            states = np.full(len(encoded), 1, dtype=np.int32)
+            for column in encoded.T:
+                states = flat[states * width + column]
+            return self.accepting[states]
+
+        states = np.zeros((len(encoded), len(self.model.states)), dtype=np.float32)
+        states[:, list(_bits(self.simulator.start_set))] = 1
+        for column in encoded.T:
+            next_states = np.zeros_like(states)
+            for symbol in np.unique(column):
+                rows = column == symbol
+                if symbol == self.pad:
+                    next_states[rows] = states[rows]
+                elif symbol in self.matrices:
+                    next_states[rows] = states[rows] @ self.matrices[symbol]
+                # Other columns (ε, unknown symbols) lead nowhere; the rows stay 0
+            # Counts of paths are irrelevant; keep the entries 0/1
+            states = np.minimum(next_states, 1, out=next_states)
+        return states @ self.final_vector > 0
+
+    def accepts_many(self, words, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Checks a batch of words, encoding and running them chunk_size at a time so
+        memory stays bounded.
+
+        Args:
+            words (iterable): The inputs, as accepted by encode.
+            chunk_size (int): Number of words encoded and run together.
+
+        Returns:
+            numpy.ndarray: One bool per word, in input order.
+        """
+        words = iter(words)
+        results = [
+            self.run(self.encode(chunk))
+            for chunk in iter(lambda: list(islice(words, chunk_size)), [])
+        ]
+        return np.concatenate(results) if results else np.zeros(0, dtype=bool)
+
+    def run_batch(self, words, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Checks a batch of words and logs the achieved throughput.
+
+        Args:
+            words (iterable): The inputs, as accepted by encode.
+            chunk_size (int): Number of words encoded and run together.
+
+        Returns:
+            tuple: (results, stats) where results holds one bool per word and stats is a
+                dict with the count, accepted count, elapsed seconds and strings/second.
+        """
+        start = time.perf_counter()
+        results = self.accepts_many(words, chunk_size)
+        elapsed = time.perf_counter() - start
+        stats = {
+            "strings": len(results),
+            "accepted": int(results.sum()),
+            "seconds": elapsed,
+            "strings_per_second": len(results) / elapsed if elapsed > 0 else float("inf"),
+        }
+        self.logger.info(
+            f"NFA '{self.model.name}': tested {stats['strings']} strings "
+            f"({stats['accepted']} accepted) in {elapsed:.3f}s, "
+            f"{stats['strings_per_second']:,.0f} strings/s ({self.mode} mode)."
+        )
+        return results, stats
+
+    def _build_table(self, max_states):
+        """
+        Determinizes the NFA into the transition table with the subset construction of
+        converters. Returns False, building nothing, if more than max_states states are
+        needed.
+        """
+        dfa = subset_construction.LazyDFA(self.simulator, max_states)
+        try:
+            dfa.explore()
+        except subset_construction.StateExplosionError:
+            return False
+
+        # Row i + 1 holds DFA state i; ε and unknown symbols lead to the dead state 0
+        table = np.zeros((len(dfa.subsets) + 1, self.columns), dtype=np.int32)
+        table[:, self.pad] = np.arange(len(table))
+        for state, targets in enumerate(dfa.transitions):
+            row = table[state + 1]
+            for symbol_id, target in targets.items():
+                if target is not None:
+                    row[symbol_id] = target + 1
+        self.table = table
+        self.accepting = np.array(
+            [False] + [dfa.is_final(state) for state in range(len(dfa.subsets))]
+        )
+        return True
+
+    def _build_matrices(self, max_bytes):
+        """
+        Builds the ε-closed transition matrix of every symbol with transitions, after
+        checking that they fit in max_bytes.
+        """
+        num_states = len(self.model.states)
+        delta = self.simulator.delta
+        needed = len(delta) * num_states * num_states * np.dtype(np.float32).itemsize
+        if needed > max_bytes:
+            message = (
+                f"NFA '{self.model.name}' needs {needed / 2**20:,.0f} MB of transition "
+                f"matrices in 'nfa' mode, more than max_matrix_bytes "
+                f"({max_bytes / 2**20:,.0f} MB); use NFA_Simulator or raise the limit."
+            )
+            self.logger.error(message)
+            raise ValueError(message)
+
+        self.matrices = {}
+        for symbol_id, row in delta.items():
+            matrix = self.matrices[symbol_id] = np.zeros(
+                (num_states, num_states), dtype=np.float32
+            )
+            for state, targets in enumerate(row):
+                matrix[state, list(_bits(targets))] = 1
+        self.final_vector = np.zeros(num_states, dtype=np.float32)
+        self.final_vector[list(_bits(self.simulator.final_mask))] = 1
+
+    def _build_char_lookup(self):
+        """
+        Prepares the code point -> column table used to encode strings, if every symbol
+        is a single character. NUL, which pads the strings, maps to the padding column;
+        encode never uses the table for words that contain NUL.
+        """
+        symbol_ids = self.simulator.symbol_ids
+        if not symbol_ids or not all(
+            isinstance(symbol, str) and len(symbol) == 1 and symbol != "\0"
+            for symbol in symbol_ids
+        ):
+            return
+        lookup = np.full(max(map(ord, symbol_ids)) + 2, self.unknown, dtype=np.int32)
+        for symbol, symbol_id in symbol_ids.items():
+            lookup[ord(symbol)] = symbol_id
+        lookup[0] = self.pad
+        self._char_lookup = lookup
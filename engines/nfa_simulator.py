@@ -0,0 +1,238 @@
+import time
+
+from models import CompiledNFA
+from validators import validate_nfa
+
+
+class NFA_Simulator:
+    """
+    Decides whether input strings are accepted by an NFA defined in the same YAML schema
+    as NFA_Generator.
+
+    Sets of states are Python ints used as bitsets (bit q set <=> state id q is in the
+    set). ε-closures are precomputed per state and folded into the per-symbol transition
+    rows, so every step of the simulation is an OR over the rows of the current states.
+    Steps are memoized per (state set, symbol), which turns repeated runs into dict
+    lookups, i.e. a lazily built DFA.
+
+    Attributes:
+        model (CompiledNFA): The compiled NFA.
+        logger (logging.Logger): Logger for throughput reports.
+        symbol_ids (dict): Maps each input symbol (everything but 'ε') to its id.
+        closures (list): ε-closure bitset of every state.
+        delta (dict): Maps each symbol id to a list holding, per state, the ε-closed
+            bitset of states reachable on that symbol.
+        start_set (int): ε-closure of the start state.
+        final_mask (int): Bitset of the final states.
+    """
+
+    def __init__(self, nfa_data, logger, model=None, max_cached_steps=1_000_000):
+        """
+        Validates and compiles the NFA and precomputes the ε-closures.
+
+        Args:
+            nfa_data (dict or CompiledNFA): The NFA definition.
+            logger (logging.Logger): Logger for validation errors and throughput reports.
+            model (CompiledNFA, optional): An already compiled and validated form of
+                nfa_data; validation is skipped when given.
+            max_cached_steps (int): Memoized steps kept before the step cache is reset.
+
+        Raises:
+            ValueError: If the NFA definition is invalid.
+        """
+        self.logger = logger
+        if isinstance(nfa_data, CompiledNFA):
+            model = nfa_data
+        if model is None:
+            model = validate_nfa(nfa_data, logger)
+        self.model = model
+        self.max_cached_steps = max_cached_steps
+
+        num_states = len(model.states)
+        epsilon_edges = [[] for _ in range(num_states)]
+        symbol_edges = {}
+        for s, y, d in zip(model.src, model.sym, model.dst):
+            if y == model.epsilon:
+                epsilon_edges[s].append(d)
+            else:
+                rows = symbol_edges.get(y)
+                if rows is None:
+                    rows = symbol_edges[y] = [[] for _ in range(num_states)]
+                rows[s].append(d)
+
+        self.closures = _epsilon_closures(epsilon_edges)
+        self.symbol_ids = {
+            name: index
+            for index, name in enumerate(model.symbols.names)
+            if index != model.epsilon
+        }
+        self.delta = {
+            y: [self._closure_of(targets) for targets in rows]
+            for y, rows in symbol_edges.items()
+        }
+        self.start_set = self.closures[model.start]
+        self.final_mask = 0
+        for state in model.finals:
+            self.final_mask |= 1 << state
+        self._steps = {y: {} for y in self.symbol_ids.values()}
+        self._cached_steps = 0
+
+    def step(self, states, symbol_id):
+        """
+        Computes the ε-closed set of states reachable from a set on one symbol.
+
+        Args:
+            states (int): Bitset of the current states.
+            symbol_id (int): Id of the input symbol.
+
+        Returns:
+            int: Bitset of the next states (0 if the run is dead).
+        """
+        cache = self._steps[symbol_id]
+        result = cache.get(states)
+        if result is None:
+            result = self.move(states, symbol_id)
+            if self._cached_steps >= self.max_cached_steps:
+                for steps in self._steps.values():
+                    steps.clear()
+                self._cached_steps = 0
+            cache[states] = result
+            self._cached_steps += 1
+        return result
+
+    def move(self, states, symbol_id):
+        """
+        Same as step, without memoization. Used by callers that keep their own table of
+        visited state sets.
+
+        Args:
+            states (int): Bitset of the current states.
+            symbol_id (int): Id of the input symbol.
+
+        Returns:
+            int: Bitset of the next states (0 if the run is dead).
+        """
+        row = self.delta.get(symbol_id)
+        result = 0
+        if row is not None:
+            while states:
+                low = states & -states
+                result |= row[low.bit_length() - 1]
+                states ^= low
+        return result
+
+    def accepts(self, word):
+        """
+        Checks whether the NFA accepts a word.
+
+        Args:
+            word (str or sequence): The input. A str is read one character per symbol;
+                pass a list or tuple when symbols are longer than one character.
+
+        Returns:
+            bool: True if some run ends in a final state.
+        """
+        states = self.start_set
+        symbol_ids = self.symbol_ids
+        steps = self._steps
+        for symbol in word:
+            symbol_id = symbol_ids.get(symbol)
+            if symbol_id is None:
+                return False
+            next_states = steps[symbol_id].get(states)
+            if next_states is None:
+                next_states = self.step(states, symbol_id)
+            states = next_states
+            if not states:
+                return False
+        return bool(states & self.final_mask)
+
+    def accepts_many(self, words):
+        """
+        Checks a batch of words against the NFA. Duplicate words are only run once.
+
+        Args:
+            words (iterable): The inputs, as accepted by accepts.
+
+        Returns:
+            list: One bool per word, in input order.
+        """
+        accepts = self.accepts
+        seen = {}
+        results = []
+        for word in words:
+            key = word if isinstance(word, str) else tuple(word)
+            accepted = seen.get(key)
+            if accepted is None:
+                accepted = seen[key] = accepts(word)
+            results.append(accepted)
+        return results
+
+    def run_batch(self, words):
+        """
+        Checks a batch of words and logs the achieved throughput.
+
+        Args:
+            words (iterable): The inputs, as accepted by accepts.
+
+        Returns:
+            tuple: (results, stats) where results holds one bool per word and stats is a
+                dict with the count, accepted count, elapsed seconds and strings/second.
+        """
+        start = time.perf_counter()
+        results = self.accepts_many(words)
+        elapsed = time.perf_counter() - start
+        stats = {
+            "strings": len(results),
+            "accepted": sum(results),
+            "seconds": elapsed,
+            "strings_per_second": len(results) / elapsed if elapsed > 0 else float("inf"),
+        }
+        self.logger.info(
+            f"NFA '{self.model.name}': tested {stats['strings']} strings "
+            f"({stats['accepted']} accepted) in {elapsed:.3f}s, "
+            f"{stats['strings_per_second']:,.0f} strings/s."
+        )
+        return results, stats
+
+    def _closure_of(self, targets):
+        mask = 0
+        closures = self.closures
+        for target in targets:
+            mask |= closures[target]
+        return mask
+
+
+def _epsilon_closures(epsilon_edges):
+    """
+    Computes the ε-closure bitset of every state with an iterative DFS per state.
+
+    Args:
+        epsilon_edges (list): ε-successor ids of every state.
+
+    Returns:
+        list: The closure bitset of every state.
+    """
+    closures = []
+    for state, successors in enumerate(epsilon_edges):
+        mask = 1 << state
+        if successors:
+            stack = [state]
+            while stack:
+                for target in epsilon_edges[stack.pop()]:
+                    bit = 1 << target
+                    if not mask & bit:
+                        mask |= bit
+                        stack.append(target)
+        closures.append(mask)
+    return closures
+
+
+def _bits(mask):
+    """
+    Yields the indices of the set bits of an int, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
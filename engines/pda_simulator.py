@@ -0,0 +1,263 @@
+import time
+from collections import deque
+
+from models import EPSILON
+from validators import validate_pda
+
+# Stack depth allowed beyond what reading the input can push, for ε-moves
+DEFAULT_STACK_SLACK = 10_000
+
+
+class SimulationLimitError(ValueError):
+    """
+    Raised when a PDA run exceeds its configuration budget, or rejects only after
+    configurations were cut off at the stack depth limit (so the answer is unknown).
+    """
+
+
+class PDA_Simulator:
+    """
+    Decides whether input strings are accepted by a PDA defined in the same YAML schema
+    as PDA_Generator: transitions[state][input][stack_symbol] -> [[next_state, push]].
+
+    A transition pops stack_symbol (nothing if it is 'ε') and pushes the characters of
+    push so that the first character ends up on top ('ε' pushes nothing). Input 'ε'
+    transitions do not consume input.
+
+    Configurations are explored breadth-first, one input position at a time. Stacks
+    are hash-consed: each distinct stack is an integer id standing for its top symbol
+    plus the id of the stack below, so pushes and pops are O(1), identical stacks are
+    shared, and a configuration is memoized as the (state, position, stack id) triple.
+    The whole stack id is memoized, not only its top symbols, so two configurations
+    are merged only when their stacks are identical. Only the visited set of the
+    current position is kept, so that set stays bounded by the configurations of one
+    position; the table of distinct stacks, however, grows with the stacks that are
+    built, e.g. linearly in the input length for aⁿbⁿ.
+
+    Attributes:
+        model (CompiledPDA): The compiled PDA.
+        logger (logging.Logger): Logger for throughput reports.
+        max_stack_depth (int): Configurations with a deeper stack are not explored, or
+            None to allow, per word, DEFAULT_STACK_SLACK plus the longest push times the
+            length of the word. Inputs of any length can then be decided, while an
+            ε-loop that keeps pushing is still cut off.
+        max_configurations (int): Configurations explored per word before giving up.
+        accept_by (str): "final_state" or "empty_stack".
+    """
+
+    def __init__(
+        self,
+        pda_data,
+        logger,
+        max_stack_depth=None,
+        max_configurations=1_000_000,
+        accept_by="final_state",
+    ):
+        """
+        Validates and compiles the PDA and indexes its transitions.
+
+        Args:
+            pda_data (dict): The PDA definition.
+            logger (logging.Logger): Logger for validation errors and throughput reports.
+            max_stack_depth (int, optional): Stack depth limit; None derives it from the
+                length of each word.
+            max_configurations (int): Configuration budget per word.
+            accept_by (str): "final_state" accepts when a final state is reached after
+                the whole input; "empty_stack" when the stack is empty instead.
+
+        Raises:
+            ValueError: If the PDA definition is invalid.
+        """
+        self.model = model = validate_pda(pda_data, logger)
+        self.logger = logger
+        self.max_stack_depth = max_stack_depth
+        self.max_configurations = max_configurations
+        self.accept_by = accept_by
+
+        self.symbol_ids = {
+            name: index
+            for index, name in enumerate(model.input_symbols.names)
+            if index != model.epsilon
+        }
+
+        # Each push string becomes the tuple of stack ids to push, bottom first
+        stack_ids = dict(model.stack_symbols.ids)
+        pushes = []
+        for operation in model.pushes.names:
+            symbols = []
+            for char in operation:
+                if char == EPSILON:
+                    continue
+                if char not in stack_ids:
+                    stack_ids[char] = len(stack_ids)
+                symbols.append(stack_ids[char])
+            pushes.append(tuple(reversed(symbols)))
+        self._longest_push = max(map(len, pushes), default=0)
+
+        # rules[state][top] -> (epsilon moves, {input id: moves}); top -1 pops nothing
+        no_pop = model.stack_symbols.get(EPSILON)
+        self._rules = [dict() for _ in range(len(model.states))]
+        for s, i, t, d, p in zip(model.src, model.inp, model.top, model.dst, model.push):
+            top = -1 if t == no_pop else t
+            moves = self._rules[s].get(top)
+            if moves is None:
+                moves = self._rules[s][top] = ([], {})
+            move = (d, pushes[p], top != -1)
+            if i == model.epsilon:
+                moves[0].append(move)
+            elif i in moves[1]:
+                moves[1][i].append(move)
+            else:
+                moves[1][i] = [move]
+
+    def accepts(self, word):
+        """
+        Checks whether the PDA accepts a word.
+
+        Args:
+            word (str or sequence): The input. A str is read one character per symbol.
+
+        Returns:
+            bool: True if an accepting configuration is reachable.
+
+        Raises:
+            SimulationLimitError: If the configuration budget is exhausted, or the word
+                is rejected after configurations were cut off at the stack depth limit.
+        """
+        symbol_ids = self.symbol_ids
+        encoded = []
+        for symbol in word:
+            symbol_id = symbol_ids.get(symbol)
+            if symbol_id is None:
+                return False
+            encoded.append(symbol_id)
+
+        # Hash-consed stacks: id 0 is the empty stack
+        tops = [-1]
+        below = [0]
+        depths = [0]
+        interned = {}
+
+        def push(stack, symbols):
+            for symbol in symbols:
+                key = (symbol, stack)
+                node = interned.get(key)
+                if node is None:
+                    node = interned[key] = len(tops)
+                    tops.append(symbol)
+                    below.append(stack)
+                    depths.append(depths[stack] + 1)
+                stack = node
+            return stack
+
+        model = self.model
+        finals = model.finals
+        rules = self._rules
+        by_empty_stack = self.accept_by == "empty_stack"
+        max_depth = self.max_stack_depth
+        if max_depth is None:
+            max_depth = DEFAULT_STACK_SLACK + self._longest_push * len(encoded)
+        budget = self.max_configurations
+        truncated = False
+
+        frontier = {(model.start, push(0, (model.initial_stack,)))}
+        length = len(encoded)
+        for position in range(length + 1):
+            symbol_id = encoded[position] if position < length else None
+            visited = set(frontier)
+            queue = deque(frontier)
+            frontier = set()
+            budget -= len(queue)
+            while queue:
+                state, stack = queue.popleft()
+                if position == length and (
+                    stack == 0 if by_empty_stack else state in finals
+                ):
+                    return True
+
+                state_rules = rules[state]
+                for top in (tops[stack], -1) if stack else (-1,):
+                    moves = state_rules.get(top)
+                    if moves is None:
+                        continue
+                    epsilon_moves, input_moves = moves
+                    for is_epsilon, candidates in (
+                        (True, epsilon_moves),
+                        (False, input_moves.get(symbol_id, ())),
+                    ):
+                        for target, pushed, pops in candidates:
+                            new_stack = push(below[stack] if pops else stack, pushed)
+                            if depths[new_stack] > max_depth:
+                                truncated = True
+                                continue
+                            config = (target, new_stack)
+                            if is_epsilon:
+                                if config not in visited:
+                                    visited.add(config)
+                                    queue.append(config)
+                                    budget -= 1
+                            else:
+                                frontier.add(config)
+                if budget < 0:
+                    raise SimulationLimitError(
+                        f"PDA '{model.name}' explored more than "
+                        f"{self.max_configurations} configurations at input position "
+                        f"{position}; raise max_configurations to continue."
+                    )
+            if not frontier:
+                break
+
+        if truncated:
+            raise SimulationLimitError(
+                f"PDA '{model.name}' rejected only after cutting off configurations "
+                f"deeper than {max_depth} stack symbols; the answer is inconclusive."
+            )
+        return False
+
+    def accepts_many(self, words):
+        """
+        Checks a batch of words against the PDA. Duplicate words are only run once.
+
+        Args:
+            words (iterable): The inputs, as accepted by accepts.
+
+        Returns:
+            list: One bool per word, in input order.
+        """
+        accepts = self.accepts
+        seen = {}
+        results = []
+        for word in words:
+            key = word if isinstance(word, str) else tuple(word)
+            accepted = seen.get(key)
+            if accepted is None:
+                accepted = seen[key] = accepts(word)
+            results.append(accepted)
+        return results
+
+    def run_batch(self, words):
+        """
+        Checks a batch of words and logs the achieved throughput.
+
+        Args:
+            words (iterable): The inputs, as accepted by accepts.
+
+        Returns:
+            tuple: (results, stats) where results holds one bool per word and stats is a
+                dict with the count, accepted count, elapsed seconds and strings/second.
+        """
+        start = time.perf_counter()
+        results = self.accepts_many(words)
+        elapsed = time.perf_counter() - start
+        stats = {
+            "strings": len(results),
+            "accepted": sum(results),
+            "seconds": elapsed,
+            "strings_per_second": len(results) / elapsed if elapsed > 0 else float("inf"),
+        }
+        self.logger.info(
+            f"PDA '{self.model.name}': tested {stats['strings']} strings "
+            f"({stats['accepted']} accepted) in {elapsed:.3f}s, "
+            f"{stats['strings_per_second']:,.0f} strings/s."
+        )
+        return results, stats
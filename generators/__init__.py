@@ -1,2 +1,4 @@
+from .batch_renderer import DEFAULT_BATCH_SIZE, BatchRenderer
 from .nfa_generator import NFA_Generator
 from .pda_generator import PDA_Generator
+from .render_cache import RenderCache
@@ -0,0 +1,151 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+from .dot_writer import _run_engine, render_source
+from .layout import DEFAULT_LARGE_GRAPH_ENGINE, render_with_fallback
+
+DEFAULT_BATCH_SIZE = 32
+
+
+class BatchRenderer:
+    """
+    Renders many graphs with a single Graphviz process instead of one per graph.
+
+    Submitted graphs are queued until flush, which writes them as consecutive graphs
+    of one DOT file and runs the layout engine once with -O. Graphviz names the output
+    of the first graph '<file>.<format>' and that of the n-th '<file>.<n>.<format>';
+    each output is then moved to the path the graph was submitted with. A graph whose
+    output is missing (e.g. because an earlier graph in the file failed to parse, or
+    the batch timed out) is rendered on its own, falling back to a cheaper layout if
+    it times out as well, so one bad graph does not fail the rest of the batch.
+
+    Attributes:
+        logger (logging.Logger): Logger for batch progress.
+        timeout (float): Seconds before a batch or single layout is aborted, or None.
+        fallback_engine (str): Layout engine of the retry after a single graph timed
+            out.
+    """
+
+    def __init__(self, logger, timeout=None, fallback_engine=DEFAULT_LARGE_GRAPH_ENGINE):
+        """
+        Initializes the BatchRenderer.
+
+        Args:
+            logger (logging.Logger): Logger for batch progress.
+            timeout (float, optional): Seconds before a batch or single layout is
+                aborted.
+            fallback_engine (str): Layout engine of the retry after a single graph
+                timed out.
+        """
+        self.logger = logger
+        self.timeout = timeout
+        self.fallback_engine = fallback_engine
+        self._pending = {}
+
+    def submit(self, graph, output_path, callback=None):
+        """
+        Saves the DOT source of a graph to output_path and queues it for rendering to
+        output_path.<format>, like DotWriter.render but deferred until flush.
+
+        Args:
+            graph (DotWriter): The graph.
+            output_path (str): Path of the DOT file, without the image extension.
+            callback (callable, optional): Called with the image path once it is
+                rendered.
+
+        Returns:
+            str: The path the image will be rendered to.
+        """
+        source = graph.source
+        with open(output_path, "w", encoding="utf-8") as file:
+            file.write(source)
+        image_path = f"{output_path}.{graph.format}"
+        self._pending.setdefault((graph.format, graph.engine), []).append(
+            (graph, source, output_path, image_path, callback)
+        )
+        return image_path
+
+    def __len__(self):
+        return sum(len(graphs) for graphs in self._pending.values())
+
+    def flush(self):
+        """
+        Renders every queued graph, one Graphviz run per output format and engine.
+
+        Returns:
+            dict: Maps each image path to None on success or to the error message.
+        """
+        outcomes = {}
+        pending, self._pending = self._pending, {}
+        for (fmt, engine), graphs in pending.items():
+            if len(graphs) == 1:
+                outcomes.update(self._render_each(graphs, fmt))
+                continue
+
+            directory = os.path.dirname(graphs[0][2]) or "."
+            work_dir = tempfile.mkdtemp(prefix=".batch_", dir=directory)
+            try:
+                batch_path = os.path.join(work_dir, "batch.gv")
+                with open(batch_path, "w", encoding="utf-8") as file:
+                    file.writelines(graph[1] for graph in graphs)
+                try:
+                    _run_engine([engine, f"-T{fmt}", "-O", batch_path], "", self.timeout)
+                except (RuntimeError, subprocess.TimeoutExpired) as e:
+                    # Outputs written before the failure are still used below
+                    self.logger.warning(f"Batch render of {len(graphs)} graphs failed: {e}")
+
+                leftovers = []
+                for index, graph in enumerate(graphs):
+                    suffix = f".{index + 1}" if index else ""
+                    rendered = f"{batch_path}{suffix}.{fmt}"
+                    if not os.path.exists(rendered):
+                        leftovers.append(graph)
+                        continue
+                    os.replace(rendered, graph[3])
+                    outcomes[graph[3]] = self._finish(graph)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+            self.logger.debug(
+                f"Rendered {len(graphs) - len(leftovers)} graphs in one '{engine}' run."
+            )
+            if leftovers:
+                self.logger.warning(
+                    f"Rendering {len(leftovers)} of {len(graphs)} graphs separately."
+                )
+                outcomes.update(self._render_each(leftovers, fmt))
+        return outcomes
+
+    def _render_each(self, graphs, fmt):
+        outcomes = {}
+        for graph in graphs:
+            dot_graph, _, output_path, image_path, _ = graph
+            try:
+                # The source was saved as submitted; a fallback layout only changes
+                # the image
+                render_with_fallback(
+                    dot_graph,
+                    lambda retry, timeout: render_source(
+                        retry.source, output_path, fmt, retry.engine, timeout
+                    ),
+                    self.timeout,
+                    self.fallback_engine,
+                    self.logger,
+                )
+            except (RuntimeError, subprocess.TimeoutExpired) as e:
+                outcomes[image_path] = str(e)
+                continue
+            outcomes[image_path] = self._finish(graph)
+        return outcomes
+
+    @staticmethod
+    def _finish(graph):
+        _, _, _, image_path, callback = graph
+        if callback is not None:
+            try:
+                callback(image_path)
+            except Exception as e:
+                return str(e)
+        return None
@@ -0,0 +1,235 @@
+import os
+import re
+import subprocess
+import threading
+
+# Same quoting rules as the graphviz package, so the DOT text is identical to what
+# graphviz.Digraph produces for the same calls.
+_ID = re.compile(r"([a-zA-Z_][a-zA-Z0-9_]*|-?(\.[0-9]+|[0-9]+(\.[0-9]*)?))$")
+_HTML_STRING = re.compile(r"<.*>$", re.DOTALL)
+_UNESCAPED_QUOTE = re.compile(r'(?<!\\)(?:\\\\)*\\?"')
+_KEYWORDS = {"node", "edge", "graph", "digraph", "subgraph", "strict"}
+
+
+def quote(identifier):
+    """
+    Returns a DOT identifier for a string, quoting it if needed.
+
+    Args:
+        identifier: The identifier; non-strings are converted with str().
+
+    Returns:
+        str: The identifier as it should appear in DOT text.
+    """
+    identifier = str(identifier)
+    if _HTML_STRING.match(identifier):
+        return identifier
+    if not _ID.match(identifier) or identifier.lower() in _KEYWORDS:
+        return '"' + _UNESCAPED_QUOTE.sub(r'\\"', identifier) + '"'
+    return identifier
+
+
+class DotWriter:
+    """
+    Accumulates the DOT text of a directed graph as a list of lines and joins it once.
+
+    The API mirrors the parts of graphviz.Digraph used by the generators, without its
+    per-call argument handling. Quoted identifiers are memoized, since state names
+    repeat on every edge.
+
+    Attributes:
+        name (str): Graph name, or None.
+        graph_attr (dict): Graph attributes; may be changed until the source is read.
+        format (str): Default output format for render and pipe.
+        engine (str): Default Graphviz layout engine.
+    """
+
+    def __init__(self, name=None, graph_attr=None, format="png", engine="dot"):
+        """
+        Initializes the DotWriter.
+
+        Args:
+            name (str, optional): Graph name written after 'digraph'.
+            graph_attr (dict, optional): Graph attributes.
+            format (str): Default output format.
+            engine (str): Default layout engine.
+        """
+        self.name = name
+        self.graph_attr = dict(graph_attr or {})
+        self.format = format
+        self.engine = engine
+        self._quoted = {}
+        self._lines = []
+
+    def node(self, name, label=None, **attrs):
+        """
+        Adds a node statement.
+        """
+        attributes = self._attributes(label, attrs)
+        line = f"\t{self._quote(name)} [{attributes}]\n" if attributes else f"\t{self._quote(name)}\n"
+        self._lines.append(line)
+
+    def edge(self, tail, head, label=None, **attrs):
+        """
+        Adds an edge statement.
+        """
+        attributes = self._attributes(label, attrs)
+        edge = f"\t{self._quote(tail)} -> {self._quote(head)}"
+        self._lines.append(f"{edge} [{attributes}]\n" if attributes else f"{edge}\n")
+
+    def edges(self, edges):
+        """
+        Adds many labeled edges at once.
+
+        Args:
+            edges (iterable): (tail, head, label) tuples.
+        """
+        q = self._quote
+        self._lines.extend(
+            f"\t{q(tail)} -> {q(head)} [label={q(label)}]\n" for tail, head, label in edges
+        )
+
+    @property
+    def source(self):
+        """
+        Returns the complete DOT text.
+        """
+        if self.name is not None:
+            header = f"digraph {quote(self.name)} {{\n"
+        else:
+            header = "digraph {\n"
+        if self.graph_attr:
+            header += f"\tgraph [{self._attributes(None, self.graph_attr)}]\n"
+        return header + "".join(self._lines) + "}\n"
+
+    def save(self, path):
+        """
+        Writes the DOT text to a file.
+
+        Args:
+            path (str): Destination path.
+
+        Returns:
+            str: The path.
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.source)
+        return path
+
+    def render(self, output_path, format=None, engine=None, timeout=None):
+        """
+        Saves the DOT text to output_path and renders it to output_path.<format>, the
+        same layout as graphviz.Digraph.render.
+
+        Args:
+            output_path (str): Path of the DOT file, without the image extension.
+            format (str, optional): Output format; defaults to self.format.
+            engine (str, optional): Layout engine; defaults to self.engine.
+            timeout (float, optional): Seconds before the layout is aborted.
+
+        Returns:
+            str: Path of the rendered image.
+        """
+        source = self.source
+        with open(output_path, "w", encoding="utf-8") as file:
+            file.write(source)
+        return render_source(
+            source, output_path, format or self.format, engine or self.engine, timeout
+        )
+
+    def pipe(self, format=None, engine=None, timeout=None):
+        """
+        Renders the graph in memory.
+
+        Returns:
+            bytes: The rendered output.
+        """
+        return pipe_source(self.source, format or self.format, engine or self.engine, timeout)
+
+    def _quote(self, identifier):
+        quoted = self._quoted.get(identifier)
+        if quoted is None:
+            quoted = self._quoted[identifier] = quote(identifier)
+        return quoted
+
+    def _attributes(self, label, attrs):
+        parts = [f"label={self._quote(label)}"] if label is not None else []
+        parts.extend(
+            f"{key}={self._quote(value)}"
+            for key, value in sorted(attrs.items())
+            if value is not None
+        )
+        return " ".join(parts)
+
+
+def render_source(source, output_path, format="png", engine="dot", timeout=None):
+    """
+    Renders DOT text to output_path.<format>, sending it to the layout engine through
+    its stdin in a single write. The image is written under a temporary name and moved
+    into place, so an existing file at that path (possibly hardlinked elsewhere) is
+    replaced rather than truncated.
+
+    Args:
+        source (str): The DOT text.
+        output_path (str): Output path without the extension.
+        format (str): Output format.
+        engine (str): Layout engine executable, e.g. "dot" or "sfdp".
+        timeout (float, optional): Seconds before the layout is aborted.
+
+    Returns:
+        str: Path of the rendered image.
+
+    Raises:
+        RuntimeError: If the engine is missing or fails.
+        subprocess.TimeoutExpired: If the timeout is exceeded.
+    """
+    image_path = f"{output_path}.{format}"
+    tmp_path = f"{image_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        _run_engine([engine, f"-T{format}", "-o", tmp_path], source, timeout)
+        os.replace(tmp_path, image_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return image_path
+
+
+def pipe_source(source, format="png", engine="dot", timeout=None):
+    """
+    Renders DOT text in memory through a pipe, without temporary files.
+
+    Args:
+        source (str): The DOT text.
+        format (str): Output format.
+        engine (str): Layout engine executable.
+        timeout (float, optional): Seconds before the layout is aborted.
+
+    Returns:
+        bytes: The rendered output.
+
+    Raises:
+        RuntimeError: If the engine is missing or fails.
+        subprocess.TimeoutExpired: If the timeout is exceeded.
+    """
+    return _run_engine([engine, f"-T{format}"], source, timeout)
+
+
+def _run_engine(command, source, timeout):
+    try:
+        completed = subprocess.run(
+            command,
+            input=source.encode("utf-8"),
+            capture_output=True,
+            timeout=timeout,
+        )
+    except FileNotFoundError:
+        raise RuntimeError(
+            f"Graphviz executable '{command[0]}' not found; make sure Graphviz is installed "
+            "and on your PATH."
+        ) from None
+    if completed.returncode != 0:
+        stderr = completed.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(
+            f"'{' '.join(command)}' failed with exit status {completed.returncode}: {stderr}"
+        )
+    return completed.stdout
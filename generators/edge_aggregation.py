@@ -0,0 +1,153 @@
+DEFAULT_MAX_LABEL_LENGTH = 60
+DEFAULT_MAX_LABEL_LINES = 10
+
+# Runs of consecutive characters are only compressed within one of these classes
+_RANGE_CLASSES = ("0123456789", "abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+
+def group_edges(edges):
+    """
+    Groups transitions by (source, target), keeping first-seen order of both the pairs
+    and their labels and dropping duplicate labels.
+
+    Args:
+        edges (iterable): (source, target, label) tuples.
+
+    Returns:
+        dict: Maps (source, target) to the list of labels.
+    """
+    groups = {}
+    for source, target, label in edges:
+        labels = groups.get((source, target))
+        if labels is None:
+            labels = groups[(source, target)] = {}
+        labels[label] = None  # dicts keep insertion order and drop duplicates
+    return {pair: list(labels) for pair, labels in groups.items()}
+
+
+def compress_symbols(symbols):
+    """
+    Compresses runs of three or more consecutive digits or letters into ranges such as
+    'a-z' or '0-9'. Other symbols keep their order after the compressed ones.
+
+    Args:
+        symbols (list): Distinct symbols (strings).
+
+    Returns:
+        list: The label parts, e.g. ['0-9', 'a', 'ε'].
+    """
+    by_class = [[] for _ in _RANGE_CLASSES]
+    others = []
+    for symbol in symbols:
+        for index, characters in enumerate(_RANGE_CLASSES):
+            if len(symbol) == 1 and symbol in characters:
+                by_class[index].append(symbol)
+                break
+        else:
+            others.append(symbol)
+
+    parts = []
+    for members in by_class:
+        members.sort()
+        run = []
+        for symbol in members:
+            if run and ord(symbol) != ord(run[-1]) + 1:
+                parts.extend(_format_run(run))
+                run = []
+            run.append(symbol)
+        parts.extend(_format_run(run))
+    return parts + others
+
+
+def join_label(parts, separator=", ", max_length=DEFAULT_MAX_LABEL_LENGTH):
+    """
+    Joins label parts, truncating once the label would exceed max_length characters.
+
+    Args:
+        parts (list): The label parts.
+        separator (str): Separator placed between parts.
+        max_length (int or None): Length cap; None disables truncation.
+
+    Returns:
+        str: The label, ending in '… (+N)' when N parts were dropped.
+    """
+    label = separator.join(parts)
+    if max_length is None or len(label) <= max_length:
+        return label
+
+    kept = []
+    length = 0
+    for part in parts:
+        extra = len(part) + (len(separator) if kept else 0)
+        if kept and length + extra > max_length:
+            break
+        kept.append(part)
+        length += extra
+    return f"{separator.join(kept)}{separator}… (+{len(parts) - len(kept)})"
+
+
+def aggregate_nfa_edges(transitions, max_label_length=DEFAULT_MAX_LABEL_LENGTH):
+    """
+    Merges parallel NFA transitions into one edge per (state, next_state) whose label
+    lists every symbol, with ranges compressed.
+
+    Args:
+        transitions (iterable): (state, symbol, next_state) tuples.
+        max_label_length (int or None): Label length cap.
+
+    Returns:
+        list: (state, next_state, label, count) tuples, where count is the number of
+            transitions merged into the edge.
+    """
+    groups = group_edges((state, target, symbol) for state, symbol, target in transitions)
+    return [
+        (
+            state,
+            target,
+            join_label(compress_symbols(symbols), ", ", max_label_length),
+            len(symbols),
+        )
+        for (state, target), symbols in groups.items()
+    ]
+
+
+def aggregate_pda_edges(transitions, max_label_length=DEFAULT_MAX_LABEL_LENGTH):
+    """
+    Merges parallel PDA transitions into one edge per (state, next_state). Rules that
+    only differ in their input symbol share one line, e.g. 'a-z, Z → AZ'; the lines
+    of different stack operations are stacked.
+
+    Args:
+        transitions (iterable): (state, input_symbol, stack_symbol, next_state,
+            stack_operation) tuples.
+        max_label_length (int or None): Length cap of each line. The number of lines
+            is capped at DEFAULT_MAX_LABEL_LINES at the same time.
+
+    Returns:
+        list: (state, next_state, label, count) tuples, where count is the number of
+            transitions merged into the edge.
+    """
+    groups = group_edges(
+        ((state, target), (stack_symbol, operation), input_symbol)
+        for state, input_symbol, stack_symbol, target, operation in transitions
+    )
+    edges = {}
+    for ((state, target), (stack_symbol, operation)), inputs in groups.items():
+        inputs_label = join_label(compress_symbols(inputs), ", ", max_label_length)
+        lines, count = edges.get((state, target), ([], 0))
+        lines.append(f"{inputs_label}, {stack_symbol} → {operation}")
+        edges[(state, target)] = (lines, count + len(inputs))
+    result = []
+    for (state, target), (lines, count) in edges.items():
+        if max_label_length is not None and len(lines) > DEFAULT_MAX_LABEL_LINES:
+            dropped = len(lines) - DEFAULT_MAX_LABEL_LINES
+            lines = lines[:DEFAULT_MAX_LABEL_LINES] + [f"… (+{dropped})"]
+        # '\n' is Graphviz's escape for a centered line break
+        result.append((state, target, "\\n".join(lines), count))
+    return result
+
+
+def _format_run(run):
+    if len(run) >= 3:
+        return [f"{run[0]}-{run[-1]}"]
+    return run
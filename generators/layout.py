@@ -0,0 +1,328 @@
+import subprocess
+
+from .dot_writer import DotWriter
+
+# Defaults of the large-graph render settings shared by both generators
+DEFAULT_LARGE_GRAPH_STATES = 500
+DEFAULT_LARGE_GRAPH_EDGES = 2000
+DEFAULT_LARGE_GRAPH_ENGINE = "sfdp"
+
+# Large graphs are laid out with straight edges, which dot and sfdp route in a
+# fraction of the time splines take
+LARGE_GRAPH_ATTR = {"outputorder": "edgesfirst", "overlap": "prism", "splines": "false"}
+# Used for the retry after a timeout: no overlap removal either
+FALLBACK_GRAPH_ATTR = {"outputorder": "edgesfirst", "overlap": "true", "splines": "false"}
+
+LARGE_GRAPH_STRATEGIES = ("engine", "collapse")
+
+
+def is_large(num_nodes, num_edges, settings):
+    """
+    Checks whether a graph exceeds the large-graph thresholds of the render settings.
+
+    Args:
+        num_nodes (int): Number of nodes.
+        num_edges (int): Number of edges.
+        settings (dict): Render settings with "large_graph_states" and
+            "large_graph_edges" (None disables a threshold).
+
+    Returns:
+        bool: True if the graph should be laid out in large-graph mode.
+    """
+    max_states = settings.get("large_graph_states")
+    max_edges = settings.get("large_graph_edges")
+    return (max_states is not None and num_nodes > max_states) or (
+        max_edges is not None and num_edges > max_edges
+    )
+
+
+def plan_layout(nodes, edges, start_state, settings, logger=None):
+    """
+    Reduces a graph according to the render settings before it is written as DOT.
+
+    With "reachable_depth" set, only the states reachable from the start state in at
+    most that many transitions are kept. If the graph still exceeds the large-graph
+    thresholds and "large_graph_strategy" is "collapse", every strongly connected
+    component of two or more states is replaced by a single summary node.
+
+    Args:
+        nodes (list): (name, label, attrs) tuples.
+        edges (list): (tail, head, label) tuples. A label of None draws a dashed,
+            unlabeled edge.
+        start_state (str): The start state.
+        settings (dict): Render settings.
+        logger (logging.Logger, optional): Logger for the applied reductions.
+
+    Returns:
+        tuple: (nodes, edges, start, large) where start is the node the start arrow
+            points to (the summary node holding the start state, if it was collapsed)
+            and large tells whether the reduced graph should be laid out in
+            large-graph mode.
+    """
+    depth = settings.get("reachable_depth")
+    if depth is not None:
+        before = len(nodes)
+        nodes, edges = reachable_subgraph(nodes, edges, start_state, depth)
+        if logger is not None and len(nodes) < before:
+            logger.info(
+                f"Drawing the {len(nodes)} of {before} states within {depth} steps of "
+                f"'{start_state}'."
+            )
+
+    start = start_state
+    large = is_large(len(nodes), len(edges), settings)
+    if large and settings.get("large_graph_strategy") == "collapse":
+        before = len(nodes)
+        nodes, edges, owner = collapse_components(nodes, edges)
+        start = owner.get(start_state, start_state)
+        large = is_large(len(nodes), len(edges), settings)
+        if logger is not None:
+            logger.info(
+                f"Collapsed strongly connected components: {before} states drawn as "
+                f"{len(nodes)} nodes."
+            )
+    if large and logger is not None:
+        logger.info(
+            f"Large graph ({len(nodes)} nodes, {len(edges)} edges); laying it out "
+            f"with '{settings.get('large_graph_engine', DEFAULT_LARGE_GRAPH_ENGINE)}'."
+        )
+    return nodes, edges, start, large
+
+
+def write_dot(nodes, edges, start_state, settings, large=False):
+    """
+    Writes a planned graph as DOT, followed by the start arrow.
+
+    Args:
+        nodes (list): (name, label, attrs) tuples.
+        edges (list): (tail, head, label) tuples, as returned by plan_layout.
+        start_state (str): The node the start arrow points to.
+        settings (dict): Render settings with "format" and "graph_attr".
+        large (bool): Use the large-graph engine and attributes.
+
+    Returns:
+        DotWriter: The graph.
+    """
+    graph_attr = settings["graph_attr"]
+    engine = "dot"
+    if large:
+        graph_attr = {**graph_attr, **LARGE_GRAPH_ATTR}
+        engine = settings.get("large_graph_engine", DEFAULT_LARGE_GRAPH_ENGINE)
+    graph = DotWriter(format=settings["format"], graph_attr=graph_attr, engine=engine)
+
+    for name, label, attrs in nodes:
+        graph.node(name, label, **attrs)
+    graph.edges(edge for edge in edges if edge[2] is not None)
+    for tail, head, label in edges:
+        if label is None:
+            graph.edge(tail, head, style="dashed")
+
+    graph.node("start", "", shape="none")
+    graph.edge("start", start_state)
+    return graph
+
+
+def render_with_fallback(graph, render, timeout, fallback_engine, logger):
+    """
+    Runs render(graph, timeout) and, if the layout times out, runs it once more with
+    the fallback engine and the cheaper FALLBACK_GRAPH_ATTR. A graph therefore takes
+    at most twice the timeout.
+
+    Args:
+        graph (DotWriter): The graph.
+        render (callable): Called with the graph and the timeout, e.g. a wrapper of
+            DotWriter.render or DotWriter.pipe.
+        timeout (float or None): Seconds per layout attempt; None waits indefinitely.
+        fallback_engine (str): Layout engine of the retry.
+        logger (logging.Logger): Logger for the retry.
+
+    Returns:
+        The return value of render.
+
+    Raises:
+        subprocess.TimeoutExpired: If the fallback layout times out as well.
+    """
+    try:
+        return render(graph, timeout)
+    except subprocess.TimeoutExpired:
+        if logger is not None:
+            logger.warning(
+                f"'{graph.engine}' layout exceeded {timeout}s; retrying with a cheaper "
+                f"'{fallback_engine}' layout."
+            )
+        graph.engine = fallback_engine
+        graph.graph_attr.update(FALLBACK_GRAPH_ATTR)
+        return render(graph, timeout)
+
+
+def reachable_subgraph(nodes, edges, start_state, depth):
+    """
+    Keeps the nodes reachable from the start state in at most depth transitions.
+
+    The states that have transitions to dropped states get a dashed edge to a single
+    '+N more states' node, so the cut is visible in the diagram.
+
+    Args:
+        nodes (list): (name, label, attrs) tuples.
+        edges (list): (tail, head, label) tuples.
+        start_state (str): The start state.
+        depth (int): Maximum number of transitions from the start state.
+
+    Returns:
+        tuple: (nodes, edges) of the subgraph.
+    """
+    successors = {}
+    for tail, head, _ in edges:
+        successors.setdefault(tail, []).append(head)
+
+    reached = {start_state}
+    frontier = [start_state]
+    for _ in range(depth):
+        next_frontier = []
+        for state in frontier:
+            for head in successors.get(state, ()):
+                if head not in reached:
+                    reached.add(head)
+                    next_frontier.append(head)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+
+    kept_nodes = [node for node in nodes if node[0] in reached]
+    kept_edges = [edge for edge in edges if edge[0] in reached and edge[1] in reached]
+    dropped = len(nodes) - len(kept_nodes)
+    cut = dict.fromkeys(
+        tail for tail, head, _ in edges if tail in reached and head not in reached
+    )
+    if dropped and cut:
+        more = _unused_name("more", {node[0] for node in nodes})
+        kept_nodes.append((more, f"+{dropped} more states", {"shape": "plaintext"}))
+        kept_edges.extend((tail, more, None) for tail in cut)
+    return kept_nodes, kept_edges
+
+
+def collapse_components(nodes, edges):
+    """
+    Replaces every strongly connected component of two or more nodes with a summary
+    node, and merges the edges between two components into one.
+
+    Args:
+        nodes (list): (name, label, attrs) tuples. Components containing a node drawn
+            as a double circle are drawn with a double border.
+        edges (list): (tail, head, label) tuples.
+
+    Returns:
+        tuple: (nodes, edges, owner) where nodes and edges are the condensed graph and
+            owner maps every original node to the node that now stands for it.
+    """
+    by_name = {node[0]: node for node in nodes}
+    taken = set(by_name)
+    components = strongly_connected_components(list(by_name), edges)
+    # Tarjan's algorithm finds components in reverse topological order
+    components.reverse()
+
+    owner = {}
+    condensed = []
+    for component in components:
+        if len(component) == 1:
+            name = component[0]
+            owner[name] = name
+            if name in by_name:
+                condensed.append(by_name[name])
+            continue
+        summary = _unused_name(f"SCC {len(taken) - len(by_name) + 1}", taken)
+        taken.add(summary)
+        attrs = {"shape": "box", "style": "rounded"}
+        if any(
+            by_name[member][2].get("shape") == "doublecircle"
+            for member in component
+            if member in by_name
+        ):
+            attrs["peripheries"] = "2"
+        condensed.append((summary, f"{len(component)} states\\n{_sample(component)}", attrs))
+        for member in component:
+            owner[member] = summary
+
+    merged = {}
+    for tail, head, label in edges:
+        tail, head = owner.get(tail, tail), owner.get(head, head)
+        if tail == head and tail not in by_name:
+            continue  # Transition inside a collapsed component
+        merged.setdefault((tail, head), []).append(label)
+    condensed_edges = [
+        (tail, head, labels[0] if len(labels) == 1 else f"{len(labels)} transitions")
+        for (tail, head), labels in merged.items()
+    ]
+    return condensed, condensed_edges, owner
+
+
+def strongly_connected_components(nodes, edges):
+    """
+    Finds the strongly connected components of a graph with an iterative version of
+    Tarjan's algorithm, so deep graphs do not hit the recursion limit.
+
+    Args:
+        nodes (list): Node names.
+        edges (iterable): (tail, head, ...) tuples.
+
+    Returns:
+        list: Components as lists of node names, in reverse topological order.
+    """
+    successors = {node: [] for node in nodes}
+    for tail, head, *_ in edges:
+        successors.setdefault(tail, []).append(head)
+        successors.setdefault(head, [])
+
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in successors:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors[root]))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors[child])))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def _sample(component, limit=3):
+    """
+    Returns a few member names of a component for its summary label.
+    """
+    names = ", ".join(str(name) for name in component[:limit])
+    return names + ", …" if len(component) > limit else names
+
+
+def _unused_name(base, taken):
+    name = base
+    while name in taken:
+        name += "'"
+    return name
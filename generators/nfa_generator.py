@@ -1,10 +1,17 @@
-import graphviz
+import logging
 import os
-from validators import (
-    validate_nfa_structure,
-    validate_nfa_states,
-    validate_transitions,
-    validate_nfa_symbols,
+import time
+from instrumentation import add_phase
+from models import ValidatedDefinition, compile_nfa
+from validators import validate_nfa
+from .edge_aggregation import DEFAULT_MAX_LABEL_LENGTH, aggregate_nfa_edges
+from .layout import (
+    DEFAULT_LARGE_GRAPH_EDGES,
+    DEFAULT_LARGE_GRAPH_ENGINE,
+    DEFAULT_LARGE_GRAPH_STATES,
+    plan_layout,
+    render_with_fallback,
+    write_dot,
 )
 
 
@@ -15,78 +22,222 @@ class NFA_Generator:
     Attributes:
         nfa_data (dict): A dictionary containing the NFA's structure and transitions.
         logger (logging.Logger): A logger instance for logging actions and events.
+        render_settings (dict): Output format, graph attributes, edge merging and
+            large-graph options used for rendering.
+        cache (RenderCache): Optional cache of previously rendered diagrams.
+        cache_status (str): "hit" or "miss" after create_graph when a cache is used.
+        model (CompiledNFA): Index-backed form of nfa_data, compiled on first use,
+            unless it comes precompiled as a ValidatedDefinition.
+        graph_stats (dict): State, edge and transition counts of the last built graph.
+        timings (dict): Seconds spent per phase, e.g. "validate", "build" or "render".
+        large_graph (bool): Whether the last built graph is laid out in large-graph mode.
     """
 
-    def __init__(self, nfa_data, logger):
+    DEFAULT_RENDER_SETTINGS = {
+        "format": "png",
+        "graph_attr": {"rankdir": "LR"},
+        "merge_edges": True,  # One labeled edge per (state, next_state) pair
+        "max_label_length": DEFAULT_MAX_LABEL_LENGTH,
+        # Above either size, lay out with large_graph_engine ("engine") or collapse
+        # strongly connected components first ("collapse")
+        "large_graph_states": DEFAULT_LARGE_GRAPH_STATES,
+        "large_graph_edges": DEFAULT_LARGE_GRAPH_EDGES,
+        "large_graph_engine": DEFAULT_LARGE_GRAPH_ENGINE,
+        "large_graph_strategy": "engine",
+        "reachable_depth": None,  # Only draw states this many steps from the start
+        "render_timeout": None,  # Seconds before falling back to a cheaper layout
+    }
+
+    def __init__(self, nfa_data, logger, render_settings=None, cache=None):
         """
         Initializes NFAGenerator with the NFA data and a logger.
 
         Args:
             nfa_data (dict): The structure of the NFA including states, transitions, and alphabet.
             logger (logging.Logger): Logger for logging information, warnings, and errors.
+            render_settings (dict, optional): Overrides for DEFAULT_RENDER_SETTINGS.
+            cache (RenderCache, optional): Cache used to skip rendering unchanged NFAs.
         """
         self.nfa_data = nfa_data
         self.logger = logger
+        self.render_settings = {**self.DEFAULT_RENDER_SETTINGS, **(render_settings or {})}
+        self.cache = cache
+        self.cache_status = None
+        self.model = nfa_data.model if isinstance(nfa_data, ValidatedDefinition) else None
+        self.graph_stats = None
+        self.timings = {}
+        self.large_graph = False
+        self._cache_key = None
 
-    def create_graph(self):
+    def create_graph(self, filename=None, dot_only=False, renderer=None):
         """
         Creates and renders the NFA graph in landscape orientation. Validates the NFA structure
         before rendering and saves the output file in the 'outputs' directory.
+
+        Args:
+            filename (str, optional): Output filename (without extension) to use instead of
+                probing the 'outputs' directory for a unique one.
+            dot_only (bool): Only write the DOT source, without running Graphviz.
+            renderer (BatchRenderer, optional): Queues the graph to be rendered together
+                with others; the image only exists once the renderer is flushed.
+
+        Returns:
+            str: The path of the rendered image, or of the DOT file with dot_only.
+        """
+        start = time.perf_counter()
+        self.validate_nfa()
+        start = add_phase(self.timings, "validate", start)
+
+        # Ensure outputs directory exists
+        if not os.path.exists("outputs"):
+            os.makedirs("outputs")
+
+        if filename is None:
+            filename = self._get_unique_filename()
+        output_path = os.path.join("outputs", filename)
+        fmt = self.render_settings["format"]
+        image_path = f"{output_path}.{fmt}"
+        start = add_phase(self.timings, "filename", start)
+
+        if dot_only:
+            graph = self.build_graph()
+            start = add_phase(self.timings, "build", start)
+            graph.save(output_path)
+            add_phase(self.timings, "render", start)
+            self.logger.info(f"DOT source saved as {output_path}")
+            return output_path
+
+        # Unchanged NFAs were rendered by an earlier run
+        if self.cache is not None:
+            if self.cache.fetch(self._get_cache_key(), fmt, image_path):
+                self.cache_status = "hit"
+                add_phase(self.timings, "cache", start)
+                self.logger.info(f"Graph served from cache as {image_path}")
+                return image_path
+            self.cache_status = "miss"
+            start = add_phase(self.timings, "cache", start)
+
+        # Save the graph. Large graphs are rendered on their own so a slow layout does
+        # not hold up the rest of a batch.
+        nfa_graph = self.build_graph()
+        start = add_phase(self.timings, "build", start)
+        if renderer is not None and not self.large_graph:
+            return renderer.submit(nfa_graph, output_path, self._store_render)
+        render_with_fallback(
+            nfa_graph,
+            lambda graph, timeout: graph.render(output_path, timeout=timeout),
+            self.render_settings["render_timeout"],
+            self.render_settings["large_graph_engine"],
+            self.logger,
+        )
+        add_phase(self.timings, "render", start)
+        self._store_render(image_path)
+        return image_path
+
+    def render_bytes(self, format=None, timeout=None):
+        """
+        Validates and renders the NFA in memory, piping the DOT source to Graphviz.
+        Nothing is written to 'outputs' and no temporary files are used.
+
+        Args:
+            format (str, optional): Output format; defaults to the render settings.
+            timeout (float, optional): Seconds before the layout falls back to a cheaper
+                one; defaults to the "render_timeout" setting.
+
+        Returns:
+            bytes: The rendered image.
         """
         self.validate_nfa()
+        return render_with_fallback(
+            self.build_graph(),
+            lambda graph, timeout: graph.pipe(format, timeout=timeout),
+            timeout or self.render_settings["render_timeout"],
+            self.render_settings["large_graph_engine"],
+            self.logger,
+        )
 
-        # Create a Graphviz Digraph with landscape orientation
-        nfa_graph = graphviz.Digraph(format="png", graph_attr={"rankdir": "LR"})
+    def build_graph(self):
+        """
+        Builds the DOT source of the NFA without validating or rendering it.
+
+        Returns:
+            DotWriter: The NFA graph.
+        """
+        model = self._get_model()
 
         # Add nodes (states)
-        for state in self.nfa_data["states"]:
-            shape = (
-                "doublecircle" if state in self.nfa_data["final_states"] else "circle"
+        nodes = [
+            (state, state, {"shape": "doublecircle" if state_id in model.finals else "circle"})
+            for state_id, state in enumerate(model.states.declared_names())
+        ]
+
+        # Add transitions (symbols are already normalized, including misencoded epsilons).
+        # Per-edge messages are only built when debug logging is enabled.
+        debug = self.logger is not None and self.logger.isEnabledFor(logging.DEBUG)
+        if self.render_settings["merge_edges"]:
+            edges = aggregate_nfa_edges(
+                model.transitions(), self.render_settings["max_label_length"]
             )
-            nfa_graph.node(state, state, shape=shape)
-
-        # Add transitions
-        for state, transitions_dict in self.nfa_data["transitions"].items():
-            for symbol, next_states in transitions_dict.items():
-                if symbol == "Îµ":  # Handle any misencoded epsilon symbol
-                    symbol = "ε"
-                    # symbol = '&#949;'
-                symbol = str(symbol)  # Ensure symbol is treated as a string
-                for next_state in next_states:
+            if debug:
+                for state, next_state, label, count in edges:
+                    self.logger.debug(
+                        f"Adding {count} transition(s) from '{state}' to '{next_state}' on '{label}'"
+                    )
+            edges = [(state, next_state, label) for state, next_state, label, _ in edges]
+        else:
+            if debug:
+                for state, symbol, next_state in model.transitions():
                     self.logger.debug(
                         f"Adding transition from '{state}' to '{next_state}' on symbol '{symbol}'"
                     )
-                    nfa_graph.edge(state, next_state, label=symbol)
-
-        # Start state
-        nfa_graph.node("start", "", shape="none")
-        nfa_graph.edge("start", self.nfa_data["start_state"])
+            edges = [
+                (state, next_state, symbol) for state, symbol, next_state in model.transitions()
+            ]
 
-        # Ensure outputs directory exists
-        if not os.path.exists("outputs"):
-            os.makedirs("outputs")
+        # Large NFAs may be cut down or collapsed, and get a scalable layout engine
+        nodes, edges, start_state, self.large_graph = plan_layout(
+            nodes, edges, self.nfa_data["start_state"], self.render_settings, self.logger
+        )
+        self.graph_stats = {
+            "states": len(nodes),
+            "edges": len(edges),
+            "transitions": model.num_transitions,
+        }
 
-        # Save the graph
-        filename = self._get_unique_filename()
-        output_path = os.path.join("outputs", filename)
-        nfa_graph.render(output_path)
-        self.logger.info(f"Graph saved as {output_path}.png")
+        # Write the graph, with the start state indicator last
+        return write_dot(nodes, edges, start_state, self.render_settings, self.large_graph)
 
     def validate_nfa(self):
         """
         Validates the NFA structure, states, transitions, and symbols.
 
         Raises:
-            ValueError: If validation fails for any component of the NFA.
+            AutomatonValidationError: If the NFA is invalid; every error is reported.
         """
-        validate_nfa_structure(self.nfa_data, self.logger)
-        validate_nfa_states(self.nfa_data, self.logger)
-        validate_transitions(self.nfa_data, self.logger)
-        validate_nfa_symbols(self.nfa_data, self.logger)
+        if isinstance(self.nfa_data, ValidatedDefinition):
+            return
+        self.model = validate_nfa(self.nfa_data, self.logger, self.model)
 
-    def _get_unique_filename(self):
+    def _get_model(self):
+        """
+        Compiles (once) the NFA into the index-backed form shared with the validators.
+
+        Returns:
+            CompiledNFA: The compiled NFA.
+        """
+        if self.model is None:
+            self.model = compile_nfa(self.nfa_data)
+        return self.model
+
+    def _get_unique_filename(self, reserved=None):
         """
         Generates a unique filename for the output file by appending an index if needed.
+        An existing file that is identical to the cached render of this NFA is reused
+        instead of writing another indexed copy.
+
+        Args:
+            reserved (set, optional): Filenames already claimed by other automata in the
+                current batch. The chosen filename is added to this set.
 
         Returns:
             str: A unique filename for the NFA output file.
@@ -96,7 +247,56 @@ class NFA_Generator:
             f"{self.nfa_data['type']}_{self.nfa_data['name'].replace(' ', '_')}"
         )
         filename = base_filename
-        while os.path.exists(os.path.join("outputs", f"{filename}.png")):
+        fmt = self.render_settings["format"]
+        reserved = set() if reserved is None else reserved
+        while filename in reserved or os.path.exists(
+            os.path.join("outputs", f"{filename}.{fmt}")
+        ):
+            if filename not in reserved and self._matches_cached_render(filename):
+                break
             filename = f"{base_filename}_{index}"
             index += 1
+        reserved.add(filename)
         return filename
+
+    def _store_render(self, image_path):
+        """
+        Records a freshly rendered image in the cache and logs it.
+        """
+        if self.cache is not None:
+            start = time.perf_counter()
+            self.cache.store(self._get_cache_key(), self.render_settings["format"], image_path)
+            add_phase(self.timings, "cache", start)
+        self.logger.info(f"Graph saved as {image_path}{self._describe_graph()}")
+
+    def _describe_graph(self):
+        """
+        Returns a compact ' (N states, M edges)' summary of the built graph, if any.
+        """
+        if self.graph_stats is None:
+            return ""
+        return f" ({self.graph_stats['states']} states, {self.graph_stats['edges']} edges)"
+
+    def _get_cache_key(self):
+        """
+        Computes (once) the render cache key of this NFA.
+
+        Returns:
+            str: The cache key.
+        """
+        if self._cache_key is None:
+            self._cache_key = self.cache.make_key(
+                "nfa", self.nfa_data, self.render_settings
+            )
+        return self._cache_key
+
+    def _matches_cached_render(self, filename):
+        """
+        Checks whether an existing output file already holds the cached render of this NFA.
+        """
+        if self.cache is None:
+            return False
+        fmt = self.render_settings["format"]
+        return self.cache.matches(
+            self._get_cache_key(), fmt, os.path.join("outputs", f"{filename}.{fmt}")
+        )
@@ -1,6 +1,18 @@
+import logging
 import os
-import graphviz
-from validators import PDA_Validator
+import time
+from instrumentation import add_phase
+from models import ValidatedDefinition, compile_pda
+from validators import validate_pda
+from .edge_aggregation import DEFAULT_MAX_LABEL_LENGTH, aggregate_pda_edges
+from .layout import (
+    DEFAULT_LARGE_GRAPH_EDGES,
+    DEFAULT_LARGE_GRAPH_ENGINE,
+    DEFAULT_LARGE_GRAPH_STATES,
+    plan_layout,
+    render_with_fallback,
+    write_dot,
+)
 
 
 class PDA_Generator:
@@ -10,102 +22,230 @@ class PDA_Generator:
     Attributes:
         pda_data (dict): The formal definition of the PDA, including states, transitions, and stack operations.
         logger (logging.Logger): Logger instance for debugging and process updates.
+        render_settings (dict): Output format, graph attributes, edge merging and
+            large-graph options used for rendering.
+        cache (RenderCache): Optional cache of previously rendered diagrams.
+        cache_status (str): "hit" or "miss" after create_diagram when a cache is used.
+        model (CompiledPDA): Index-backed form of pda_data, compiled on first use,
+            unless it comes precompiled as a ValidatedDefinition.
+        graph_stats (dict): State, edge and transition counts of the last built graph.
+        timings (dict): Seconds spent per phase, e.g. "validate", "build" or "render".
+        large_graph (bool): Whether the last built graph is laid out in large-graph mode.
     """
 
-    def __init__(self, pda_data, logger):
+    DEFAULT_RENDER_SETTINGS = {
+        "format": "png",
+        "graph_attr": {"rankdir": "LR"},
+        "merge_edges": True,  # One labeled edge per (state, next_state) pair
+        "max_label_length": DEFAULT_MAX_LABEL_LENGTH,
+        # Above either size, lay out with large_graph_engine ("engine") or collapse
+        # strongly connected components first ("collapse")
+        "large_graph_states": DEFAULT_LARGE_GRAPH_STATES,
+        "large_graph_edges": DEFAULT_LARGE_GRAPH_EDGES,
+        "large_graph_engine": DEFAULT_LARGE_GRAPH_ENGINE,
+        "large_graph_strategy": "engine",
+        "reachable_depth": None,  # Only draw states this many steps from the start
+        "render_timeout": None,  # Seconds before falling back to a cheaper layout
+    }
+
+    def __init__(self, pda_data, logger, render_settings=None, cache=None):
         """
         Initializes the PDA_Generator with PDA data and a logger.
 
         Args:
             pda_data (dict): The formal definition of the PDA.
             logger (logging.Logger): Logger for logging information, warnings, and errors.
+            render_settings (dict, optional): Overrides for DEFAULT_RENDER_SETTINGS.
+            cache (RenderCache, optional): Cache used to skip rendering unchanged PDAs.
         """
         self.pda_data = pda_data
         self.logger = logger
+        self.render_settings = {**self.DEFAULT_RENDER_SETTINGS, **(render_settings or {})}
+        self.cache = cache
+        self.cache_status = None
+        self.model = pda_data.model if isinstance(pda_data, ValidatedDefinition) else None
+        self.graph_stats = None
+        self.timings = {}
+        self.large_graph = False
+        self._cache_key = None
 
-    def create_diagram(self):
+    def create_diagram(self, filename=None, dot_only=False, renderer=None):
         """
         Generates and renders the PDA diagram. Validates the PDA definition before rendering.
-        """
-        self.logger.info(f"Generating PDA diagram for '{self.pda_data['name']}'")
-        # Validate the PDA definition
-        # self.validate_pda()
-
-        # Initialize the Graphviz Digraph
-        pda_graph = graphviz.Digraph(format="png", graph_attr={"rankdir": "LR"})
 
-        # Add states to the graph
-        for state in self.pda_data["states"]:
-            shape = (
-                "doublecircle" if state in self.pda_data["final_states"] else "circle"
-            )
-            pda_graph.node(state, state, shape=shape)
-
-        # Add transitions to the graph
-        for state, transitions in self.pda_data["transitions"].items():
-            for input_symbol, stack_transitions in transitions.items():
-                for stack_symbol, results in stack_transitions.items():
-                    for next_state, stack_operation in results:
-                        if (
-                            stack_symbol == "Îµ"
-                        ):  # Handle any mis-encoded epsilon symbol
-                            stack_symbol = "ε"
-                            # symbol = '&#949;'
-                        stack_symbol = str(
-                            stack_symbol
-                        )  # Ensure symbol is treated as a string
-
-                        if (
-                            input_symbol == "Îµ"
-                        ):  # Handle any mis-encoded epsilon symbol
-                            input_symbol = "ε"
-                            # symbol = '&#949;'
-                        input_symbol = str(
-                            input_symbol
-                        )  # Ensure symbol is treated as a string
-
-                        if (
-                            stack_operation == "Îµ"
-                        ):  # Handle any mis-encoded epsilon symbol
-                            stack_operation = "ε"
-                            # symbol = '&#949;'
-                        stack_operation = str(
-                            stack_operation
-                        )  # Ensure symbol is treated as a string
-
-                        label = f"{input_symbol}, {stack_symbol} → {stack_operation}"
-                        self.logger.debug(
-                            f"Adding transition: {state} → {next_state} [label='{label}']"
-                        )
-                        pda_graph.edge(state, next_state, label=label)
+        Args:
+            filename (str, optional): Output filename (without extension) to use instead of
+                probing the 'outputs' directory for a unique one.
+            dot_only (bool): Only write the DOT source, without running Graphviz.
+            renderer (BatchRenderer, optional): Queues the graph to be rendered together
+                with others; the image only exists once the renderer is flushed.
 
-        # Add the start state indicator
-        pda_graph.node("start", "", shape="none")
-        pda_graph.edge("start", self.pda_data["start_state"])
+        Returns:
+            str: The path of the rendered image, or of the DOT file with dot_only.
+        """
+        self.logger.info(f"Generating PDA diagram for '{self.pda_data['name']}'")
+        start = time.perf_counter()
+        self.validate_pda()
+        start = add_phase(self.timings, "validate", start)
 
         # Ensure the outputs directory exists
         if not os.path.exists("outputs"):
             os.makedirs("outputs")
 
-        # Render the graph to a file
-        filename = self._get_unique_filename()
+        if filename is None:
+            filename = self._get_unique_filename()
         output_path = os.path.join("outputs", filename)
-        pda_graph.render(output_path)
-        self.logger.info(f"PDA diagram saved as {output_path}.png")
+        fmt = self.render_settings["format"]
+        image_path = f"{output_path}.{fmt}"
+        start = add_phase(self.timings, "filename", start)
+
+        if dot_only:
+            graph = self.build_graph()
+            start = add_phase(self.timings, "build", start)
+            graph.save(output_path)
+            add_phase(self.timings, "render", start)
+            self.logger.info(f"DOT source saved as {output_path}")
+            return output_path
+
+        # Unchanged PDAs were rendered by an earlier run
+        if self.cache is not None:
+            if self.cache.fetch(self._get_cache_key(), fmt, image_path):
+                self.cache_status = "hit"
+                add_phase(self.timings, "cache", start)
+                self.logger.info(f"PDA diagram served from cache as {image_path}")
+                return image_path
+            self.cache_status = "miss"
+            start = add_phase(self.timings, "cache", start)
+
+        # Render the graph to a file. Large graphs are rendered on their own so a slow
+        # layout does not hold up the rest of a batch.
+        pda_graph = self.build_graph()
+        start = add_phase(self.timings, "build", start)
+        if renderer is not None and not self.large_graph:
+            return renderer.submit(pda_graph, output_path, self._store_render)
+        render_with_fallback(
+            pda_graph,
+            lambda graph, timeout: graph.render(output_path, timeout=timeout),
+            self.render_settings["render_timeout"],
+            self.render_settings["large_graph_engine"],
+            self.logger,
+        )
+        add_phase(self.timings, "render", start)
+        self._store_render(image_path)
+        return image_path
+
+    def render_bytes(self, format=None, timeout=None):
+        """
+        Validates and renders the PDA in memory, piping the DOT source to Graphviz.
+        Nothing is written to 'outputs' and no temporary files are used.
+
+        Args:
+            format (str, optional): Output format; defaults to the render settings.
+            timeout (float, optional): Seconds before the layout falls back to a cheaper
+                one; defaults to the "render_timeout" setting.
+
+        Returns:
+            bytes: The rendered image.
+        """
+        self.validate_pda()
+        return render_with_fallback(
+            self.build_graph(),
+            lambda graph, timeout: graph.pipe(format, timeout=timeout),
+            timeout or self.render_settings["render_timeout"],
+            self.render_settings["large_graph_engine"],
+            self.logger,
+        )
+
+    def build_graph(self):
+        """
+        Builds the DOT source of the PDA without validating or rendering it.
+
+        Returns:
+            DotWriter: The PDA graph.
+        """
+        model = self._get_model()
+
+        # Add states to the graph
+        nodes = [
+            (state, state, {"shape": "doublecircle" if state_id in model.finals else "circle"})
+            for state_id, state in enumerate(model.states.declared_names())
+        ]
+
+        # Add transitions to the graph (symbols are already normalized, including
+        # mis-encoded epsilons). Per-edge messages are only built when debug logging
+        # is enabled.
+        debug = self.logger is not None and self.logger.isEnabledFor(logging.DEBUG)
+        if self.render_settings["merge_edges"]:
+            edges = aggregate_pda_edges(
+                model.transitions(), self.render_settings["max_label_length"]
+            )
+            if debug:
+                for state, next_state, label, count in edges:
+                    self.logger.debug(
+                        f"Adding {count} transition(s): {state} → {next_state} [label='{label}']"
+                    )
+            edges = [(state, next_state, label) for state, next_state, label, _ in edges]
+        else:
+            edges = [
+                (state, next_state, f"{input_symbol}, {stack_symbol} → {stack_operation}")
+                for (
+                    state,
+                    input_symbol,
+                    stack_symbol,
+                    next_state,
+                    stack_operation,
+                ) in model.transitions()
+            ]
+            if debug:
+                for state, next_state, label in edges:
+                    self.logger.debug(
+                        f"Adding transition: {state} → {next_state} [label='{label}']"
+                    )
+
+        # Large PDAs may be cut down or collapsed, and get a scalable layout engine
+        nodes, edges, start_state, self.large_graph = plan_layout(
+            nodes, edges, self.pda_data["start_state"], self.render_settings, self.logger
+        )
+        self.graph_stats = {
+            "states": len(nodes),
+            "edges": len(edges),
+            "transitions": model.num_transitions,
+        }
+
+        # Add the start state indicator
+        return write_dot(nodes, edges, start_state, self.render_settings, self.large_graph)
 
     def validate_pda(self):
         """
         Validates the PDA definition.
 
         Raises:
-            ValueError: If validation fails for any component of the PDA.
+            AutomatonValidationError: If the PDA is invalid; every error is reported.
         """
-        validator = PDA_Validator(self.pda_data, self.logger)
-        validator.validate()
+        if isinstance(self.pda_data, ValidatedDefinition):
+            return
+        self.model = validate_pda(self.pda_data, self.logger, self.model)
 
-    def _get_unique_filename(self):
+    def _get_model(self):
         """
-        Generates a unique filename for the PDA output file.
+        Compiles (once) the PDA into the index-backed form shared with the validator.
+
+        Returns:
+            CompiledPDA: The compiled PDA.
+        """
+        if self.model is None:
+            self.model = compile_pda(self.pda_data)
+        return self.model
+
+    def _get_unique_filename(self, reserved=None):
+        """
+        Generates a unique filename for the PDA output file. An existing file that is
+        identical to the cached render of this PDA is reused instead of writing another
+        indexed copy.
+
+        Args:
+            reserved (set, optional): Filenames already claimed by other automata in the
+                current batch. The chosen filename is added to this set.
 
         Returns:
             str: A unique filename for the PDA output file.
@@ -115,7 +255,56 @@ class PDA_Generator:
         )
         filename = base_filename
         index = 1
-        while os.path.exists(os.path.join("outputs", f"{filename}.png")):
+        fmt = self.render_settings["format"]
+        reserved = set() if reserved is None else reserved
+        while filename in reserved or os.path.exists(
+            os.path.join("outputs", f"{filename}.{fmt}")
+        ):
+            if filename not in reserved and self._matches_cached_render(filename):
+                break
             filename = f"{base_filename}_{index}"
             index += 1
+        reserved.add(filename)
         return filename
+
+    def _store_render(self, image_path):
+        """
+        Records a freshly rendered image in the cache and logs it.
+        """
+        if self.cache is not None:
+            start = time.perf_counter()
+            self.cache.store(self._get_cache_key(), self.render_settings["format"], image_path)
+            add_phase(self.timings, "cache", start)
+        self.logger.info(f"PDA diagram saved as {image_path}{self._describe_graph()}")
+
+    def _describe_graph(self):
+        """
+        Returns a compact ' (N states, M edges)' summary of the built graph, if any.
+        """
+        if self.graph_stats is None:
+            return ""
+        return f" ({self.graph_stats['states']} states, {self.graph_stats['edges']} edges)"
+
+    def _get_cache_key(self):
+        """
+        Computes (once) the render cache key of this PDA.
+
+        Returns:
+            str: The cache key.
+        """
+        if self._cache_key is None:
+            self._cache_key = self.cache.make_key(
+                "pda", self.pda_data, self.render_settings
+            )
+        return self._cache_key
+
+    def _matches_cached_render(self, filename):
+        """
+        Checks whether an existing output file already holds the cached render of this PDA.
+        """
+        if self.cache is None:
+            return False
+        fmt = self.render_settings["format"]
+        return self.cache.matches(
+            self._get_cache_key(), fmt, os.path.join("outputs", f"{filename}.{fmt}")
+        )
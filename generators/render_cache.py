@@ -0,0 +1,299 @@
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+# Bump whenever a change to the generators alters the rendered output, so stale
+# entries from older versions are never served.
+CACHE_FORMAT_VERSION = 2
+# Eviction frees space down to this fraction of the limit, so a full cache is not
+# scanned again on every store
+EVICTION_TARGET = 0.9
+
+
+class RenderCache:
+    """
+    Content-addressed store of rendered diagrams. Entries are keyed on a canonical hash
+    of the automaton definition plus the render settings, and the least recently used
+    entries are evicted once the cache grows past its size limit. The size of the
+    directory is scanned once and then kept as a running total, so the directory is
+    only scanned again when the total exceeds the limit; eviction then frees space down
+    to EVICTION_TARGET of the limit.
+
+    Attributes:
+        cache_dir (str): Directory holding the cached images.
+        max_bytes (int): Size limit of the cache directory in bytes.
+        link_outputs (bool): Whether cache hits are hardlinked into place instead of
+            copied. Only safe when the outputs are never rewritten while linked.
+        hits (int): Number of lookups served from the cache by this instance.
+        misses (int): Number of lookups that required a render.
+    """
+
+    def __init__(
+        self, cache_dir=".render_cache", max_bytes=512 * 1024 * 1024, link_outputs=True
+    ):
+        """
+        Initializes the RenderCache.
+
+        Args:
+            cache_dir (str): Directory holding the cached images. Created on first store.
+            max_bytes (int): Size limit of the cache directory in bytes.
+            link_outputs (bool): Hardlink cache hits into place instead of copying them.
+                Pass False when the outputs may be rewritten, e.g. by the watcher.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.link_outputs = link_outputs
+        self.hits = 0
+        self.misses = 0
+        self._total = None  # Bytes in the cache directory; None until first scanned
+        self._lock = threading.Lock()
+
+    def make_key(self, kind, automaton, render_settings):
+        """
+        Computes the cache key of an automaton.
+
+        Args:
+            kind (str): The automaton kind, e.g. "nfa" or "pda".
+            automaton (dict): The automaton definition as loaded from YAML.
+            render_settings (dict): Settings that influence the rendered output.
+
+        Returns:
+            str: A hex SHA-256 digest that is stable across runs and key order.
+        """
+        return fingerprint(
+            {
+                "version": CACHE_FORMAT_VERSION,
+                "kind": kind,
+                "definition": automaton,
+                "settings": render_settings,
+            }
+        )
+
+    def entry_path(self, key, fmt):
+        """
+        Returns the path of the cache entry for a key and output format.
+        """
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
+
+    def fetch(self, key, fmt, destination):
+        """
+        Serves a cached image into the destination path, hardlinking it when
+        link_outputs is set and copying it otherwise.
+
+        Args:
+            key (str): The cache key.
+            fmt (str): The output format, e.g. "png".
+            destination (str): Where the image should end up.
+
+        Returns:
+            bool: True on a cache hit, False if the image has to be rendered.
+        """
+        entry = self.entry_path(key, fmt)
+        if not os.path.exists(entry):
+            self.misses += 1
+            return False
+
+        try:
+            os.utime(entry)  # Mark as recently used for LRU eviction
+            if not (os.path.exists(destination) and os.path.samefile(entry, destination)):
+                _link_or_copy(entry, destination, self.link_outputs)
+        except OSError:
+            # The entry was evicted by a concurrent run; fall back to rendering.
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        return True
+
+    def store(self, key, fmt, rendered_path):
+        """
+        Adds a freshly rendered image to the cache and evicts old entries if needed.
+
+        Args:
+            key (str): The cache key.
+            fmt (str): The output format, e.g. "png".
+            rendered_path (str): Path of the rendered image.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = self.entry_path(key, fmt)
+        # Write under a temporary name first so concurrent readers never see a partial
+        # file. Always copy: the rendered image stays in 'outputs', where it may be
+        # rewritten, and must not share its inode with the entry.
+        tmp_path = f"{entry}.{os.getpid()}.tmp"
+        try:
+            _link_or_copy(rendered_path, tmp_path, link=False)
+            replaced = _size(entry)
+            os.replace(tmp_path, entry)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._added(_size(entry) - replaced)
+
+    def read(self, key, fmt):
+        """
+        Returns the cached image for a key as bytes, for callers that serve images
+        from memory instead of 'outputs'.
+
+        Args:
+            key (str): The cache key.
+            fmt (str): The output format, e.g. "png".
+
+        Returns:
+            bytes or None: The image, or None on a cache miss.
+        """
+        entry = self.entry_path(key, fmt)
+        try:
+            with open(entry, "rb") as file:
+                data = file.read()
+            os.utime(entry)  # Mark as recently used for LRU eviction
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def write(self, key, fmt, data):
+        """
+        Adds a rendered image given as bytes to the cache and evicts old entries if needed.
+
+        Args:
+            key (str): The cache key.
+            fmt (str): The output format, e.g. "png".
+            data (bytes): The image.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = self.entry_path(key, fmt)
+        # Unique per thread as well, since a service may write from several threads
+        tmp_path = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as file:
+                file.write(data)
+            replaced = _size(entry)
+            os.replace(tmp_path, entry)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._added(len(data) - replaced)
+
+    def matches(self, key, fmt, path):
+        """
+        Checks whether an existing output file is identical to the cached image for a key.
+
+        Args:
+            key (str): The cache key.
+            fmt (str): The output format, e.g. "png".
+            path (str): Path of the existing output file.
+
+        Returns:
+            bool: True if the file can be reused as the output for this key.
+        """
+        entry = self.entry_path(key, fmt)
+        try:
+            return os.path.samefile(entry, path) or filecmp.cmp(
+                entry, path, shallow=False
+            )
+        except OSError:
+            return False
+
+    def evict(self):
+        """
+        Scans the cache directory, removes the least recently used entries until the
+        cache fits in EVICTION_TARGET of max_bytes, and resets the running total to
+        what is left.
+        """
+        with self._lock:
+            self._total = self._evict()
+
+    def _added(self, size):
+        """
+        Adds the size of a stored entry to the running total, evicting only when the
+        total exceeds max_bytes. The first store scans the directory to seed the total.
+        """
+        with self._lock:
+            if self._total is not None:
+                self._total += size
+                if self._total <= self.max_bytes:
+                    return
+            self._total = self._evict()
+
+    def _evict(self):
+        """
+        Evicts least recently used entries down to EVICTION_TARGET of max_bytes if the
+        cache exceeds max_bytes, and returns the size of the remaining entries.
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+        if total <= self.max_bytes:
+            return total
+        entries.sort()
+        target = self.max_bytes * EVICTION_TARGET
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+
+def fingerprint(value):
+    """
+    Hashes a YAML-loaded value into a digest that is stable across runs and key order.
+
+    Args:
+        value: The value, e.g. an automaton definition.
+
+    Returns:
+        str: A hex SHA-256 digest.
+    """
+    payload = json.dumps(
+        _canonical(value),
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _canonical(value):
+    """
+    Normalizes a YAML-loaded value so it can be serialized deterministically. Mapping keys
+    are stringified because YAML happily mixes int and str keys (e.g. `0:` and `ε:`).
+    """
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def _size(path):
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _link_or_copy(source, destination, link=True):
+    if os.path.lexists(destination):
+        os.remove(destination)
+    if link:
+        try:
+            os.link(source, destination)
+            return
+        except OSError:
+            pass
+    shutil.copyfile(source, destination)
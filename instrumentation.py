@@ -0,0 +1,211 @@
+import cProfile
+import csv
+import heapq
+import json
+import os
+import time
+
+# Phases of processing one automaton, in pipeline order
+PHASES = ("parse", "filename", "convert", "validate", "cache", "build", "render")
+
+METRIC_FIELDS = (
+    "kind",
+    "name",
+    "output",
+    "error",
+    "cache",
+    "elapsed",
+    "states",
+    "edges",
+    "transitions",
+    "output_bytes",
+)
+
+
+def add_phase(timings, phase, start):
+    """
+    Adds the time elapsed since start to a phase.
+
+    Args:
+        timings (dict): Seconds per phase, updated in place.
+        phase (str): The phase name.
+        start (float): time.perf_counter() value at the start of the phase.
+
+    Returns:
+        float: The current time.perf_counter(), to start the next phase with.
+    """
+    now = time.perf_counter()
+    timings[phase] = timings.get(phase, 0.0) + now - start
+    return now
+
+
+def summarize(results):
+    """
+    Aggregates the phase timings of a run.
+
+    Args:
+        results (list): Per-automaton results with a "phases" dict.
+
+    Returns:
+        list: (phase, total seconds, mean seconds, max seconds, share of the total)
+            tuples for every phase that was timed, in pipeline order.
+    """
+    totals = {}
+    maxima = {}
+    for result in results:
+        for phase, seconds in (result.get("phases") or {}).items():
+            totals[phase] = totals.get(phase, 0.0) + seconds
+            maxima[phase] = max(maxima.get(phase, 0.0), seconds)
+    overall = sum(totals.values())
+    order = list(PHASES) + sorted(set(totals) - set(PHASES))
+    return [
+        (
+            phase,
+            totals[phase],
+            totals[phase] / len(results),
+            maxima[phase],
+            totals[phase] / overall if overall > 0 else 0.0,
+        )
+        for phase in order
+        if phase in totals
+    ]
+
+
+def format_summary(results, slowest=3):
+    """
+    Formats the phase summary of a run and its slowest automata as a text table.
+
+    Args:
+        results (list): Per-automaton results.
+        slowest (int): Number of slowest automata to list.
+
+    Returns:
+        str: The table.
+    """
+    lines = [
+        f"{'phase':<10}{'total':>10}{'mean':>11}{'max':>11}{'share':>8}",
+    ]
+    for phase, total, mean, maximum, share in summarize(results):
+        lines.append(
+            f"{phase:<10}{total:>9.3f}s{mean * 1000:>9.2f}ms{maximum * 1000:>9.2f}ms{share:>8.1%}"
+        )
+    ranked = heapq.nlargest(slowest, results, key=lambda result: result["elapsed"])
+    if ranked:
+        lines.append("slowest:")
+        for result in ranked:
+            phases = result.get("phases") or {}
+            phase = max(phases, key=phases.get) if phases else "-"
+            lines.append(
+                f"  {result['kind'].upper()} '{result['name']}': "
+                f"{result['elapsed']:.3f}s (mostly {phase})"
+            )
+    return "\n".join(lines)
+
+
+def write_metrics(results, filename):
+    """
+    Writes per-automaton metrics as JSON, or as CSV when the filename ends in '.csv'.
+
+    Args:
+        results (list): Per-automaton results.
+        filename (str): Destination path.
+    """
+    if filename.lower().endswith(".csv"):
+        phases = [phase for phase, *_ in summarize(results)]
+        with open(filename, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(list(METRIC_FIELDS) + [f"{phase}_seconds" for phase in phases])
+            for result in results:
+                timings = result.get("phases") or {}
+                writer.writerow(
+                    [result.get(field) for field in METRIC_FIELDS]
+                    + [timings.get(phase, 0.0) for phase in phases]
+                )
+        return
+
+    summary = [
+        {"phase": phase, "total": total, "mean": mean, "max": maximum, "share": share}
+        for phase, total, mean, maximum, share in summarize(results)
+    ]
+    automata = [
+        {**{field: result.get(field) for field in METRIC_FIELDS}, "phases": result.get("phases") or {}}
+        for result in results
+    ]
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump({"summary": summary, "automata": automata}, file, indent=2, ensure_ascii=False)
+
+
+class SlowestAutomata:
+    """
+    Keeps the tasks of the N slowest automata of a run, so they can be profiled
+    afterwards without holding on to every definition.
+
+    Attributes:
+        limit (int): Number of automata kept.
+    """
+
+    def __init__(self, limit):
+        """
+        Initializes SlowestAutomata.
+
+        Args:
+            limit (int): Number of automata kept.
+        """
+        self.limit = limit
+        self._heap = []
+        self._counter = 0
+
+    def offer(self, result, task):
+        """
+        Records a finished automaton if it is among the slowest so far.
+
+        Args:
+            result (dict): Its result, with the elapsed time.
+            task (tuple): The task it was rendered from.
+        """
+        if self.limit <= 0:
+            return
+        # The counter breaks ties, so tasks themselves are never compared
+        entry = (result["elapsed"], self._counter, result["name"], task)
+        self._counter += 1
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def entries(self):
+        """
+        Returns:
+            list: (elapsed, name, task) tuples, slowest first.
+        """
+        return [
+            (elapsed, name, task)
+            for elapsed, _, name, task in sorted(self._heap, reverse=True)
+        ]
+
+
+def profile_tasks(entries, function, directory, logger):
+    """
+    Runs function(*task) again under cProfile for each entry and dumps the statistics
+    to '<directory>/<rank>_<name>.prof', readable with pstats or snakeviz.
+
+    Args:
+        entries (list): (elapsed, name, task) tuples, e.g. from SlowestAutomata.entries.
+        function (callable): The function that processed each task.
+        directory (str): Directory for the profile dumps.
+        logger (logging.Logger): Logger for the dump paths.
+
+    Returns:
+        list: Paths of the written profiles.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for rank, (elapsed, name, task) in enumerate(entries, start=1):
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(name))
+        path = os.path.join(directory, f"{rank}_{safe_name}.prof")
+        profiler = cProfile.Profile()
+        profiler.runcall(function, *task)
+        profiler.dump_stats(path)
+        logger.info(f"Profile of '{name}' ({elapsed:.3f}s in the run) saved as {path}")
+        paths.append(path)
+    return paths
@@ -0,0 +1,16 @@
+from .streaming_loader import (
+    get_safe_loader,
+    infer_kind,
+    iter_automata,
+    iter_json_lines,
+    iter_yaml_documents,
+)
+from .precompiled import (
+    PRECOMPILED_EXTENSION,
+    PrecompiledFormatError,
+    export_precompiled,
+    is_fresh,
+    iter_precompiled,
+    load_precompiled,
+    precompiled_path,
+)
@@ -0,0 +1,471 @@
+import hashlib
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from converters import compile_regex
+from models import (
+    CompiledNFA,
+    CompiledPDA,
+    SymbolTable,
+    ValidatedDefinition,
+)
+from validators import validate_nfa, validate_pda
+from .streaming_loader import iter_automata
+
+PRECOMPILED_EXTENSION = ".abin"
+MAGIC = b"AUTOMATA"
+FORMAT_VERSION = 4
+# Arrays and the record index are stored in the byte order of the writing machine
+BYTE_ORDERS = {"little": 0, "big": 1}
+
+# Magic, format version, marshal version, item size of "l" arrays, byte order, source
+# size, source mtime (ns), source SHA-256, number of records, offset of the record index
+HEADER = struct.Struct("<8sHHBBQq32sQQ")
+# Offset and length of every record
+INDEX_ENTRY = struct.Struct("<QQ")
+
+# Record kinds: compiled NFA, compiled PDA, or a definition kept as loaded because it
+# did not pass validation (it is then validated, and rejected, when rendered)
+COMPILED_NFA, COMPILED_PDA, RAW = 0, 1, 2
+
+
+class PrecompiledFormatError(ValueError):
+    """
+    Raised when a precompiled file is unreadable, or was written by an incompatible
+    version or interpreter.
+    """
+
+
+def precompiled_path(source):
+    """
+    Returns the path of the precompiled file kept next to a definition file.
+    """
+    return source + PRECOMPILED_EXTENSION
+
+
+def export_precompiled(source, logger, target=None):
+    """
+    Parses and validates every automaton of a definition file once and writes them to
+    a precompiled file. Transition tables are stored as raw arrays of the smallest item
+    type that fits, so loading it skips YAML parsing, compilation and validation. The
+    states, alphabets and transitions of a definition are not stored a second time:
+    they are rebuilt from the tables when loaded. Only the other keys (name, type,
+    labels, options) are kept as loaded.
+
+    Automata that fail validation are stored as loaded; they are reported when
+    rendered, exactly as from the definition file. Regexes are stored as the NFAs
+    they compile to.
+
+    Args:
+        source (str): Path of the YAML or JSON Lines definition file.
+        logger (logging.Logger): Logger for progress.
+        target (str, optional): Output path; defaults to precompiled_path(source).
+
+    Returns:
+        str: The path of the precompiled file.
+
+    Raises:
+        ValueError: If a definition holds values that cannot be stored (e.g. dates).
+    """
+    target = target or precompiled_path(source)
+    stat = os.stat(source)
+    digest = _file_digest(source)
+    quiet = _quiet_logger()
+
+    temporary = f"{target}.{os.getpid()}.tmp"
+    index = array("Q")
+    try:
+        with open(temporary, "wb") as file:
+            file.write(bytes(HEADER.size))
+            invalid = 0
+            for kind, automaton in iter_automata(source):
+                record = _compile_record(kind, automaton, quiet)
+                invalid += record[0] == RAW
+                try:
+                    payload = marshal.dumps(record)
+                except ValueError:
+                    raise ValueError(
+                        f"Automaton '{_name(automaton)}' in {source} holds values that "
+                        "cannot be precompiled."
+                    )
+                index.extend((file.tell(), len(payload)))
+                file.write(payload)
+
+            index_offset = file.tell()
+            file.write(index.tobytes())
+            file.seek(0)
+            file.write(
+                HEADER.pack(
+                    MAGIC,
+                    FORMAT_VERSION,
+                    marshal.version,
+                    array("l").itemsize,
+                    BYTE_ORDERS[sys.byteorder],
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    digest,
+                    len(index) // 2,
+                    index_offset,
+                )
+            )
+        os.replace(temporary, target)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+    logger.info(
+        f"Precompiled {len(index) // 2} automata from {source} into {target}"
+        + (f" ({invalid} failed validation and were stored as loaded)." if invalid else ".")
+    )
+    return target
+
+
+def is_fresh(target, source):
+    """
+    Checks whether a precompiled file is readable by this interpreter and up to date
+    with its definition file. A source whose size and modification time are unchanged
+    is not read; one that was only touched is recognized by its SHA-256, and its new
+    modification time is written to the header so the next check skips the hash.
+
+    Args:
+        target (str): Path of the precompiled file.
+        source (str): Path of the definition file it was exported from.
+
+    Returns:
+        bool: True if the precompiled file can be loaded instead of the source.
+    """
+    try:
+        with open(target, "rb") as file:
+            header = _check_header(file.read(HEADER.size))
+        stat = os.stat(source)
+    except (OSError, PrecompiledFormatError):
+        return False
+    *prefix, size, mtime_ns, digest, count, index_offset = header
+    if stat.st_size != size:
+        return False
+    if stat.st_mtime_ns == mtime_ns:
+        return True
+    if _file_digest(source) != digest:
+        return False
+    try:
+        with open(target, "r+b") as file:
+            file.write(
+                HEADER.pack(*prefix, size, stat.st_mtime_ns, digest, count, index_offset)
+            )
+    except OSError:
+        pass  # Read-only copy: still fresh, the hash is just computed again next time
+    return True
+
+
+def iter_precompiled(target):
+    """
+    Yields the automata of a precompiled file one at a time. The file is memory-mapped
+    and each record is decoded when it is reached, so the first automaton is available
+    right away whatever the size of the file.
+
+    Args:
+        target (str): Path of the precompiled file.
+
+    Yields:
+        tuple: (kind, automaton) where kind is "nfa", "pda" or "regex". Validated
+            automata are ValidatedDefinition dicts carrying their compiled model.
+
+    Raises:
+        PrecompiledFormatError: If the file is not a compatible precompiled file.
+    """
+    with open(target, "rb") as file:
+        if os.fstat(file.fileno()).st_size < HEADER.size:
+            raise PrecompiledFormatError(f"{target} is not a precompiled automata file.")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            header = _check_header(data[: HEADER.size], target)
+            count, index_offset = header[8], header[9]
+            index = array("Q")
+            index.frombytes(data[index_offset : index_offset + 2 * count * INDEX_ENTRY.size])
+            for position in range(0, len(index), 2):
+                offset, length = index[position], index[position + 1]
+                yield _load_record(marshal.loads(data[offset : offset + length]))
+
+
+def load_precompiled(source, logger, target=None):
+    """
+    Yields the automata of a definition file from its precompiled file, exporting it
+    first if it is missing or stale. A precompiled file passed as source is read
+    directly. If the definitions cannot be precompiled, they are read from the source.
+
+    Args:
+        source (str): Path of the definition file, or of a precompiled file.
+        logger (logging.Logger): Logger for progress and fallbacks.
+        target (str, optional): Path of the precompiled file; defaults to
+            precompiled_path(source).
+
+    Yields:
+        tuple: (kind, automaton) as yielded by iter_precompiled.
+    """
+    if source.endswith(PRECOMPILED_EXTENSION):
+        yield from iter_precompiled(source)
+        return
+    target = target or precompiled_path(source)
+    if is_fresh(target, source):
+        logger.info(f"Loading {source} from its precompiled file {target}")
+    else:
+        try:
+            export_precompiled(source, logger, target)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not precompile {source}, reading it directly: {e}")
+            yield from iter_automata(source)
+            return
+    yield from iter_precompiled(target)
+
+
+def _compile_record(kind, automaton, logger):
+    """
+    Validates an automaton and returns its record: the kind, the order of the keys of
+    the definition, the keys that are stored and, if it is valid, its compiled tables.
+    A key that the tables cannot rebuild exactly (e.g. an int symbol, which is compiled
+    to a str) is stored as loaded.
+    """
+    try:
+        if kind == "regex":
+            automaton = compile_regex(automaton, logger)
+            kind = "nfa"
+        if kind == "nfa":
+            model = validate_nfa(automaton, logger)
+            stored = _unrebuilt(automaton, _nfa_fields(model))
+            return (COMPILED_NFA, list(automaton), stored, _dump_nfa(model))
+        if kind == "pda":
+            model = validate_pda(automaton, logger)
+            stored = _unrebuilt(automaton, _pda_fields(model))
+            return (COMPILED_PDA, list(automaton), stored, _dump_pda(model))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return (RAW, None, automaton, kind)
+
+
+def _load_record(record):
+    """
+    Turns a decoded record back into a (kind, automaton) pair.
+    """
+    record_kind, keys, stored, tables = record
+    if record_kind == COMPILED_NFA:
+        model = _load_nfa(tables)
+        return "nfa", ValidatedDefinition(_rebuild(keys, stored, _nfa_fields, model), model)
+    if record_kind == COMPILED_PDA:
+        model = _load_pda(tables)
+        return "pda", ValidatedDefinition(_rebuild(keys, stored, _pda_fields, model), model)
+    return tables, stored
+
+
+def _unrebuilt(automaton, fields):
+    """
+    Returns the keys of a definition that its rebuilt fields do not reproduce.
+    """
+    return {
+        key: value
+        for key, value in automaton.items()
+        if key not in fields or fields[key] != value
+    }
+
+
+def _rebuild(keys, stored, fields, model):
+    """
+    Restores a definition in its original key order, rebuilding the keys that were not
+    stored from the compiled model.
+    """
+    if len(stored) == len(keys):
+        return stored
+    rebuilt = fields(model)
+    return {key: stored[key] if key in stored else rebuilt[key] for key in keys}
+
+
+def _nfa_fields(model):
+    """
+    Rebuilds the states, alphabet and transitions of a definition from its compiled NFA.
+    """
+    state_names = model.states.names
+    symbol_names = model.symbols.names
+    transitions = {state_names[state]: {} for state in model.sources}
+    for s, y, d in zip(model.src, model.sym, model.dst):
+        row = transitions[state_names[s]]
+        targets = row.get(symbol_names[y])
+        if targets is None:
+            row[symbol_names[y]] = [state_names[d]]
+        else:
+            targets.append(state_names[d])
+    return {
+        "states": model.states.declared_names(),
+        "alphabet": model.symbols.declared_names(),
+        "transitions": transitions,
+    }
+
+
+def _pda_fields(model):
+    """
+    Rebuilds the states, alphabets and transitions of a definition from its compiled
+    PDA.
+    """
+    state_names = model.states.names
+    input_names = model.input_symbols.names
+    stack_names = model.stack_symbols.names
+    push_names = model.pushes.names
+    transitions = {state_names[state]: {} for state in model.sources}
+    for s, i, t, d, p in zip(model.src, model.inp, model.top, model.dst, model.push):
+        by_top = transitions[state_names[s]].setdefault(input_names[i], {})
+        by_top.setdefault(stack_names[t], []).append([state_names[d], push_names[p]])
+    return {
+        "states": model.states.declared_names(),
+        "input_alphabet": model.input_symbols.declared_names(),
+        "stack_alphabet": model.stack_symbols.declared_names(),
+        "transitions": transitions,
+    }
+
+
+def _dump_nfa(model):
+    return (
+        model.name,
+        model.type,
+        _dump_table(model.states),
+        _dump_table(model.symbols),
+        _dump_array(model.sources),
+        _dump_array(model.src),
+        _dump_array(model.sym),
+        _dump_array(model.dst),
+        model.start,
+        sorted(model.finals),
+    )
+
+
+def _load_nfa(tables):
+    name, type, states, symbols, sources, src, sym, dst, start, finals = tables
+    return CompiledNFA(
+        name,
+        type,
+        _load_table(states),
+        _load_table(symbols),
+        _load_array(sources),
+        _load_array(src),
+        _load_array(sym),
+        _load_array(dst),
+        start,
+        frozenset(finals),
+    )
+
+
+def _dump_pda(model):
+    return (
+        model.name,
+        model.type,
+        _dump_table(model.states),
+        _dump_table(model.input_symbols),
+        _dump_table(model.stack_symbols),
+        _dump_table(model.pushes),
+        _dump_array(model.sources),
+        _dump_array(model.src),
+        _dump_array(model.inp),
+        _dump_array(model.top),
+        _dump_array(model.dst),
+        _dump_array(model.push),
+        model.start,
+        model.initial_stack,
+        sorted(model.finals),
+    )
+
+
+def _load_pda(tables):
+    name, type, states, input_symbols, stack_symbols, pushes, *arrays = tables
+    sources, src, inp, top, dst, push, start, initial_stack, finals = arrays
+    return CompiledPDA(
+        name,
+        type,
+        _load_table(states),
+        _load_table(input_symbols),
+        _load_table(stack_symbols),
+        _load_table(pushes),
+        _load_array(sources),
+        _load_array(src),
+        _load_array(inp),
+        _load_array(top),
+        _load_array(dst),
+        _load_array(push),
+        start,
+        initial_stack,
+        frozenset(finals),
+    )
+
+
+def _dump_table(table):
+    return (table.names, table.declared, table.duplicates)
+
+
+def _load_table(table):
+    return SymbolTable.from_names(*table)
+
+
+def _dump_array(values):
+    """
+    Packs an id array with the smallest item type that holds its largest id.
+    """
+    largest = max(values, default=0)
+    typecode = "b" if largest < 1 << 7 else "h" if largest < 1 << 15 else "l"
+    if typecode != values.typecode:
+        values = array(typecode, values)
+    return typecode, values.tobytes()
+
+
+def _load_array(data):
+    typecode, data = data
+    values = array(typecode)
+    values.frombytes(data)
+    return values
+
+
+def _check_header(data, target="file"):
+    """
+    Unpacks a header, checking that this interpreter can read the records behind it.
+    """
+    if len(data) < HEADER.size:
+        raise PrecompiledFormatError(f"{target} is not a precompiled automata file.")
+    header = HEADER.unpack(data)
+    if header[0] != MAGIC:
+        raise PrecompiledFormatError(f"{target} is not a precompiled automata file.")
+    if header[1:5] != (
+        FORMAT_VERSION,
+        marshal.version,
+        array("l").itemsize,
+        BYTE_ORDERS[sys.byteorder],
+    ):
+        raise PrecompiledFormatError(
+            f"{target} was written by another version, interpreter or machine; "
+            "export it again."
+        )
+    return header
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def _quiet_logger():
+    """
+    Returns a logger that drops everything, so validation failures during an export
+    are only reported once, when the automaton is rendered.
+    """
+    logger = logging.getLogger(f"{__name__}.export")
+    logger.propagate = False
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+    return logger
+
+
+def _name(automaton):
+    if isinstance(automaton, dict):
+        return automaton.get("name", "<unnamed>")
+    return "<unnamed>"
@@ -0,0 +1,243 @@
+import json
+from collections import deque
+
+import yaml
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.nodes import SequenceNode
+from yaml.resolver import Resolver
+
+# Top-level YAML keys holding automaton lists, and the kind of automaton they hold
+SECTIONS = {"nfas": "nfa", "pdas": "pda", "regexes": "regex"}
+
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+
+def get_safe_loader():
+    """
+    Returns the fastest available safe YAML loader.
+
+    Returns:
+        type: yaml.CSafeLoader when PyYAML was built against libyaml, else yaml.SafeLoader.
+    """
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def iter_automata(filename):
+    """
+    Yields the automata of a definition file one at a time, so callers can start
+    rendering before the whole file is parsed. The format is picked from the extension:
+    '.jsonl'/'.ndjson' files hold one automaton per line, anything else is read as
+    (possibly multi-document) YAML.
+
+    Args:
+        filename (str): Path of the definition file.
+
+    Yields:
+        tuple: (kind, automaton) where kind is "nfa", "pda" or "regex".
+    """
+    with open(filename, "r", encoding="utf-8") as file:
+        if filename.lower().endswith(JSON_LINES_EXTENSIONS):
+            yield from iter_json_lines(file, filename)
+        else:
+            yield from iter_yaml_documents(file)
+
+
+def iter_json_lines(stream, source="<stream>"):
+    """
+    Yields automata from a JSON Lines stream holding one automaton object per line.
+
+    Args:
+        stream: A text stream.
+        source (str): Name of the stream, used in error messages.
+
+    Yields:
+        tuple: (kind, automaton) where kind is inferred by infer_kind.
+
+    Raises:
+        ValueError: If a line is not a JSON object.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            automaton = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{source}:{line_number}: invalid JSON ({e.msg}).")
+        if not isinstance(automaton, dict):
+            raise ValueError(f"{source}:{line_number}: expected a JSON object.")
+        yield infer_kind(automaton), automaton
+
+
+def iter_yaml_documents(stream, loader=None):
+    """
+    Yields automata from a YAML stream without building the whole document.
+
+    The stream is read as parser events (by libyaml when available) and only one
+    automaton's events are buffered at a time, so memory stays bounded by the largest
+    single automaton. Every document of a multi-document stream is read. Anchors stay
+    defined until the end of their document, as with yaml.safe_load, so an automaton
+    can reuse parts of an earlier one or of a top-level key that is not a section;
+    only anchored nodes are kept once built.
+
+    Args:
+        stream: A text or binary stream.
+        loader (type, optional): A PyYAML loader class; defaults to get_safe_loader().
+
+    Yields:
+        tuple: (kind, automaton) where kind is "nfa", "pda" or "regex".
+    """
+    parser = (loader or get_safe_loader())(stream)
+    try:
+        while not parser.check_event(yaml.StreamEndEvent):
+            event = parser.get_event()
+            if not isinstance(event, yaml.DocumentStartEvent):
+                continue
+
+            if not parser.check_event(yaml.MappingStartEvent):
+                _skip_node(parser)
+                continue
+
+            parser.get_event()
+            # One replay loader per document, so its anchors are shared by the automata
+            loader = _EventReplayLoader()
+            while not parser.check_event(yaml.MappingEndEvent):
+                key = parser.get_event()
+                kind = SECTIONS.get(key.value) if isinstance(key, yaml.ScalarEvent) else None
+                if kind is not None and parser.check_event(yaml.AliasEvent):
+                    # A section given as an alias, e.g. 'nfas: *shared'
+                    node = loader.compose([parser.get_event()])
+                    if isinstance(node, SequenceNode):
+                        for item in node.value:
+                            yield kind, loader.construct(item)
+                    continue
+                if kind is None or not parser.check_event(yaml.SequenceStartEvent):
+                    if not isinstance(key, yaml.ScalarEvent):
+                        _skip_node(parser, key, loader)
+                    _skip_node(parser, loader=loader)
+                    continue
+
+                start = parser.get_event()
+                items = []
+                while not parser.check_event(yaml.SequenceEndEvent):
+                    node = loader.compose(_take_node(parser))
+                    if start.anchor is not None:
+                        items.append(node)
+                    automaton = loader.construct(node)
+                    # Hold no node while suspended, so unanchored ones are freed at once
+                    del node
+                    yield kind, automaton
+                end = parser.get_event()
+                if start.anchor is not None:
+                    loader.anchors[start.anchor] = SequenceNode(
+                        loader.resolve(SequenceNode, start.tag, start.implicit),
+                        items,
+                        start.start_mark,
+                        end.end_mark,
+                        flow_style=start.flow_style,
+                    )
+            parser.get_event()
+    finally:
+        parser.dispose()
+
+
+def infer_kind(automaton):
+    """
+    Infers whether a standalone automaton definition is an NFA, a PDA or a regex.
+
+    Args:
+        automaton (dict): The automaton definition.
+
+    Returns:
+        str: "pda" if it has a stack alphabet or a PDA type, "regex" if it has a
+            pattern or alternatives, else "nfa".
+    """
+    if "pattern" in automaton or "alternatives" in automaton:
+        return "regex"
+    if "stack_alphabet" in automaton or "pda" in str(automaton.get("type", "")).lower():
+        return "pda"
+    return "nfa"
+
+
+def _take_node(parser):
+    """
+    Consumes the events of the next complete node and returns them.
+    """
+    events = [parser.get_event()]
+    depth = _depth_change(events[0])
+    while depth:
+        event = parser.get_event()
+        events.append(event)
+        depth += _depth_change(event)
+    return events
+
+
+def _skip_node(parser, first_event=None, loader=None):
+    """
+    Consumes the events of a node. If first_event was already taken from the parser,
+    the rest of that node is consumed. Without a loader the events are dropped; with
+    one, a node that defines anchors is composed by it so later aliases resolve.
+    """
+    event = first_event if first_event else parser.get_event()
+    events = [event] if loader is not None else None
+    anchored = False
+    depth = _depth_change(event)
+    while True:
+        anchored = anchored or (
+            getattr(event, "anchor", None) is not None
+            and not isinstance(event, yaml.AliasEvent)
+        )
+        if not depth:
+            break
+        event = parser.get_event()
+        depth += _depth_change(event)
+        if events is not None:
+            events.append(event)
+    if events is not None and anchored:
+        loader.compose(events)
+
+
+def _depth_change(event):
+    if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+        return 1
+    if isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+        return -1
+    return 0
+
+
+class _EventReplayLoader(Composer, SafeConstructor, Resolver):
+    """
+    Builds Python objects from buffered lists of parser events using the same
+    composition and safe construction rules as yaml.safe_load. Anchors are kept from
+    one list to the next, so aliases can refer to nodes composed earlier.
+    """
+
+    def __init__(self):
+        self._events = deque()
+        Composer.__init__(self)
+        SafeConstructor.__init__(self)
+        Resolver.__init__(self)
+
+    def check_event(self, *choices):
+        if not self._events:
+            return False
+        if not choices:
+            return True
+        return isinstance(self._events[0], choices)
+
+    def peek_event(self):
+        return self._events[0]
+
+    def get_event(self):
+        return self._events.popleft()
+
+    def compose(self, events):
+        """
+        Composes the node of a complete list of events, recording its anchors.
+        """
+        self._events.extend(events)
+        return self.compose_node(None, None)
+
+    def construct(self, node):
+        return self.construct_document(node)
@@ -1,15 +1,131 @@
+import atexit
 import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+from contextlib import contextmanager
 
+LOG_FILE = "nfa_generation.log"
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+LOG_LEVEL_ENV = "AUTOMATA_LOG_LEVEL"
+DEFAULT_LOG_LEVEL = "INFO"
 
-def setup_logger():
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        handlers=[
+# Handlers that do the actual (slow) writing, owned by the background listener(s)
+_handlers = None
+_listener = None
+
+
+def resolve_log_level(level=None):
+    """
+    Resolves the log level from an explicit value, the AUTOMATA_LOG_LEVEL environment
+    variable, or the INFO default, in that order.
+
+    Args:
+        level (str or int, optional): A level name such as "DEBUG", or a number.
+
+    Returns:
+        int: The numeric log level.
+
+    Raises:
+        ValueError: If the level is not a known level name or a number.
+    """
+    if level is None:
+        level = os.environ.get(LOG_LEVEL_ENV) or DEFAULT_LOG_LEVEL
+    if isinstance(level, int):
+        return level
+    name = str(level).strip().upper()
+    if name.isdigit():
+        return int(name)
+    resolved = logging.getLevelName(name)
+    if not isinstance(resolved, int):
+        raise ValueError(f"Unknown log level '{level}'.")
+    return resolved
+
+
+def setup_logger(level=None):
+    """
+    Configures logging once per process and returns the application logger.
+
+    Records are put on an in-memory queue by a QueueHandler and written to the log file
+    and the console by a QueueListener thread, so logging calls never wait for disk or
+    terminal I/O. Calling it again only changes the level, if one is given.
+
+    Args:
+        level (str or int, optional): Log level; see resolve_log_level.
+
+    Returns:
+        logging.Logger: The application logger.
+    """
+    global _handlers, _listener
+    root = logging.getLogger()
+    if _handlers is None:
+        formatter = logging.Formatter(LOG_FORMAT)
+        _handlers = [
             logging.FileHandler(
-                "nfa_generation.log", encoding="utf-8"
+                LOG_FILE, encoding="utf-8"
             ),  # Set encoding to UTF-8 for file output
             logging.StreamHandler(),  # Console output
-        ],
-    )
+        ]
+        for handler in _handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, *_handlers)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(resolve_log_level(level))
+    elif level is not None:
+        root.setLevel(resolve_log_level(level))
     return logging.getLogger(__name__)
+
+
+def shutdown_logging():
+    """
+    Stops the background listener after writing every queued record.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+@contextmanager
+def worker_log_queue():
+    """
+    Provides a queue that worker processes log to (see init_worker_logging). Records
+    are written by this process's handlers while the context is open.
+
+    Yields:
+        multiprocessing.Queue: The queue to pass to the workers.
+    """
+    setup_logger()
+    log_queue = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(log_queue, *_handlers)
+    listener.start()
+    try:
+        yield log_queue
+    finally:
+        listener.stop()
+        log_queue.close()
+
+
+def init_worker_logging(log_queue, level):
+    """
+    Process pool initializer that sends every record of the worker to log_queue, so
+    that the worker does not open the log file itself.
+
+    Args:
+        log_queue (multiprocessing.Queue): Queue from worker_log_queue.
+        level (int): Log level of the parent process.
+    """
+    global _handlers, _listener
+    root = logging.getLogger()
+    # Forked workers inherit the parent's handler, whose queue nobody reads here
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    _handlers = []
+    _listener = None
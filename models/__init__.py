@@ -0,0 +1,10 @@
+from .compiled_automaton import (
+    EPSILON,
+    CompiledNFA,
+    CompiledPDA,
+    SymbolTable,
+    ValidatedDefinition,
+    compile_nfa,
+    compile_pda,
+    normalize_symbol,
+)
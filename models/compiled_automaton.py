@@ -0,0 +1,375 @@
+from array import array
+
+EPSILON = "ε"
+MISENCODED_EPSILON = "Îµ"
+
+
+def normalize_symbol(symbol):
+    """
+    Converts a transition symbol to the string drawn on the diagram, mapping the
+    mis-encoded epsilon produced by some editors back to 'ε'.
+
+    Args:
+        symbol: A symbol as loaded from YAML (YAML turns `0:` into an int).
+
+    Returns:
+        str: The normalized symbol.
+    """
+    symbol = str(symbol)
+    return EPSILON if symbol == MISENCODED_EPSILON else symbol
+
+
+class SymbolTable:
+    """
+    Interns names (states or symbols) to consecutive integer ids.
+
+    The names declared in the automaton definition get the ids 0..declared-1. Names that
+    only show up in transitions are interned after them, so "is this name declared?" is a
+    single integer comparison.
+
+    Attributes:
+        names (list): The name of every id.
+        ids (dict): Maps each name to its id.
+        declared (int): Number of declared names.
+        duplicates (list): Names listed more than once in the declaration.
+    """
+
+    __slots__ = ("names", "ids", "declared", "duplicates")
+
+    def __init__(self, declared=()):
+        self.names = []
+        self.ids = {}
+        self.duplicates = []
+        for name in declared:
+            if name in self.ids:
+                self.duplicates.append(name)
+            else:
+                self.intern(name)
+        self.declared = len(self.names)
+
+    def intern(self, name):
+        """
+        Returns the id of a name, assigning the next free id if it is new.
+        """
+        ids = self.ids
+        if name in ids:
+            return ids[name]
+        ids[name] = index = len(self.names)
+        self.names.append(name)
+        return index
+
+    @classmethod
+    def from_names(cls, names, declared, duplicates=()):
+        """
+        Rebuilds a table from its names, e.g. as stored in a precompiled file.
+
+        Args:
+            names (list): The name of every id.
+            declared (int): Number of declared names.
+            duplicates (list): Names listed more than once in the declaration.
+
+        Returns:
+            SymbolTable: The table.
+        """
+        table = cls()
+        table.names = list(names)
+        table.ids = dict(zip(table.names, range(len(table.names))))
+        table.declared = declared
+        table.duplicates = list(duplicates)
+        return table
+
+    def get(self, name, default=-1):
+        """
+        Returns the id of a name, or the default if the name was never interned.
+        """
+        return self.ids.get(name, default)
+
+    def is_declared(self, index):
+        return 0 <= index < self.declared
+
+    def declared_names(self):
+        return self.names[: self.declared]
+
+    def __contains__(self, name):
+        return self.ids.get(name, self.declared) < self.declared
+
+    def __len__(self):
+        return len(self.names)
+
+
+class ValidatedDefinition(dict):
+    """
+    An automaton definition that already passed validation, e.g. when it was loaded
+    from a precompiled file. Generators use its model as is and skip validation.
+
+    Attributes:
+        model (CompiledNFA or CompiledPDA): Index-backed form of the definition.
+    """
+
+    __slots__ = ("model",)
+
+    def __init__(self, definition, model):
+        super().__init__(definition)
+        self.model = model
+
+
+class CompiledNFA:
+    """
+    Index-backed NFA built once from the YAML dict and shared by the validators and the
+    generator. Transition i goes from src[i] to dst[i] on sym[i].
+
+    Attributes:
+        name (str): Name of the NFA.
+        type (str): Type of the NFA as given in the definition.
+        states (SymbolTable): State names; undeclared states referenced by transitions
+            have ids >= states.declared.
+        symbols (SymbolTable): Normalized symbols; the alphabet is declared.
+        sources (array): Ids of the states used as keys of the transitions mapping.
+        src (array): Source state id of every transition.
+        sym (array): Symbol id of every transition.
+        dst (array): Target state id of every transition.
+        start (int): Id of the start state.
+        finals (frozenset): Ids of the final states.
+        epsilon (int): Id of 'ε' in symbols, or -1 if it is never used.
+    """
+
+    __slots__ = (
+        "name",
+        "type",
+        "states",
+        "symbols",
+        "sources",
+        "src",
+        "sym",
+        "dst",
+        "start",
+        "finals",
+        "epsilon",
+    )
+
+    def __init__(self, name, type, states, symbols, sources, src, sym, dst, start, finals):
+        self.name = name
+        self.type = type
+        self.states = states
+        self.symbols = symbols
+        self.sources = sources
+        self.src = src
+        self.sym = sym
+        self.dst = dst
+        self.start = start
+        self.finals = finals
+        self.epsilon = symbols.get(EPSILON)
+
+    @property
+    def num_transitions(self):
+        return len(self.src)
+
+    def transitions(self):
+        """
+        Yields every transition by name, in definition order.
+
+        Yields:
+            tuple: (state, symbol, next_state)
+        """
+        state_names = self.states.names
+        symbol_names = self.symbols.names
+        for s, y, d in zip(self.src, self.sym, self.dst):
+            yield state_names[s], symbol_names[y], state_names[d]
+
+
+class CompiledPDA:
+    """
+    Index-backed PDA built once from the YAML dict. Transition i goes from src[i] to
+    dst[i] reading inp[i] with top[i] on the stack and replaces it by pushes[push[i]].
+
+    Attributes:
+        name (str): Name of the PDA.
+        type (str): Type of the PDA as given in the definition.
+        states (SymbolTable): State names.
+        input_symbols (SymbolTable): Normalized input symbols; the input alphabet is
+            declared.
+        stack_symbols (SymbolTable): Normalized stack symbols; the stack alphabet is
+            declared.
+        pushes (SymbolTable): Distinct normalized stack operations (the pushed strings).
+        sources (array): Ids of the states used as keys of the transitions mapping.
+        src (array): Source state id of every transition.
+        inp (array): Input symbol id of every transition.
+        top (array): Stack symbol id of every transition.
+        dst (array): Target state id of every transition.
+        push (array): Id in pushes of every transition's stack operation.
+        start (int): Id of the start state.
+        initial_stack (int): Id of the initial stack symbol.
+        finals (frozenset): Ids of the final states.
+        epsilon (int): Id of 'ε' in input_symbols, or -1 if it is never used.
+    """
+
+    __slots__ = (
+        "name",
+        "type",
+        "states",
+        "input_symbols",
+        "stack_symbols",
+        "pushes",
+        "sources",
+        "src",
+        "inp",
+        "top",
+        "dst",
+        "push",
+        "start",
+        "initial_stack",
+        "finals",
+        "epsilon",
+    )
+
+    def __init__(
+        self,
+        name,
+        type,
+        states,
+        input_symbols,
+        stack_symbols,
+        pushes,
+        sources,
+        src,
+        inp,
+        top,
+        dst,
+        push,
+        start,
+        initial_stack,
+        finals,
+    ):
+        self.name = name
+        self.type = type
+        self.states = states
+        self.input_symbols = input_symbols
+        self.stack_symbols = stack_symbols
+        self.pushes = pushes
+        self.sources = sources
+        self.src = src
+        self.inp = inp
+        self.top = top
+        self.dst = dst
+        self.push = push
+        self.start = start
+        self.initial_stack = initial_stack
+        self.finals = finals
+        self.epsilon = input_symbols.get(EPSILON)
+
+    @property
+    def num_transitions(self):
+        return len(self.src)
+
+    def transitions(self):
+        """
+        Yields every transition by name, in definition order.
+
+        Yields:
+            tuple: (state, input_symbol, stack_symbol, next_state, stack_operation)
+        """
+        state_names = self.states.names
+        input_names = self.input_symbols.names
+        stack_names = self.stack_symbols.names
+        push_names = self.pushes.names
+        for s, i, t, d, p in zip(self.src, self.inp, self.top, self.dst, self.push):
+            yield state_names[s], input_names[i], stack_names[t], state_names[d], push_names[p]
+
+
+def compile_nfa(nfa):
+    """
+    Builds the index-backed representation of an NFA definition. No validation happens
+    here: undefined states are interned like any other name and flagged by their id.
+
+    Args:
+        nfa (dict): NFA data as loaded from YAML. The keys checked by
+            validate_nfa must be present.
+
+    Returns:
+        CompiledNFA: The compiled NFA.
+    """
+    states = SymbolTable(nfa["states"])
+    symbols = SymbolTable(normalize_symbol(symbol) for symbol in nfa.get("alphabet") or [])
+    sources = array("l")
+    src, sym, dst = array("l"), array("l"), array("l")
+
+    intern_state = states.intern
+    intern_symbol = symbols.intern
+    add_src, add_sym, add_dst = src.append, sym.append, dst.append
+    for state, transitions_dict in nfa["transitions"].items():
+        state_id = intern_state(state)
+        sources.append(state_id)
+        for symbol, next_states in (transitions_dict or {}).items():
+            symbol_id = intern_symbol(normalize_symbol(symbol))
+            for next_state in next_states:
+                add_src(state_id)
+                add_sym(symbol_id)
+                add_dst(intern_state(next_state))
+
+    return CompiledNFA(
+        nfa["name"],
+        nfa["type"],
+        states,
+        symbols,
+        sources,
+        src,
+        sym,
+        dst,
+        intern_state(nfa["start_state"]),
+        frozenset(intern_state(state) for state in nfa["final_states"]),
+    )
+
+
+def compile_pda(pda):
+    """
+    Builds the index-backed representation of a PDA definition. No validation happens
+    here: undefined states and symbols are interned like any other name and flagged by
+    their id.
+
+    Args:
+        pda (dict): PDA data as loaded from YAML. The fields checked by
+            validate_pda must be present.
+
+    Returns:
+        CompiledPDA: The compiled PDA.
+    """
+    states = SymbolTable(pda["states"])
+    input_symbols = SymbolTable(normalize_symbol(s) for s in pda["input_alphabet"])
+    stack_symbols = SymbolTable(normalize_symbol(s) for s in pda["stack_alphabet"])
+    pushes = SymbolTable()
+    sources = array("l")
+    src, inp, top = array("l"), array("l"), array("l")
+    dst, push = array("l"), array("l")
+
+    intern_state = states.intern
+    for state, transitions in pda["transitions"].items():
+        state_id = intern_state(state)
+        sources.append(state_id)
+        for input_symbol, stack_transitions in (transitions or {}).items():
+            input_id = input_symbols.intern(normalize_symbol(input_symbol))
+            for stack_symbol, results in (stack_transitions or {}).items():
+                stack_id = stack_symbols.intern(normalize_symbol(stack_symbol))
+                for next_state, stack_operation in results:
+                    src.append(state_id)
+                    inp.append(input_id)
+                    top.append(stack_id)
+                    dst.append(intern_state(next_state))
+                    push.append(pushes.intern(normalize_symbol(stack_operation)))
+
+    return CompiledPDA(
+        pda.get("name"),
+        pda.get("type"),
+        states,
+        input_symbols,
+        stack_symbols,
+        pushes,
+        sources,
+        src,
+        inp,
+        top,
+        dst,
+        push,
+        intern_state(pda["start_state"]),
+        stack_symbols.intern(normalize_symbol(pda["initial_stack"])),
+        frozenset(intern_state(state) for state in pda["final_states"]),
+    )
@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+from converters import compile_regex
+from generators import NFA_Generator, PDA_Generator, RenderCache
+from generators.render_cache import fingerprint
+from loaders import get_safe_loader, infer_kind
+from logging_config import setup_logger
+
+# Regexes are compiled to NFAs before they are rendered
+GENERATORS = {"nfa": NFA_Generator, "pda": PDA_Generator, "regex": NFA_Generator}
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "dot": "text/vnd.graphviz",
+    "plain": "text/plain",
+}
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+class ServiceBusyError(Exception):
+    """
+    Raised when a render request arrives while the queue is full.
+    """
+
+
+class MemoryCache:
+    """
+    Least recently used store of rendered images, bounded by their total size.
+
+    Attributes:
+        max_bytes (int): Size limit in bytes.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, key):
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+
+class RenderService:
+    """
+    Renders automata to image bytes for concurrent clients without writing to 'outputs'.
+
+    At most max_processes renders (and so Graphviz processes) run at once, on a thread
+    pool that keeps the event loop free. Up to max_queue further requests wait for a
+    slot; beyond that, requests are rejected with ServiceBusyError so that clients back
+    off instead of piling up. Identical concurrent requests share one render, and
+    results are kept in an in-memory LRU cache and, optionally, the on-disk RenderCache
+    shared with app.py.
+
+    Attributes:
+        logger (logging.Logger): Logger for requests and errors.
+        max_processes (int): Maximum number of concurrent renders.
+        max_queue (int): Maximum number of requests waiting for a render slot.
+        cache (RenderCache): Optional on-disk cache.
+        render_settings (dict): Render settings applied to every request.
+        timeout (float): Seconds before a single layout is aborted.
+    """
+
+    def __init__(
+        self,
+        logger,
+        max_processes=None,
+        max_queue=64,
+        cache=None,
+        memory_cache_bytes=64 * 1024 * 1024,
+        render_settings=None,
+        timeout=30,
+    ):
+        """
+        Initializes the RenderService.
+
+        Args:
+            logger (logging.Logger): Logger for requests and errors.
+            max_processes (int, optional): Concurrent renders; defaults to the CPU count.
+            max_queue (int): Requests allowed to wait for a render slot.
+            cache (RenderCache, optional): On-disk cache to read from and add to.
+            memory_cache_bytes (int): Size limit of the in-memory cache (0 disables it).
+            render_settings (dict, optional): Render settings for every request.
+            timeout (float): Seconds before a single layout is aborted.
+        """
+        self.logger = logger
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.cache = cache
+        self.render_settings = render_settings or {}
+        self.timeout = timeout
+        self._memory = MemoryCache(memory_cache_bytes) if memory_cache_bytes else None
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_processes, thread_name_prefix="render"
+        )
+        self._slots = asyncio.Semaphore(self.max_processes)
+        self._regex_lock = threading.Lock()  # The shared regex compiler is not thread-safe
+        self._inflight = {}
+        self._waiting = 0
+        self._running = 0
+
+    async def render(self, kind, automaton, fmt="png"):
+        """
+        Renders an automaton, serving it from a cache when possible.
+
+        Args:
+            kind (str): "nfa", "pda" or "regex".
+            automaton (dict): The automaton definition.
+            fmt (str): Output format.
+
+        Returns:
+            bytes: The rendered image.
+
+        Raises:
+            ServiceBusyError: If the queue is full.
+            ValueError: If the definition is invalid.
+            RuntimeError: If Graphviz fails.
+            subprocess.TimeoutExpired: If the layout takes longer than the timeout.
+        """
+        if kind not in GENERATORS:
+            raise ValueError(f"Unknown automaton kind '{kind}'; expected 'nfa', 'pda' or 'regex'.")
+        settings = {**self.render_settings, "format": fmt}
+        key = fingerprint({"kind": kind, "definition": automaton, "settings": settings})
+        if self._memory is not None:
+            data = self._memory.get(key)
+            if data is not None:
+                return data
+
+        # Identical requests in flight share one render
+        shared = self._inflight.get(key)
+        if shared is not None:
+            return await asyncio.shield(shared)
+
+        if self._waiting + self._running >= self.max_processes + self.max_queue:
+            raise ServiceBusyError(
+                f"{self._running} renders running and {self._waiting} queued; try again later."
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._waiting += 1
+        queued = True
+        try:
+            async with self._slots:
+                self._waiting -= 1
+                queued = False
+                self._running += 1
+                try:
+                    data = await asyncio.get_running_loop().run_in_executor(
+                        self._executor, self._render_sync, kind, automaton, settings
+                    )
+                finally:
+                    self._running -= 1
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case no other request shares it
+            future.exception()
+            raise
+        else:
+            future.set_result(data)
+            if self._memory is not None:
+                self._memory.put(key, data)
+            return data
+        finally:
+            if queued:
+                self._waiting -= 1
+            del self._inflight[key]
+
+    def _render_sync(self, kind, automaton, settings):
+        # Runs on a pool thread; the slots semaphore keeps at most max_processes busy
+        if kind == "regex":
+            with self._regex_lock:
+                automaton = compile_regex(automaton, self.logger)
+            # Cached under the same key as app.py, which renders the compiled NFA
+            kind = "nfa"
+        generator = GENERATORS[kind](automaton, self.logger, settings)
+        if self.cache is not None:
+            cache_key = self.cache.make_key(kind, automaton, generator.render_settings)
+            data = self.cache.read(cache_key, settings["format"])
+            if data is not None:
+                return data
+        data = generator.render_bytes(timeout=self.timeout)
+        if self.cache is not None:
+            self.cache.write(cache_key, settings["format"], data)
+        return data
+
+    def status(self):
+        """
+        Returns:
+            dict: The number of running and queued renders and the configured limits.
+        """
+        return {
+            "running": self._running,
+            "queued": self._waiting,
+            "max_processes": self.max_processes,
+            "max_queue": self.max_queue,
+        }
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves one HTTP/1.1 request per connection:
+
+        - GET /health returns the status as JSON.
+        - POST /render?format=png&kind=nfa renders the automaton in the request body,
+          given as JSON or YAML. The kind is inferred when omitted.
+        """
+        try:
+            status, content_type, body, headers = await self._respond(reader)
+        except Exception as e:  # Never let one request take the server down
+            self.logger.error(f"Unexpected error while serving a request: {e}")
+            status, content_type, body, headers = _error(500, str(e))
+
+        head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}"]
+        head += [
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            "Connection: close",
+        ]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, reader):
+        try:
+            header = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return _error(400, "Malformed request.")
+        lines = header.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            return _error(400, "Malformed request line.")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, "application/json", json.dumps(self.status()).encode(), {}
+        if url.path != "/render":
+            return _error(404, f"Unknown path '{url.path}'.")
+        if method != "POST":
+            return _error(405, "Use POST to render.")
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            return _error(400, "Malformed Content-Length header.")
+        if length < 0:
+            return _error(400, "Malformed Content-Length header.")
+        if length > MAX_BODY_BYTES:
+            return _error(413, f"The definition exceeds {MAX_BODY_BYTES} bytes.")
+        try:
+            payload = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return _error(400, "Incomplete request body.")
+
+        query = parse_qs(url.query)
+        fmt = query.get("format", ["png"])[0]
+        if fmt not in CONTENT_TYPES:
+            return _error(400, f"Unsupported format '{fmt}'.")
+        try:
+            automaton = yaml.load(payload.decode("utf-8"), Loader=get_safe_loader())
+        except (UnicodeDecodeError, yaml.YAMLError) as e:
+            return _error(400, f"Could not parse the definition: {e}")
+        if not isinstance(automaton, dict):
+            return _error(400, "The definition must be a single automaton mapping.")
+        kind = query.get("kind", [None])[0] or infer_kind(automaton)
+
+        try:
+            data = await self.render(kind, automaton, fmt)
+        except ServiceBusyError as e:
+            return _error(503, str(e), {"Retry-After": "1"})
+        except ValueError as e:
+            return _error(400, str(e))
+        except subprocess.TimeoutExpired:
+            return _error(504, f"Rendering took longer than {self.timeout}s.")
+        except RuntimeError as e:
+            return _error(500, str(e))
+        return 200, CONTENT_TYPES[fmt], data, {}
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _error(status, message, headers=None):
+    body = json.dumps({"error": message}, ensure_ascii=False).encode("utf-8")
+    return status, "application/json", body, headers or {}
+
+
+async def serve(service, host="127.0.0.1", port=8080):
+    """
+    Runs the HTTP server until cancelled.
+
+    Args:
+        service (RenderService): The service answering requests.
+        host (str): Interface to listen on.
+        port (int): Port to listen on.
+    """
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    service.logger.info(
+        f"Render service listening on http://{host}:{port} with up to "
+        f"{service.max_processes} concurrent renders and {service.max_queue} queued."
+    )
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serve automaton renders over HTTP: POST a definition to /render."
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080).")
+    parser.add_argument(
+        "--max-processes",
+        type=int,
+        default=0,
+        help="Concurrent Graphviz processes (0 uses every CPU core, default: 0).",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=64,
+        help="Requests waiting for a render before new ones get 503 (default: 64).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30,
+        help="Seconds before a single layout is aborted (default: 30).",
+    )
+    parser.add_argument(
+        "--memory-cache-mb",
+        type=int,
+        default=64,
+        help="Size of the in-memory image cache in megabytes (0 disables, default: 64).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Also read from and add to the on-disk render cache in this directory.",
+    )
+    parser.add_argument("--log-level", type=str.upper, help="Log level (default: $AUTOMATA_LOG_LEVEL or INFO).")
+    args = parser.parse_args(argv)
+
+    logger = setup_logger(args.log_level)
+    service = RenderService(
+        logger,
+        max_processes=args.max_processes or None,
+        max_queue=args.max_queue,
+        cache=RenderCache(args.cache_dir) if args.cache_dir else None,
+        memory_cache_bytes=args.memory_cache_mb * 1024 * 1024,
+        timeout=args.timeout,
+    )
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        logger.info("Render service stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import logging
+
+import pytest
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger("tests")
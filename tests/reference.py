@@ -0,0 +1,131 @@
+"""
+Naive reference implementations the engines are tested against. They follow the
+definitions directly, on plain dicts, sets and tuples, with no precomputation.
+"""
+
+from collections import deque
+from itertools import product
+
+from models import EPSILON
+
+
+def words(alphabet, max_length):
+    """
+    Yields every word over alphabet of length at most max_length, shortest first.
+    """
+    for length in range(max_length + 1):
+        for letters in product(alphabet, repeat=length):
+            yield "".join(letters)
+
+
+def nfa_accepts(nfa, word):
+    """
+    Decides whether an NFA definition accepts a word by tracking the set of current
+    states, closing it under 'ε' after every step.
+    """
+    transitions = nfa["transitions"]
+
+    def targets(state, symbol):
+        return (transitions.get(state) or {}).get(symbol) or []
+
+    def closure(states):
+        seen = set(states)
+        stack = list(states)
+        while stack:
+            for target in targets(stack.pop(), EPSILON):
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return seen
+
+    current = closure({nfa["start_state"]})
+    for symbol in word:
+        current = closure({target for state in current for target in targets(state, symbol)})
+    return bool(current & set(nfa["final_states"]))
+
+
+def pda_accepts(pda, word, max_depth, accept_by="final_state"):
+    """
+    Decides whether a PDA definition accepts a word by exploring every configuration
+    (state, position, stack) breadth-first. Stacks are tuples with the top last, and
+    moves that would make a stack deeper than max_depth are cut off.
+
+    Returns:
+        bool or None: Whether the word is accepted, or None if it is rejected but
+            configurations were cut off, so the answer is unknown.
+    """
+    transitions = pda["transitions"]
+    start = (pda["start_state"], 0, (pda["initial_stack"],))
+    seen = {start}
+    queue = deque([start])
+    truncated = False
+    while queue:
+        state, position, stack = queue.popleft()
+        if position == len(word) and (
+            not stack if accept_by == "empty_stack" else state in pda["final_states"]
+        ):
+            return True
+        by_input = transitions.get(state) or {}
+        reads = [(EPSILON, position)]
+        if position < len(word):
+            reads.append((word[position], position + 1))
+        for symbol, next_position in reads:
+            for top, moves in (by_input.get(symbol) or {}).items():
+                if top == EPSILON:
+                    rest = stack
+                elif stack and stack[-1] == top:
+                    rest = stack[:-1]
+                else:
+                    continue
+                for target, push in moves:
+                    pushed = tuple(char for char in reversed(push) if char != EPSILON)
+                    new_stack = rest + pushed
+                    if len(new_stack) > max_depth:
+                        truncated = True
+                        continue
+                    config = (target, next_position, new_stack)
+                    if config not in seen:
+                        seen.add(config)
+                        queue.append(config)
+    return None if truncated else False
+
+
+def minimal_dfa_size(dfa):
+    """
+    Returns the number of states of the minimal partial DFA equivalent to a DFA
+    definition, with Moore's partition refinement over the completed DFA. The class of
+    dead states is not counted, as the minimizer leaves it out, unless it holds the
+    start state (the language is empty).
+    """
+    dead = object()
+    alphabet = [symbol for symbol in dfa.get("alphabet") or [] if symbol != EPSILON]
+    transitions = dfa["transitions"]
+
+    def next_state(state, symbol):
+        targets = (transitions.get(state) or {}).get(symbol) if state is not dead else None
+        return targets[0] if targets else dead
+
+    reachable = [dfa["start_state"]]
+    seen = set(reachable)
+    for state in reachable:
+        for symbol in alphabet:
+            target = next_state(state, symbol)
+            if target is not dead and target not in seen:
+                seen.add(target)
+                reachable.append(target)
+    states = reachable + [dead]
+
+    finals = set(dfa["final_states"])
+    block = {state: state in finals for state in states}
+    while True:
+        signature = {
+            state: (block[state],)
+            + tuple(block[next_state(state, symbol)] for symbol in alphabet)
+            for state in states
+        }
+        numbering = {key: index for index, key in enumerate(dict.fromkeys(signature.values()))}
+        refined = {state: numbering[signature[state]] for state in states}
+        if len(set(refined.values())) == len(set(block.values())):
+            break
+        block = refined
+    return max(len(set(refined.values()) - {refined[dead]}), 1)
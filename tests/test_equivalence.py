@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from benchmarks.synthetic import random_nfa
+from converters import determinize, minimize_dfa
+from engines import check_equivalence, check_inclusion
+from tests.reference import nfa_accepts, words
+
+# Words up to this length are compared by brute force
+MAX_LENGTH = 7
+
+
+def shortest_difference(a, b, accepted_by_a_only=False):
+    for word in words("01", MAX_LENGTH):
+        in_a, in_b = nfa_accepts(a, word), nfa_accepts(b, word)
+        if in_a and not in_b or (in_b and not in_a and not accepted_by_a_only):
+            return word
+    return None
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_brute_force_on_random_pairs(seed, logger):
+    rng = random.Random(seed)
+    a, b = (
+        random_nfa(rng, name, states=rng.randint(1, 5), density=1.2, epsilon_ratio=0.2)
+        for name in "AB"
+    )
+    for check, a_only in ((check_equivalence, False), (check_inclusion, True)):
+        result = check(a, b, logger)
+        expected = shortest_difference(a, b, a_only)
+        word = "".join(result["counterexample"] or [])
+        if expected is not None:
+            assert not result["holds"]
+            assert len(word) == len(expected)
+        elif not result["holds"]:
+            assert len(word) > MAX_LENGTH
+        if not result["holds"]:
+            in_a, in_b = nfa_accepts(a, word), nfa_accepts(b, word)
+            assert in_a != in_b if not a_only else in_a and not in_b
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_nfa_is_equivalent_to_its_minimal_dfa(seed, logger):
+    nfa = random_nfa(random.Random(seed), "N", states=6, density=1.5, epsilon_ratio=0.3)
+    minimal = minimize_dfa(determinize(nfa, logger), logger)
+    assert check_equivalence(nfa, minimal, logger)["holds"]
+
+
+def test_epsilon_only_and_empty_alphabet(logger):
+    epsilon_only = {
+        "name": "E",
+        "type": "e-nfa",
+        "states": ["A", "B"],
+        "transitions": {"A": {"ε": ["B"]}},
+        "start_state": "A",
+        "final_states": ["B"],
+    }
+    empty_word = {
+        "name": "F",
+        "type": "nfa",
+        "states": ["A"],
+        "alphabet": [],
+        "transitions": {},
+        "start_state": "A",
+        "final_states": ["A"],
+    }
+    assert check_equivalence(epsilon_only, empty_word, logger)["holds"]
+    empty_language = dict(empty_word, name="G", final_states=[])
+    result = check_equivalence(epsilon_only, empty_language, logger)
+    assert not result["holds"]
+    assert result["counterexample"] == [] and result["accepted_by"] == "a"
@@ -0,0 +1,144 @@
+import os
+import random
+import sys
+
+import pytest
+import yaml
+
+from benchmarks.synthetic import random_nfa, random_pda
+from converters import RegexCompiler, compile_regex
+from loaders import (
+    PrecompiledFormatError,
+    export_precompiled,
+    is_fresh,
+    iter_automata,
+    iter_precompiled,
+    iter_yaml_documents,
+)
+from loaders import precompiled
+
+
+@pytest.fixture
+def library(tmp_path):
+    rng = random.Random(0)
+    definitions = {
+        "nfas": [random_nfa(rng, f"N{i}", states=rng.randint(1, 8)) for i in range(10)],
+        "pdas": [random_pda(rng, f"P{i}", states=rng.randint(1, 6)) for i in range(5)],
+        "regexes": [{"name": "R", "pattern": "(a|b)*c{2,3}"}],
+    }
+    definitions["nfas"].append(
+        {
+            "name": "Commas",
+            "type": "nfa",
+            "states": ["A,B", "A", 1],
+            "alphabet": [0, "ε"],
+            "transitions": {"A": {0: ["A,B"]}, "A,B": {"ε": [1]}},
+            "start_state": "A",
+            "final_states": [1],
+            "minimize": True,
+        }
+    )
+    # Invalid: stored as loaded and reported when rendered
+    definitions["nfas"].append({"name": "Broken", "type": "nfa", "states": ["A"]})
+    path = tmp_path / "library.yaml"
+    path.write_text(yaml.safe_dump(definitions, allow_unicode=True), encoding="utf-8")
+    return str(path)
+
+
+def test_precompiled_round_trip(library, logger):
+    target = export_precompiled(library, logger)
+    loaded = list(iter_precompiled(target))
+    expected = [
+        ("nfa", compile_regex(automaton, logger, RegexCompiler()))
+        if kind == "regex"
+        else (kind, automaton)
+        for kind, automaton in iter_automata(library)
+    ]
+    assert [kind for kind, _ in loaded] == [kind for kind, _ in expected]
+    for (_, automaton), (_, original) in zip(loaded, expected):
+        assert automaton == original
+        assert list(automaton) == list(original)
+
+
+def test_touched_source_is_hashed_once(library, logger, monkeypatch):
+    target = export_precompiled(library, logger)
+    stat = os.stat(library)
+    os.utime(library, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    hashed = []
+    file_digest = precompiled._file_digest
+    monkeypatch.setattr(
+        precompiled, "_file_digest", lambda path: hashed.append(path) or file_digest(path)
+    )
+    assert is_fresh(target, library)
+    assert is_fresh(target, library)
+    assert hashed == [library]
+
+    with open(library, "a", encoding="utf-8") as file:
+        file.write("# changed\n")
+    assert not is_fresh(target, library)
+
+
+def test_other_byte_order_is_rejected(library, logger):
+    target = export_precompiled(library, logger)
+    with open(target, "r+b") as file:
+        header = bytearray(file.read(precompiled.HEADER.size))
+        fields = list(precompiled.HEADER.unpack(header))
+        fields[4] = precompiled.BYTE_ORDERS["big" if sys.byteorder == "little" else "little"]
+        file.seek(0)
+        file.write(precompiled.HEADER.pack(*fields))
+    assert not is_fresh(target, library)
+    with pytest.raises(PrecompiledFormatError):
+        list(iter_precompiled(target))
+
+
+ALIASES = """
+shared:
+  transitions: &loop
+    A: {a: [A]}
+nfas: &all
+  - &first
+    name: N1
+    type: nfa
+    states: &states [A]
+    alphabet: [a]
+    transitions: *loop
+    start_state: A
+    final_states: [A]
+  - name: N2
+    type: nfa
+    states: *states
+    alphabet: [a]
+    transitions: {A: {a: [A]}}
+    start_state: A
+    final_states: []
+  - *first
+regexes: [{name: R, pattern: a*}]
+pdas: []
+other: *all
+---
+nfas: &anchored [{name: N3, type: nfa, states: [A], transitions: {}, start_state: A,
+                  final_states: []}]
+pdas: *anchored
+"""
+
+
+def test_aliases_across_automata_match_safe_load(tmp_path):
+    sections = {"nfas": "nfa", "pdas": "pda", "regexes": "regex"}
+    expected = [
+        (kind, automaton)
+        for document in yaml.safe_load_all(ALIASES)
+        for key, kind in sections.items()
+        for automaton in document.get(key) or []
+    ]
+    path = tmp_path / "aliases.yaml"
+    path.write_text(ALIASES, encoding="utf-8")
+    assert list(iter_automata(str(path))) == expected
+    assert list(iter_yaml_documents(ALIASES, yaml.SafeLoader)) == expected
+
+
+def test_section_given_as_an_alias():
+    text = "x: &list\n  - {name: R, pattern: a}\nregexes: *list\n"
+    assert list(iter_yaml_documents(text, yaml.SafeLoader)) == [
+        ("regex", {"name": "R", "pattern": "a"})
+    ]
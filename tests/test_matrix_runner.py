@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from benchmarks.synthetic import random_nfa
+from engines import MatrixRunner
+from tests.reference import nfa_accepts, words
+
+pytest.importorskip("numpy")
+
+# NUL is not a symbol: it must be read as an unknown symbol, not as padding
+EXTRA_WORDS = ["", "2", "012", "0\0", "\0", "1\x001", "0" * 20]
+
+
+@pytest.mark.parametrize("mode", ["dfa", "nfa"])
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_reference_on_random_nfas(seed, mode, logger):
+    rng = random.Random(seed)
+    nfa = random_nfa(rng, f"N{seed}", states=rng.randint(1, 7), density=1.2, epsilon_ratio=0.3)
+    runner = MatrixRunner(nfa, logger, mode=mode)
+    inputs = list(words("01", 6)) + EXTRA_WORDS
+    expected = [nfa_accepts(nfa, word) for word in inputs]
+    assert list(runner.accepts_many(inputs, chunk_size=50)) == expected
+
+
+def test_nul_symbol_and_multi_character_symbols(logger):
+    nfa = {
+        "name": "M",
+        "type": "nfa",
+        "states": ["A", "B"],
+        "alphabet": ["\0", "ab"],
+        "transitions": {"A": {"\0": ["B"]}, "B": {"ab": ["A"]}},
+        "start_state": "A",
+        "final_states": ["B"],
+    }
+    runner = MatrixRunner(nfa, logger)
+    inputs = [["\0"], ["\0", "ab", "\0"], ["ab"], [], "\0"]
+    assert list(runner.accepts_many(inputs)) == [True, True, False, False, True]
+
+
+def test_empty_alphabet(logger):
+    nfa = {
+        "name": "E",
+        "type": "e-nfa",
+        "states": ["A", "B"],
+        "transitions": {"A": {"ε": ["B"]}},
+        "start_state": "A",
+        "final_states": ["B"],
+    }
+    for mode in ("dfa", "nfa"):
+        runner = MatrixRunner(nfa, logger, mode=mode)
+        assert list(runner.accepts_many(["", "a", ""])) == [True, False, True]
+
+
+def test_nfa_mode_memory_cap(logger):
+    nfa = random_nfa(random.Random(0), "N", states=50)
+    with pytest.raises(ValueError, match="max_matrix_bytes"):
+        MatrixRunner(nfa, logger, mode="nfa", max_matrix_bytes=1000)
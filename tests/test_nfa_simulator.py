@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from benchmarks.synthetic import random_nfa
+from engines import NFA_Simulator
+from tests.reference import nfa_accepts, words
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_matches_reference_on_random_nfas(seed, logger):
+    rng = random.Random(seed)
+    nfa = random_nfa(rng, f"N{seed}", states=rng.randint(1, 7), density=1.2, epsilon_ratio=0.3)
+    simulator = NFA_Simulator(nfa, logger)
+    inputs = list(words("01", 6)) + ["012", "2"]
+    expected = [nfa_accepts(nfa, word) for word in inputs]
+    assert [simulator.accepts(word) for word in inputs] == expected
+    assert list(simulator.accepts_many(inputs)) == expected
+
+
+def test_epsilon_only_nfa(logger):
+    nfa = {
+        "name": "E",
+        "type": "e-nfa",
+        "states": ["A", "B", "C"],
+        "alphabet": [],
+        "transitions": {"A": {"ε": ["B"]}, "B": {"ε": ["C", "A"]}},
+        "start_state": "A",
+        "final_states": ["C"],
+    }
+    simulator = NFA_Simulator(nfa, logger)
+    assert simulator.accepts("")
+    assert not simulator.accepts("a")
+
+
+def test_empty_alphabet(logger):
+    nfa = {
+        "name": "Empty",
+        "type": "nfa",
+        "states": ["A"],
+        "alphabet": [],
+        "transitions": {},
+        "start_state": "A",
+        "final_states": [],
+    }
+    simulator = NFA_Simulator(nfa, logger)
+    assert not simulator.accepts("")
+    assert list(simulator.accepts_many(["", "a"])) == [False, False]
+
+
+def test_multi_character_symbols(logger):
+    nfa = {
+        "name": "M",
+        "type": "nfa",
+        "states": ["A", "B"],
+        "alphabet": ["ab", "c"],
+        "transitions": {"A": {"ab": ["B"]}, "B": {"c": ["A"]}},
+        "start_state": "A",
+        "final_states": ["B"],
+    }
+    simulator = NFA_Simulator(nfa, logger)
+    assert simulator.accepts(["ab", "c", "ab"])
+    assert not simulator.accepts("abc")
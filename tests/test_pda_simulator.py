@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from benchmarks.synthetic import random_pda
+from engines import PDA_Simulator, SimulationLimitError
+from tests.reference import pda_accepts, words
+
+MAX_DEPTH = 6
+
+# a^n b^n, accepting in q2 or on the empty stack
+ANBN = {
+    "name": "AnBn",
+    "type": "pda",
+    "states": ["q0", "q1", "q2"],
+    "input_alphabet": ["a", "b"],
+    "stack_alphabet": ["Z", "A"],
+    "start_state": "q0",
+    "initial_stack": "Z",
+    "final_states": ["q2"],
+    "transitions": {
+        "q0": {
+            "a": {"Z": [["q0", "AZ"]], "A": [["q0", "AA"]]},
+            "b": {"A": [["q1", "ε"]]},
+            "ε": {"Z": [["q2", "ε"]]},
+        },
+        "q1": {"b": {"A": [["q1", "ε"]]}, "ε": {"Z": [["q2", "ε"]]}},
+    },
+}
+
+
+@pytest.mark.parametrize("accept_by", ["final_state", "empty_stack"])
+@pytest.mark.parametrize("seed", range(25))
+def test_matches_reference_on_random_pdas(seed, accept_by, logger):
+    rng = random.Random(seed)
+    # Small and dense, so words are accepted, rejected and cut off alike
+    pda = random_pda(
+        rng,
+        f"P{seed}",
+        states=rng.randint(1, 3),
+        density=3,
+        epsilon_ratio=0.3,
+        stack_alphabet_size=2,
+    )
+    simulator = PDA_Simulator(pda, logger, max_stack_depth=MAX_DEPTH, accept_by=accept_by)
+    for word in words("01", 5):
+        expected = pda_accepts(pda, word, MAX_DEPTH, accept_by)
+        if expected is None:
+            # Rejected after a cut-off: the simulator must say it cannot tell
+            with pytest.raises(SimulationLimitError):
+                simulator.accepts(word)
+        else:
+            assert simulator.accepts(word) == expected, word
+
+
+@pytest.mark.parametrize("accept_by", ["final_state", "empty_stack"])
+def test_anbn(accept_by, logger):
+    simulator = PDA_Simulator(ANBN, logger, accept_by=accept_by)
+    for word in words("ab", 8):
+        n = len(word) // 2
+        assert simulator.accepts(word) == (word == "a" * n + "b" * n), word
+
+
+def test_long_input_needs_no_manual_depth(logger):
+    n = 100_000
+    simulator = PDA_Simulator(ANBN, logger)
+    assert simulator.accepts("a" * n + "b" * n)
+    assert not simulator.accepts("a" * n + "b" * (n - 1))
+
+
+def test_pushing_epsilon_loop_is_cut_off(logger):
+    pda = {
+        "name": "Loop",
+        "type": "pda",
+        "states": ["q0", "q1"],
+        "input_alphabet": ["a"],
+        "stack_alphabet": ["Z"],
+        "start_state": "q0",
+        "initial_stack": "Z",
+        "final_states": ["q1"],
+        "transitions": {"q0": {"ε": {"Z": [["q0", "ZZ"]]}}},
+    }
+    with pytest.raises(SimulationLimitError):
+        PDA_Simulator(pda, logger, max_stack_depth=50).accepts("")
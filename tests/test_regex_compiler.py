@@ -0,0 +1,85 @@
+import random
+import re
+
+import pytest
+
+from converters import RegexCompiler, RegexSyntaxError, compile_regex
+from engines import NFA_Simulator
+from tests.reference import words
+
+ALPHABET = "abc"
+
+PATTERNS = [
+    "a",
+    "ab*c",
+    "(a|b)*abb",
+    "a+b?c*",
+    "(ab|ac)*",
+    "a{2}",
+    "a{1,3}b",
+    "(a|bc){2,}",
+    "[ab]c[^a]",
+    ".b.",
+    "(a*)*",
+    "((a|b)c?)+|c",
+    "ab|abc|a|ba",
+]
+
+# Shared by the random patterns, so memoized subexpressions are reused across them
+SHARED_COMPILER = RegexCompiler()
+
+
+def random_pattern(rng, depth=3):
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(["a", "b", "c", "[ab]", "[^c]", "."])
+    kind = rng.randrange(4)
+    if kind == 0:
+        return random_pattern(rng, depth - 1) + random_pattern(rng, depth - 1)
+    if kind == 1:
+        return f"({random_pattern(rng, depth - 1)}|{random_pattern(rng, depth - 1)})"
+    if kind == 2:
+        low = rng.randint(0, 2)
+        return f"({random_pattern(rng, depth - 1)}){{{low},{low + rng.randint(0, 2)}}}"
+    return f"({random_pattern(rng, depth - 1)}){rng.choice('*+?')}"
+
+
+def assert_matches_re(definition, pattern, logger, compiler=None):
+    nfa = compile_regex(definition, logger, compiler)
+    simulator = NFA_Simulator(nfa, logger)
+    for word in words(ALPHABET, 5):
+        assert simulator.accepts(word) == bool(re.fullmatch(pattern, word)), (pattern, word)
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_matches_re_fullmatch(pattern, logger):
+    definition = {"name": "R", "pattern": pattern, "alphabet": list(ALPHABET)}
+    assert_matches_re(definition, pattern, logger, RegexCompiler())
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_patterns(seed, logger):
+    pattern = random_pattern(random.Random(seed))
+    definition = {"name": f"R{seed}", "pattern": pattern, "alphabet": list(ALPHABET)}
+    assert_matches_re(definition, pattern, logger, SHARED_COMPILER)
+
+
+def test_alternatives_are_a_union(logger):
+    alternatives = ["ab*", "b+", "ca"]
+    definition = {"name": "U", "alternatives": alternatives, "alphabet": list(ALPHABET)}
+    assert_matches_re(definition, "|".join(f"(?:{p})" for p in alternatives), logger)
+
+
+def test_nested_repetitions_are_capped(logger):
+    with pytest.raises(ValueError, match="MAX_POSITIONS"):
+        compile_regex({"name": "Big", "pattern": "((a|b){1000}){1000}"}, logger)
+    compiler = RegexCompiler(max_positions=10)
+    nfa = compile_regex({"name": "Ok", "pattern": "a{10}"}, logger, compiler)
+    assert len(nfa["states"]) == 11
+    with pytest.raises(ValueError, match="11 positions"):
+        compile_regex({"name": "Over", "pattern": "a{11}"}, logger, compiler)
+
+
+@pytest.mark.parametrize("pattern", ["a{2,1}", "(ab", "a{1001}", "[]"])
+def test_invalid_patterns(pattern, logger):
+    with pytest.raises(RegexSyntaxError):
+        compile_regex({"name": "Bad", "pattern": pattern}, logger, RegexCompiler())
@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from benchmarks.synthetic import random_nfa
+from converters import determinize, is_deterministic, minimize_dfa
+from converters.subset_construction import LazyDFA, StateExplosionError
+from engines import NFA_Simulator
+from models import compile_nfa
+from tests.reference import minimal_dfa_size, nfa_accepts, words
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_determinize_and_minimize_keep_the_language(seed, logger):
+    rng = random.Random(seed)
+    nfa = random_nfa(rng, f"N{seed}", states=rng.randint(1, 6), density=1.5, epsilon_ratio=0.3)
+    dfa = determinize(nfa, logger)
+    minimal = minimize_dfa(dfa, logger)
+
+    assert is_deterministic(compile_nfa(dfa))
+    assert len(minimal["states"]) == minimal_dfa_size(dfa)
+    for word in words("01", 6):
+        expected = nfa_accepts(nfa, word)
+        assert nfa_accepts(dfa, word) == expected, word
+        assert nfa_accepts(minimal, word) == expected, word
+
+
+def test_state_names_with_commas_fall_back_to_indexed(logger):
+    # {"A,B"} and {"A", "B"} would both be named "{A,B}"
+    nfa = {
+        "name": "Commas",
+        "type": "nfa",
+        "states": ["A,B", "A", "B"],
+        "alphabet": ["x", "y"],
+        "transitions": {"A": {"x": ["A", "B"], "y": ["A,B"]}},
+        "start_state": "A",
+        "final_states": ["A,B"],
+    }
+    dfa = LazyDFA(NFA_Simulator(nfa, logger)).to_dict("D", naming="subsets")
+    assert dfa["states"] == ["D0", "D1", "D2"]
+    for word in words("xy", 3):
+        assert nfa_accepts(dfa, word) == nfa_accepts(nfa, word)
+
+
+def test_subset_names_are_kept_without_collisions(logger):
+    nfa = random_nfa(random.Random(0), "N", states=4, epsilon_ratio=0)
+    dfa = determinize(nfa, logger, naming="subsets")
+    assert all(name.startswith("{") for name in dfa["states"])
+
+
+def test_epsilon_only_and_empty_alphabet(logger):
+    nfa = {
+        "name": "E",
+        "type": "e-nfa",
+        "states": ["A", "B"],
+        "transitions": {"A": {"ε": ["B"]}},
+        "start_state": "A",
+        "final_states": ["B"],
+    }
+    dfa = determinize(nfa, logger)
+    assert dfa["alphabet"] == [] and dfa["transitions"] == {}
+    assert dfa["final_states"] == [dfa["start_state"]]
+    assert minimize_dfa(dfa, logger)["states"] == [dfa["start_state"]]
+
+
+def test_state_cap(logger):
+    # The classic (n + 1)-state NFA for "the n-th symbol from the end is 1"
+    n = 8
+    states = [f"q{i}" for i in range(n + 1)]
+    transitions = {"q0": {"0": ["q0"], "1": ["q0", "q1"]}}
+    for i in range(1, n):
+        transitions[f"q{i}"] = {"0": [f"q{i + 1}"], "1": [f"q{i + 1}"]}
+    nfa = {
+        "name": "Blowup",
+        "type": "nfa",
+        "states": states,
+        "alphabet": ["0", "1"],
+        "transitions": transitions,
+        "start_state": "q0",
+        "final_states": [f"q{n}"],
+    }
+    assert len(determinize(nfa, logger)["states"]) == 2**n
+    with pytest.raises(StateExplosionError):
+        determinize(nfa, logger, max_states=2**n - 1)
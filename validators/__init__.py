@@ -1,3 +1,9 @@
+from .automaton_validator import (
+    AutomatonValidationError,
+    validate_automaton,
+    validate_nfa,
+    validate_pda,
+)
 from .nfa_validator import (
     validate_nfa_structure,
     validate_nfa_states,
@@ -0,0 +1,237 @@
+from models import EPSILON, compile_nfa, compile_pda
+
+NFA_REQUIRED_KEYS = ("name", "type", "states", "transitions", "start_state", "final_states")
+PDA_REQUIRED_FIELDS = (
+    "states",
+    "input_alphabet",
+    "stack_alphabet",
+    "start_state",
+    "initial_stack",
+    "final_states",
+    "transitions",
+)
+
+
+class AutomatonValidationError(ValueError):
+    """
+    Raised when an automaton definition is invalid. Every problem found is reported,
+    not only the first one.
+
+    Attributes:
+        errors (list): One message per problem.
+    """
+
+    def __init__(self, kind, name, errors):
+        self.errors = list(errors)
+        if len(self.errors) == 1:
+            message = self.errors[0]
+        else:
+            message = f"{len(self.errors)} errors in {kind.upper()} '{name}': " + " ".join(
+                self.errors
+            )
+        super().__init__(message)
+
+
+def validate_automaton(kind, automaton, logger, model=None):
+    """
+    Validates an NFA or PDA definition; see validate_nfa and validate_pda.
+
+    Args:
+        kind (str): "nfa" or "pda".
+        automaton (dict): The definition.
+        logger (logging.Logger): Logger for errors and warnings.
+        model (CompiledNFA or CompiledPDA, optional): An already compiled form of the
+            definition.
+
+    Returns:
+        CompiledNFA or CompiledPDA: The compiled automaton.
+
+    Raises:
+        AutomatonValidationError: If the definition is invalid.
+    """
+    if kind == "pda":
+        return validate_pda(automaton, logger, model)
+    return validate_nfa(automaton, logger, model)
+
+
+def validate_nfa(nfa, logger, model=None):
+    """
+    Validates an NFA definition in one traversal: the definition is compiled once and
+    every check runs on the compiled id arrays, collecting all errors before raising.
+
+    Checks that the required keys are present, that there is at least one state, and
+    that the start state, the final states and every state used in the transitions are
+    declared. Duplicate states are logged as a warning and unused alphabet symbols as
+    information.
+
+    Args:
+        nfa (dict): The NFA definition.
+        logger (logging.Logger): Logger for errors and warnings.
+        model (CompiledNFA, optional): An already compiled form of nfa.
+
+    Returns:
+        CompiledNFA: The compiled NFA.
+
+    Raises:
+        AutomatonValidationError: If the definition is invalid.
+    """
+    if not isinstance(nfa, dict):
+        _fail("nfa", "<unnamed>", ["An NFA definition must be a mapping."], logger)
+    name = nfa.get("name", "<unnamed>")
+    errors = [
+        f"Missing required key '{key}' in NFA '{name}'."
+        for key in NFA_REQUIRED_KEYS
+        if key not in nfa
+    ]
+    if errors:
+        _fail("nfa", name, errors, logger)
+    if model is None:
+        model = _compile(compile_nfa, "nfa", nfa, logger)
+
+    states = model.states
+    if not states.declared:
+        errors.append(f"NFA '{name}' has no states.")
+    errors += _undefined_states("NFA", name, model)
+    if errors:
+        _fail("nfa", name, errors, logger)
+
+    if states.duplicates:
+        logger.warning(f"NFA '{name}' contains duplicate states.")
+    unused_symbols = set(range(model.symbols.declared)) - set(model.sym)
+    if unused_symbols:
+        names = ", ".join(model.symbols.names[i] for i in sorted(unused_symbols))
+        logger.info(f"NFA '{name}' has unused symbols in its alphabet: {names}.")
+    return model
+
+
+def validate_pda(pda, logger, model=None):
+    """
+    Validates a PDA definition in one traversal: the definition is compiled once and
+    every check runs on the compiled id arrays, collecting all errors before raising.
+
+    Checks that the required fields are present and non-empty, that the start state,
+    the final states and every state used in the transitions are declared, that the
+    initial stack symbol and every popped stack symbol belong to the stack alphabet,
+    that every input symbol belongs to the input alphabet, and that every stack
+    operation is made of stack symbols. 'ε' is allowed as input (no input read), as
+    popped symbol (nothing popped) and in stack operations (nothing pushed).
+
+    Args:
+        pda (dict): The PDA definition.
+        logger (logging.Logger): Logger for errors and warnings.
+        model (CompiledPDA, optional): An already compiled form of pda.
+
+    Returns:
+        CompiledPDA: The compiled PDA.
+
+    Raises:
+        AutomatonValidationError: If the definition is invalid.
+    """
+    if not isinstance(pda, dict):
+        _fail("pda", "<unnamed>", ["A PDA definition must be a mapping."], logger)
+    name = pda.get("name", "<unnamed>")
+    errors = [
+        f"Missing or empty required field '{field}' in PDA '{name}'."
+        for field in PDA_REQUIRED_FIELDS
+        if not pda.get(field)
+    ]
+    if errors:
+        _fail("pda", name, errors, logger)
+    if model is None:
+        model = _compile(compile_pda, "pda", pda, logger)
+
+    errors += _undefined_states("PDA", name, model)
+
+    stack_symbols = model.stack_symbols
+    if not stack_symbols.is_declared(model.initial_stack):
+        errors.append(
+            f"Initial stack symbol '{stack_symbols.names[model.initial_stack]}' of PDA "
+            f"'{name}' is not part of the stack alphabet."
+        )
+
+    # Ids past the declared ones were interned from the transitions
+    input_symbols = model.input_symbols
+    for input_id in sorted(set(model.inp)):
+        if input_id >= input_symbols.declared and input_id != model.epsilon:
+            errors.append(
+                f"Invalid input symbol '{input_symbols.names[input_id]}' in PDA '{name}': "
+                "input symbols must be part of the input alphabet or 'ε'."
+            )
+    no_pop = stack_symbols.get(EPSILON)
+    for stack_id in sorted(set(model.top)):
+        if stack_id >= stack_symbols.declared and stack_id != no_pop:
+            errors.append(
+                f"Invalid stack symbol '{stack_symbols.names[stack_id]}' in PDA '{name}': "
+                "popped symbols must be part of the stack alphabet or 'ε'."
+            )
+
+    # Each distinct operation is checked once, however many transitions share it
+    for stack_operation in model.pushes.names:
+        for symbol in stack_operation:
+            if symbol not in stack_symbols and symbol != EPSILON:
+                errors.append(
+                    f"Invalid stack operation '{stack_operation}' in PDA '{name}': "
+                    f"'{symbol}' is not part of the stack alphabet."
+                )
+                break
+
+    if errors:
+        _fail("pda", name, errors, logger)
+    if model.states.duplicates:
+        logger.warning(f"PDA '{name}' contains duplicate states.")
+    return model
+
+
+def _undefined_states(kind, name, model):
+    """
+    Lists the undeclared states used as start state, final state or in transitions.
+    Undeclared states are interned after the declared ones, so a single max() over an
+    id array tells whether anything needs to be reported.
+    """
+    states = model.states
+    declared = states.declared
+    names = states.names
+    errors = []
+    if not states.is_declared(model.start):
+        errors.append(
+            f"Start state '{names[model.start]}' of {kind} '{name}' is not defined in "
+            "the list of states."
+        )
+    for state in sorted(model.finals):
+        if state >= declared:
+            errors.append(
+                f"Final state '{names[state]}' of {kind} '{name}' is not defined in the "
+                "list of states."
+            )
+    if model.sources and max(model.sources) >= declared:
+        for state in sorted({i for i in model.sources if i >= declared}):
+            errors.append(
+                f"State '{names[state]}' in transitions of {kind} '{name}' is not defined "
+                "in the list of states."
+            )
+    if model.dst and max(model.dst) >= declared:
+        for state in sorted(i for i in set(model.dst) if i >= declared):
+            errors.append(f"Transition to undefined state '{names[state]}' in {kind} '{name}'.")
+    return errors
+
+
+def _compile(compile, kind, automaton, logger):
+    """
+    Compiles a definition whose required keys are present, reporting a definition
+    that does not have the expected shape (e.g. a list where a mapping is expected).
+    """
+    try:
+        return compile(automaton)
+    except (AttributeError, TypeError, ValueError) as e:
+        _fail(
+            kind,
+            automaton.get("name", "<unnamed>"),
+            [f"{kind.upper()} '{automaton.get('name', '<unnamed>')}' is malformed: {e}."],
+            logger,
+        )
+
+
+def _fail(kind, name, errors, logger):
+    for error in errors:
+        logger.error(error)
+    raise AutomatonValidationError(kind, name, errors)
@@ -0,0 +1,236 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from app import (
+    _log_result,
+    assign_output_filename,
+    build_cache,
+    build_options,
+    build_parser,
+    iter_input,
+    render_chunk,
+)
+from generators.render_cache import fingerprint
+from logging_config import init_worker_logging, setup_logger, worker_log_queue
+
+
+class Watcher:
+    """
+    Watches definition files and re-renders only the automata that were added or
+    changed since the last render.
+
+    Files are polled for changes to their modification time and size. A change starts
+    a debounce window that is extended by every further change, so a burst of saves
+    triggers a single update. On an update, each automaton is identified by its file,
+    kind and name and compared with the previous version by a hash of its definition.
+    An automaton keeps its output filename for the whole session, so its image is
+    overwritten in place when it changes.
+
+    Attributes:
+        paths (list): The watched definition files.
+        logger (logging.Logger): Logger for progress and errors.
+        workers (int): Number of worker processes; the pool is kept for the session.
+        cache (RenderCache): Optional render cache.
+        options (dict): Run-wide options, as for app.run_batch.
+        interval (float): Seconds between polls.
+        debounce (float): Seconds without further changes before an update starts.
+    """
+
+    def __init__(
+        self,
+        paths,
+        logger,
+        workers=1,
+        cache=None,
+        options=None,
+        interval=0.2,
+        debounce=0.3,
+    ):
+        """
+        Initializes the Watcher.
+
+        Args:
+            paths (list): Definition files to watch.
+            logger (logging.Logger): Logger for progress and errors.
+            workers (int): Number of worker processes. 1 renders in-process.
+            cache (RenderCache, optional): Render cache.
+            options (dict, optional): Run-wide options.
+            interval (float): Seconds between polls.
+            debounce (float): Seconds without further changes before an update starts.
+        """
+        self.paths = list(paths)
+        self.logger = logger
+        self.workers = workers
+        self.cache = cache
+        self.options = options or {}
+        self.interval = interval
+        self.debounce = debounce
+        self._stamps = {}
+        self._known = {}  # (path, kind, name) -> (definition hash, output filename)
+        self._reserved = set()
+        self._executor = None
+
+    def run(self):
+        """
+        Renders every automaton once, then re-renders changed automata until
+        interrupted with Ctrl+C.
+        """
+        if self.workers > 1:
+            # Workers log through the queue; the listener lives as long as the pool
+            with worker_log_queue() as log_queue, ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=init_worker_logging,
+                initargs=(log_queue, logging.getLogger().level),
+            ) as executor:
+                self._executor = executor
+                try:
+                    self._loop()
+                finally:
+                    self._executor = None
+        else:
+            self._loop()
+
+    def _loop(self):
+        self._stamps = self._stat_all()
+        self.update()
+        self.logger.info(f"Watching {', '.join(self.paths)} for changes (Ctrl+C to stop).")
+        changed_at = None
+        try:
+            while True:
+                time.sleep(self.interval)
+                stamps = self._stat_all()
+                if stamps != self._stamps:
+                    self._stamps = stamps
+                    changed_at = time.monotonic()
+                elif changed_at is not None and time.monotonic() - changed_at >= self.debounce:
+                    changed_at = None
+                    self.update()
+        except KeyboardInterrupt:
+            self.logger.info("Stopped watching.")
+
+    def update(self):
+        """
+        Reloads the watched files and renders the automata that were added or changed.
+
+        Returns:
+            list: Results of the rendered automata, as returned by app.render_automaton.
+        """
+        start = time.perf_counter()
+        current = {}
+        for path in self.paths:
+            try:
+                automata = list(
+                    iter_input(path, self.logger, self.options.get("precompiled", False))
+                )
+            except Exception as e:
+                # Typically a save in the middle of an edit; keep the previous state
+                self.logger.error(f"Could not read '{path}', keeping its diagrams: {e}")
+                current.update({key: None for key in self._known if key[0] == path})
+                continue
+            for kind, automaton in automata:
+                name = automaton.get("name") if isinstance(automaton, dict) else None
+                key = (path, kind, name)
+                if key in current:
+                    self.logger.warning(
+                        f"Duplicate {kind.upper()} name '{name}' in '{path}'; only the first one is watched."
+                    )
+                    continue
+                current[key] = automaton
+
+        tasks = []
+        for key, automaton in current.items():
+            if automaton is None:
+                continue
+            path, kind, _ = key
+            digest = fingerprint([kind, automaton])
+            known = self._known.get(key)
+            if known is not None and known[0] == digest:
+                continue
+            if known is not None:
+                filename = known[1]
+            else:
+                filename = assign_output_filename(
+                    kind, automaton, self._reserved, self.cache, self.options
+                )
+            self._known[key] = (digest, filename)
+            tasks.append((kind, automaton, filename, self.cache, self.options))
+
+        for key in [key for key in self._known if key not in current]:
+            self.logger.info(f"{key[1].upper()} '{key[2]}' was removed from '{key[0]}'.")
+            del self._known[key]
+
+        if not tasks:
+            return []
+        results = self._render(tasks)
+        failures = sum(1 for result in results if result["error"])
+        self.logger.info(
+            f"Updated {len(results)} automata ({failures} failed) in "
+            f"{time.perf_counter() - start:.2f}s."
+        )
+        return results
+
+    def _render(self, tasks):
+        batch_size = max(self.options.get("batch_size", 1), 1)
+        iterator = iter(tasks)
+        chunks = list(iter(lambda: list(islice(iterator, batch_size)), []))
+        if self._executor is None:
+            outcomes = map(render_chunk, chunks)
+        else:
+            outcomes = self._executor.map(render_chunk, chunks)
+        results = []
+        for chunk_results in outcomes:
+            for result in chunk_results:
+                _log_result(result, self.logger)
+                results.append(result)
+        return results
+
+    def _stat_all(self):
+        stamps = {}
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                stamps[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamps[path] = None
+        return stamps
+
+
+def main(argv=None):
+    parser = build_parser(
+        "Render automata and re-render the changed ones whenever their files change."
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        help="Seconds between checks for changes (default: 0.2).",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.3,
+        help="Seconds to wait for further saves before re-rendering (default: 0.3).",
+    )
+    args = parser.parse_args(argv)
+    logger = setup_logger(args.log_level)
+
+    workers = args.workers if args.workers > 0 else os.cpu_count() or 1
+    watcher = Watcher(
+        args.input,
+        logger,
+        workers,
+        # Changed automata are re-rendered to the same outputs, so never link them to
+        # cache entries of their previous versions
+        build_cache(args, link_outputs=False),
+        build_options(args),
+        args.interval,
+        args.debounce,
+    )
+    watcher.run()
+
+
+if __name__ == "__main__":
+    main()